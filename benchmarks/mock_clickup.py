@@ -0,0 +1,299 @@
+"""
+Servidor local que imita a API do ClickUp para testes e benchmarks offline.
+
+Gera listas sintéticas e determinísticas (mesma semente, mesmas tarefas) com
+descrições no formato "CAMPO: valor", campos personalizados, status com
+emoji e histórico de tempo em status. Atende os endpoints usados por
+`ClickUpAPI`: tarefas da lista (paginadas de 100 em 100, com `last_page` e
+`date_updated_gt`), tarefa unitária e tempo em status unitário e em lote.
+Latência, jitter e limite de requisições (429 com `Retry-After` e cabeçalhos
+`X-RateLimit-*`) são configuráveis.
+
+Uso em processo, sem rede:
+    app = create_app(MockConfig(tasks=10_000))
+    ClickUpAPI(key, tz, cache, base_url=MOCK_BASE_URL,
+               transport=httpx.ASGITransport(app=app))
+
+Ou como servidor HTTP (aponte `CLICKUP_BASE_URL` para ele):
+    python -m benchmarks.mock_clickup --tasks 10000 --port 8001
+"""
+import argparse
+import asyncio
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import JSONResponse
+
+from src.utils.regex_utils import FIELD_NAMES
+
+MOCK_BASE_URL = 'http://clickup.mock/api/v2'
+PAGE_SIZE = 100
+# `date_updated` da tarefa `i` é BASE_TIMESTAMP + i minutos
+BASE_TIMESTAMP = 1_700_000_000_000
+UPDATE_STEP = 60_000
+
+STATUSES = [
+    '🚀 em andamento',
+    'backlog',
+    '✅ concluído',
+    'bloqueado 🇧🇷',
+    'em validação',
+]
+PRIORITIES = ['urgent', 'high', 'normal', 'low']
+USERS = [('ana', 'ana@exemplo.com'), ('bruno', 'bruno@exemplo.com')]
+WORDS = (
+    'reduzir tempo médio de atendimento automatizar rotina de cobrança '
+    'integrar sistema legado painel de indicadores revisar fluxo da '
+    'operação migrar planilhas para o banco de dados'
+).split()
+
+
+@dataclass
+class MockConfig:
+    """
+    Args:
+        tasks (int): Tarefas ativas em cada lista.
+        seed (int): Semente dos dados sintéticos.
+        latency (float): Atraso fixo de cada resposta, em segundos.
+        jitter (float): Atraso aleatório adicional máximo, em segundos.
+        rate_limit (int): Requisições por minuto; 0 desativa o limite.
+    """
+
+    tasks: int = 1000
+    seed: int = 0
+    latency: float = 0.0
+    jitter: float = 0.0
+    rate_limit: int = 0
+
+
+def task_id(index: int) -> str:
+    return f'bm{index:07x}'
+
+
+def task_index(value: str) -> Optional[int]:
+    if not value.startswith('bm'):
+        return None
+    try:
+        return int(value[2:], 16)
+    except ValueError:
+        return None
+
+
+def _sentence(rng: random.Random, size: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(size))
+
+
+def make_description(rng: random.Random) -> str:
+    """Texto da tarefa com parte dos campos, em ordem e caixa variadas."""
+    lines = [_sentence(rng, rng.randint(3, 12)).capitalize() + '.']
+    for name in rng.sample(FIELD_NAMES, rng.randint(4, len(FIELD_NAMES))):
+        header = name if rng.random() < 0.8 else name.lower()
+        separator = rng.choice([': ', ':', ' : '])
+        lines.append(f'{header}{separator}{_sentence(rng, rng.randint(1, 8))}')
+    return '\n'.join(lines)
+
+
+def make_time_in_status(seed: int, index: int) -> Dict:
+    rng = random.Random(f'{seed}:{index}:status')
+    history = [
+        {
+            'status': rng.choice(STATUSES),
+            'color': '#d3d3d3',
+            'type': 'custom',
+            'total_time': {
+                'by_minute': rng.randint(0, 200_000),
+                'since': str(BASE_TIMESTAMP - rng.randint(0, 10**10)),
+            },
+            'orderindex': order,
+        }
+        for order in range(rng.randint(1, 5))
+    ]
+    return {'current_status': history[-1], 'status_history': history}
+
+
+def make_task(seed: int, index: int, list_id: str) -> Dict:
+    """Tarefa sintética `index`, no formato da API de tarefas do ClickUp."""
+    rng = random.Random(f'{seed}:{index}')
+    created = BASE_TIMESTAMP - rng.randint(0, 300 * 24 * 3600 * 1000)
+    description = make_description(rng)
+    custom_fields = [
+        {
+            'id': 'cf-tipo',
+            'name': 'TIPO',
+            'type': 'drop_down',
+            'value': rng.randint(0, 3),
+        }
+    ]
+    if rng.random() < 0.7:
+        custom_fields.append(
+            {
+                'id': 'cf-ganho',
+                'name': '💡 R$ GANHO ANUAL ',
+                'type': 'currency',
+                'value': str(round(rng.uniform(0, 500_000), 2)),
+            }
+        )
+    username, email = rng.choice(USERS)
+    return {
+        'id': task_id(index),
+        'name': f'Projeto {index} - {_sentence(rng, 3)}',
+        'text_content': description,
+        'description': description,
+        'markdown_description': description,
+        'status': {
+            'status': rng.choice(STATUSES),
+            'type': 'open',
+            'color': '#d3d3d3',
+        },
+        'date_created': str(created),
+        'date_updated': str(BASE_TIMESTAMP + index * UPDATE_STEP),
+        'priority': {'priority': rng.choice(PRIORITIES)}
+        if rng.random() < 0.6
+        else None,
+        'assignees': [{'username': username, 'email': email}]
+        if rng.random() < 0.8
+        else [],
+        'custom_fields': custom_fields,
+        'list': {'id': list_id},
+    }
+
+
+class _RateWindow:
+    """Janela fixa de um minuto, como a que o ClickUp aplica por token."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.window_start = time.time()
+        self.count = 0
+
+    def hit(self) -> Dict[str, str]:
+        """Conta a requisição e retorna os cabeçalhos de limite."""
+        now = time.time()
+        if now - self.window_start >= 60:
+            self.window_start = now
+            self.count = 0
+        self.count += 1
+        return {
+            'X-RateLimit-Limit': str(self.limit),
+            'X-RateLimit-Remaining': str(max(self.limit - self.count, 0)),
+            'X-RateLimit-Reset': str(int(self.window_start + 60)),
+        }
+
+    @property
+    def exceeded(self) -> bool:
+        return self.count > self.limit
+
+    @property
+    def retry_after(self) -> int:
+        return max(math.ceil(self.window_start + 60 - time.time()), 1)
+
+
+def create_app(config: Optional[MockConfig] = None) -> FastAPI:
+    """Cria o app ASGI do servidor simulado."""
+    config = config or MockConfig()
+    app = FastAPI(title='ClickUp mock')
+    app.state.config = config
+    app.state.requests = 0
+    delays = random.Random(config.seed)
+    rate_window = _RateWindow(config.rate_limit) if config.rate_limit else None
+
+    @app.middleware('http')
+    async def simulate_network(request: Request, call_next):
+        app.state.requests += 1
+        delay = config.latency + delays.uniform(0, config.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if rate_window is None:
+            return await call_next(request)
+        headers = rate_window.hit()
+        if rate_window.exceeded:
+            return JSONResponse(
+                {'err': 'Rate limit reached', 'ECODE': 'APP_002'},
+                status_code=429,
+                headers={**headers, 'Retry-After': str(rate_window.retry_after)},
+            )
+        response = await call_next(request)
+        response.headers.update(headers)
+        return response
+
+    @app.get('/api/v2/list/{list_id}/task')
+    async def list_tasks(
+        list_id: str,
+        page: int = 0,
+        archived: bool = False,
+        date_updated_gt: Optional[int] = None,
+    ):
+        if archived:
+            return {'tasks': [], 'last_page': True}
+        first = 0
+        if date_updated_gt is not None:
+            first = max(
+                (date_updated_gt - BASE_TIMESTAMP) // UPDATE_STEP + 1, 0
+            )
+        start = first + page * PAGE_SIZE
+        stop = min(start + PAGE_SIZE, config.tasks)
+        tasks = [
+            make_task(config.seed, index, list_id)
+            for index in range(start, stop)
+        ]
+        return {'tasks': tasks, 'last_page': stop >= config.tasks}
+
+    @app.get('/api/v2/task/bulk_time_in_status/task_ids')
+    async def bulk_time_in_status(task_ids: List[str] = Query(...)):
+        return {
+            value: make_time_in_status(config.seed, index)
+            for value, index in ((value, task_index(value)) for value in task_ids)
+            if index is not None and index < config.tasks
+        }
+
+    @app.get('/api/v2/task/{task_id}/time_in_status')
+    async def time_in_status(task_id: str):
+        index = task_index(task_id)
+        if index is None or index >= config.tasks:
+            return _not_found()
+        return make_time_in_status(config.seed, index)
+
+    @app.get('/api/v2/task/{task_id}')
+    async def get_task(task_id: str):
+        index = task_index(task_id)
+        if index is None or index >= config.tasks:
+            return _not_found()
+        return make_task(config.seed, index, 'mock')
+
+    return app
+
+
+def _not_found() -> JSONResponse:
+    return JSONResponse(
+        {'err': 'Task not found, deleted', 'ECODE': 'ITEM_013'},
+        status_code=404,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tasks', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument(
+        '--rate-limit', type=int, default=0, help='Requisições por minuto'
+    )
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    config = MockConfig(
+        args.tasks, args.seed, args.latency, args.jitter, args.rate_limit
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,347 @@
+"""
+Benchmarks offline do pipeline, contra o servidor simulado do ClickUp.
+
+Mede `extract_field_values` (passada única e por regex), `filter_tasks`
+(por linha e colunar), `get_tasks` com cache frio e quente (Redis em
+memória via fakeredis) e, com `--postgres`, `save_to_postgres` no banco
+configurado em `DB_*`.
+
+Os tempos são divididos pelo de uma carga fixa de calibração, para que
+máquinas diferentes sejam comparáveis, e confrontados com
+`benchmarks/baselines.json`: um caso mais lento que o baseline além da
+tolerância faz o comando terminar com código 1.
+
+Uso:
+    python -m benchmarks.run --tasks 5000
+    python -m benchmarks.run --tasks 5000 --update-baselines
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import sys
+import time
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.mock_clickup import (
+    MOCK_BASE_URL,
+    MockConfig,
+    create_app,
+    make_task,
+    make_time_in_status,
+)
+from src.api.clickup_api import ClickUpAPI
+from src.api.rate_limiter import RateLimiter
+from src.cache.async_redis_cache import AsyncRedisCache
+from src.cache.local_cache import LocalCache
+from src.utils.task_utils import filter_tasks, filter_tasks_frames
+from src.utils.text_utils import (
+    extract_field_values,
+    extract_field_values_regex,
+    parse_task_text,
+)
+
+BASELINES_PATH = Path(__file__).with_name('baselines.json')
+DEFAULT_TOLERANCE = 0.5
+# Abaixo de 1% da calibração (décimos de ms) a medição é dominada por ruído
+NOISE_FLOOR = 0.01
+LIST_ID = '900100'
+
+
+@dataclass
+class BenchContext:
+    tasks: int
+    timezone: str
+    loop: asyncio.AbstractEventLoop
+    mock: MockConfig
+    client_rate: int
+    raw_tasks: List[Dict]
+
+
+def calibrate(repeat: int = 5) -> float:
+    """Tempo de uma carga fixa em Python puro (texto, hash e ordenação)."""
+    rng = random.Random(0)
+    words = [f'{rng.random():.8f}' for _ in range(20_000)]
+
+    def workload():
+        text = ' '.join(words)
+        hashlib.sha256(text.encode()).hexdigest()
+        sorted(words, key=lambda word: word[::-1])
+        {word: len(word) for word in text.split()}
+
+    return measure(workload, repeat=repeat)
+
+
+def measure(
+    run: Callable[[], None],
+    setup: Optional[Callable[[], None]] = None,
+    repeat: int = 5,
+) -> float:
+    """Menor tempo entre `repeat` execuções; `setup` não é cronometrado."""
+    best = float('inf')
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def make_cache(local: bool = False) -> AsyncRedisCache:
+    import fakeredis
+
+    cache = AsyncRedisCache(
+        'localhost',
+        6379,
+        None,
+        None,
+        local_cache=LocalCache(2**30, 8, 3600) if local else None,
+    )
+    cache.redis = fakeredis.FakeAsyncRedis()
+    return cache
+
+
+def make_api(ctx: BenchContext, cache: AsyncRedisCache) -> ClickUpAPI:
+    api = ClickUpAPI(
+        'bench-key',
+        ctx.timezone,
+        cache,
+        base_url=MOCK_BASE_URL,
+        transport=httpx.ASGITransport(app=create_app(ctx.mock)),
+    )
+    # O que se mede é o pipeline, não o ritmo imposto pelo limite local
+    api.rate_limiter = RateLimiter(ctx.client_rate)
+    return api
+
+
+def bench_extract_field_values(
+    ctx: BenchContext, repeat: int, extract: Callable = extract_field_values
+) -> float:
+    texts = [task['text_content'] for task in ctx.raw_tasks]
+
+    def run():
+        for text in texts:
+            extract(parse_task_text(text))
+
+    return measure(run, repeat=repeat)
+
+
+def bench_filter_tasks_rows(ctx: BenchContext, repeat: int) -> float:
+    return measure(
+        lambda: filter_tasks(ctx.raw_tasks, ctx.timezone), repeat=repeat
+    )
+
+
+def bench_filter_tasks_columnar(ctx: BenchContext, repeat: int) -> float:
+    return measure(
+        lambda: filter_tasks_frames(ctx.raw_tasks, ctx.timezone),
+        repeat=repeat,
+    )
+
+
+def bench_get_tasks_cold(ctx: BenchContext, repeat: int) -> float:
+    state = {}
+
+    def setup():
+        state['api'] = make_api(ctx, make_cache())
+
+    def run():
+        tasks = ctx.loop.run_until_complete(state['api'].get_tasks(LIST_ID))
+        assert len(tasks) == ctx.tasks
+
+    return measure(run, setup, repeat)
+
+
+def bench_get_tasks_warm(
+    ctx: BenchContext, repeat: int, local: bool = False
+) -> float:
+    api = make_api(ctx, make_cache(local))
+    ctx.loop.run_until_complete(api.get_tasks(LIST_ID))
+
+    def run():
+        tasks = ctx.loop.run_until_complete(api.get_tasks(LIST_ID))
+        assert len(tasks) == ctx.tasks
+
+    return measure(run, repeat=repeat)
+
+
+def bench_save_to_postgres(ctx: BenchContext, repeat: int) -> float:
+    from sqlalchemy import text
+
+    from src.config import settings
+    from src.db.postgres import PostgresDB
+
+    db = PostgresDB(
+        settings.DB_HOST,
+        settings.DB_PORT,
+        settings.DB_NAME,
+        settings.DB_USER,
+        settings.DB_PASS,
+        settings.DB_SCHEMA or 'public',
+    )
+    df_tasks, _ = filter_tasks_frames(ctx.raw_tasks, ctx.timezone)
+    try:
+        return measure(
+            lambda: db.save_to_postgres(df_tasks, 'bench_tasks'),
+            repeat=repeat,
+        )
+    finally:
+        with db.engine.begin() as conn:
+            conn.execute(
+                text(f'DROP TABLE IF EXISTS {db._qualify("bench_tasks")}')
+            )
+        db.engine.dispose()
+
+
+CASES = {
+    'extract_field_values': bench_extract_field_values,
+    'extract_field_values[regex]': partial(
+        bench_extract_field_values, extract=extract_field_values_regex
+    ),
+    'filter_tasks[rows]': bench_filter_tasks_rows,
+    'filter_tasks[columnar]': bench_filter_tasks_columnar,
+    'get_tasks[cold]': bench_get_tasks_cold,
+    'get_tasks[warm]': bench_get_tasks_warm,
+    'get_tasks[warm-l1]': partial(bench_get_tasks_warm, local=True),
+    'save_to_postgres': bench_save_to_postgres,
+}
+POSTGRES_CASES = {'save_to_postgres'}
+
+
+def load_baselines(path: Path) -> Dict:
+    if not path.exists():
+        return {'tolerance': DEFAULT_TOLERANCE, 'cases': {}}
+    return json.loads(path.read_text(encoding='utf-8'))
+
+
+def compare(
+    results: Dict[str, float], baselines: Dict, tolerance: float
+) -> List[str]:
+    """Imprime a comparação e retorna os casos que regrediram."""
+    regressions = []
+    print(f'{"caso":<40} {"relativo":>10} {"baseline":>10} {"variação":>10}')
+    for key, value in results.items():
+        baseline = baselines['cases'].get(key)
+        if baseline is None:
+            print(f'{key:<40} {value:>10.3f} {"novo":>10}')
+            continue
+        change = value / baseline - 1
+        flag = ''
+        if change > tolerance and value > NOISE_FLOOR:
+            regressions.append(key)
+            flag = '  REGRESSÃO'
+        print(
+            f'{key:<40} {value:>10.3f} {baseline:>10.3f} '
+            f'{change:>+10.1%}{flag}'
+        )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        '--tasks', type=int, default=5000, help='Tarefas na lista simulada'
+    )
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timezone', default='America/Sao_Paulo')
+    parser.add_argument(
+        '--latency', type=float, default=0.0, help='Latência simulada (s)'
+    )
+    parser.add_argument(
+        '--jitter', type=float, default=0.0, help='Jitter simulado (s)'
+    )
+    parser.add_argument(
+        '--rate-limit',
+        type=int,
+        default=0,
+        help='Limite do servidor simulado, em requisições por minuto',
+    )
+    parser.add_argument(
+        '--client-rate',
+        type=int,
+        default=1_000_000,
+        help='Limite local do cliente, em requisições por minuto',
+    )
+    parser.add_argument(
+        '--only', action='append', help='Roda só os casos com este trecho'
+    )
+    parser.add_argument(
+        '--postgres',
+        action='store_true',
+        help='Inclui save_to_postgres (usa as variáveis DB_*)',
+    )
+    parser.add_argument('--baselines', type=Path, default=BASELINES_PATH)
+    parser.add_argument('--tolerance', type=float)
+    parser.add_argument(
+        '--update-baselines',
+        action='store_true',
+        help='Grava os resultados como novos baselines',
+    )
+    args = parser.parse_args(argv)
+
+    mock = MockConfig(
+        args.tasks, args.seed, args.latency, args.jitter, args.rate_limit
+    )
+    raw_tasks = []
+    for index in range(args.tasks):
+        task = make_task(args.seed, index, LIST_ID)
+        task['time_in_status'] = make_time_in_status(args.seed, index)
+        raw_tasks.append(task)
+    loop = asyncio.new_event_loop()
+    ctx = BenchContext(
+        args.tasks, args.timezone, loop, mock, args.client_rate, raw_tasks
+    )
+
+    names = [
+        name
+        for name in CASES
+        if (args.postgres or name not in POSTGRES_CASES)
+        and (not args.only or any(part in name for part in args.only))
+    ]
+    calibration = calibrate()
+    print(f'calibração: {calibration * 1000:.1f} ms')
+    results = {}
+    try:
+        for name in names:
+            elapsed = CASES[name](ctx, args.repeat)
+            print(f'{name}: {elapsed * 1000:.1f} ms')
+            results[f'{name}@{args.tasks}'] = round(elapsed / calibration, 4)
+    finally:
+        loop.close()
+
+    baselines = load_baselines(args.baselines)
+    if args.update_baselines:
+        baselines['cases'].update(results)
+        baselines['cases'] = dict(sorted(baselines['cases'].items()))
+        args.baselines.write_text(
+            json.dumps(baselines, indent=2, ensure_ascii=False) + '\n',
+            encoding='utf-8',
+        )
+        print(f'baselines gravados em {args.baselines}')
+        return 0
+
+    tolerance = (
+        args.tolerance
+        if args.tolerance is not None
+        else baselines.get('tolerance', DEFAULT_TOLERANCE)
+    )
+    regressions = compare(results, baselines, tolerance)
+    if regressions:
+        print(
+            f'{len(regressions)} caso(s) acima da tolerância de '
+            f'{tolerance:.0%}'
+        )
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""
+Configuração do gunicorn com workers do uvicorn.
+
+    gunicorn src.main:app -c gunicorn.conf.py
+
+Cada worker é um processo com o próprio event loop e cria seus clientes
+(Redis, PostgreSQL, ClickUp) no lifespan do FastAPI, depois do fork. Locks,
+orçamento de requisições ao ClickUp e estado dos jobs ficam no Redis.
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+# Métricas do Prometheus agregadas entre os workers (ver `/metrics`). A
+# variável precisa existir antes de qualquer importação do
+# prometheus_client, que escolhe nesse momento onde guardar os valores. O
+# diretório é esvaziado a cada início, antes de os workers gravarem nele
+os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR',
+    os.path.join(tempfile.gettempdir(), 'prometheus-metrics'),
+)
+_metrics_dir = os.environ['PROMETHEUS_MULTIPROC_DIR']
+shutil.rmtree(_metrics_dir, ignore_errors=True)
+os.makedirs(_metrics_dir, exist_ok=True)
+
+bind = os.getenv('BIND', '0.0.0.0:8000')
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'uvicorn.workers.UvicornWorker'
+# Importa a aplicação uma vez no mestre; nenhum cliente é criado na
+# importação, então não há conexões herdadas pelos workers
+preload_app = True
+# Varreduras longas rodam em jobs, mas exportações grandes levam tempo
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = 5
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,71 @@
+"""
+Reenvia eventos de webhook do ClickUp para uma instância local da API.
+
+Lê um arquivo JSON (lista de eventos) ou NDJSON (um evento por linha),
+assina cada corpo com o segredo do webhook, como faz o ClickUp, e envia os
+eventos em ordem para `/webhooks/clickup`.
+
+Uso:
+    python scripts/replay_webhooks.py eventos.ndjson \
+        --url http://localhost:8000/webhooks/clickup --delay 0.5
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.api.webhooks import sign  # noqa: E402
+
+
+def load_events(path: Path) -> List[Dict]:
+    content = path.read_text(encoding='utf-8').strip()
+    if content.startswith('['):
+        return json.loads(content)
+    return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('events', type=Path, help='Arquivo JSON ou NDJSON')
+    parser.add_argument(
+        '--url', default='http://localhost:8000/webhooks/clickup'
+    )
+    parser.add_argument(
+        '--secret',
+        default=os.getenv('WEBHOOK_SECRET'),
+        help='Segredo do webhook (padrão: $WEBHOOK_SECRET)',
+    )
+    parser.add_argument(
+        '--delay', type=float, default=0.0, help='Segundos entre eventos'
+    )
+    args = parser.parse_args()
+    if not args.secret:
+        parser.error('informe --secret ou defina WEBHOOK_SECRET')
+
+    with httpx.Client(timeout=30) as client:
+        for event in load_events(args.events):
+            body = json.dumps(event).encode()
+            response = client.post(
+                args.url,
+                content=body,
+                headers={
+                    'Content-Type': 'application/json',
+                    'X-Signature': sign(body, args.secret),
+                },
+            )
+            print(
+                f"{event.get('event')} {event.get('task_id')}: "
+                f'{response.status_code} {response.text}'
+            )
+            time.sleep(args.delay)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,85 +1,800 @@
 import asyncio
 import logging
-from typing import Dict, List, Union
+import time
+import uuid
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import (
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Union,
+)
 
 import httpx
 from fastapi import HTTPException
 
+from src.api.rate_limiter import RateLimiter, retry_delay
+from src.config import settings
+from src.jobs.pipeline import Chunk, CrawlPlan, SinkUnavailable, run_pipeline
 from src.utils.date_utils import parse_date
+from src.utils.metrics import (
+    CLICKUP_RATE_LIMITED,
+    CLICKUP_REQUEST_SECONDS,
+    CLICKUP_RETRIES,
+    CRAWL_PAGES,
+    CRAWL_SECONDS,
+    CRAWL_TASKS,
+    endpoint_label,
+    timed,
+)
+from src.utils.projection import project_task, project_time_in_status
 from src.utils.task_utils import filter_tasks
-from src.utils.time_utils import fetch_time_in_status
-#ok
+from src.utils.time_utils import (
+    BULK_TIME_IN_STATUS_LIMIT,
+    fetch_bulk_time_in_status,
+    fetch_time_in_status,
+)
+
+# ok
 logger = logging.getLogger(__name__)
 
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+TASK_URL = '/task/{task_id}'
+
+
+class SyncResult(NamedTuple):
+    tasks: List[Dict]
+    changed: List[Dict]
+    removed_ids: Set[str]
+    watermark: int
+
+
+class TaskPatch(NamedTuple):
+    list_id: str
+    task_id: str
+    task: Optional[Dict]
+
 
 class ClickUpAPI:
-    def __init__(self, api_key: str, timezone: str, redis_cache):
+    def __init__(
+        self,
+        api_key: str,
+        timezone: str,
+        redis_cache,
+        base_url: str = settings.CLICKUP_BASE_URL,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        crawl_plan: Optional[Callable[[str, Dict], CrawlPlan]] = None,
+        rate_limiter=None,
+    ):
+        """
+        As URLs das requisições são relativas a `base_url`; `transport`
+        permite trocar a rede por um servidor local ou simulado (testes e
+        benchmarks). `crawl_plan(list_id, manifest)` acrescenta
+        transformação e destinos às varreduras completas em pipeline (ver
+        `_crawl_list`). Sem `rate_limiter`, o orçamento de requisições é
+        local ao processo (`RateLimiter`); com vários workers, passe um
+        `RedisRateLimiter`.
+        """
         if not api_key:
             raise ValueError('API key must be provided')
 
         self.api_key = api_key
         self.timezone = timezone
+        self.base_url = base_url
+        self.transport = transport
         self.headers = {'Authorization': api_key}
         self.semaphore = asyncio.Semaphore(10)
+        self.rate_limiter = rate_limiter or RateLimiter(
+            settings.RATE_LIMIT_PER_MINUTE
+        )
         self.cache = redis_cache
+        self.client = None
+        self.crawl_plan = crawl_plan
+        # Atualizações em andamento por lista (single-flight no processo)
+        self._refreshes: Dict[str, asyncio.Future] = {}
 
-    async def fetch_clickup_data(self, url: str, query: Dict) -> Dict:
-        try:
-            async with self.semaphore, httpx.AsyncClient(
-                timeout=300.0
-            ) as client:
-                response = await client.get(
-                    url, headers=self.headers, params=query
+    def _build_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            transport=self.transport,
+            headers=self.headers,
+            http2=settings.HTTP2,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                connect=settings.HTTP_CONNECT_TIMEOUT,
+                read=settings.HTTP_READ_TIMEOUT,
+                write=settings.HTTP_WRITE_TIMEOUT,
+                pool=settings.HTTP_POOL_TIMEOUT,
+            ),
+        )
+
+    async def start(self) -> None:
+        """Abre o cliente HTTP compartilhado (chamado no lifespan do app)."""
+        if self.client is None or self.client.is_closed:
+            self.client = self._build_client()
+
+    async def close(self) -> None:
+        """Fecha o cliente HTTP compartilhado e libera as conexões."""
+        for refresh in list(self._refreshes.values()):
+            refresh.cancel()
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        # Fora do lifespan (scripts, testes) o cliente é criado sob demanda
+        if self.client is None or self.client.is_closed:
+            await self.start()
+        return self.client
+
+    async def _request(
+        self, url: str, query: Optional[Dict] = None
+    ) -> httpx.Response:
+        """
+        Ponto único de saída para a API do ClickUp.
+
+        Toda requisição passa pelo token bucket e pelo semáforo; respostas
+        429/5xx e falhas de transporte são repetidas com backoff exponencial
+        com jitter, respeitando `Retry-After`.
+        """
+        client = await self._get_client()
+        endpoint = endpoint_label(
+            self.base_url.rstrip('/') + url if url.startswith('/') else url
+        )
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire()
+            start = time.perf_counter()
+            try:
+                async with self.semaphore:
+                    response = await client.get(url, params=query)
+            except httpx.TransportError as e:
+                CLICKUP_REQUEST_SECONDS.labels(endpoint, 'error').observe(
+                    time.perf_counter() - start
                 )
-                response.raise_for_status()
-                return response.json()
+                if attempt >= settings.MAX_RETRIES:
+                    raise
+                CLICKUP_RETRIES.labels(endpoint, 'transport').inc()
+                delay = retry_delay(
+                    {},
+                    attempt,
+                    settings.RETRY_BACKOFF_BASE,
+                    settings.RETRY_BACKOFF_MAX,
+                )
+                logger.warning(
+                    f'Transport error on {url}: {e}; retrying in {delay:.1f}s'
+                )
+            else:
+                CLICKUP_REQUEST_SECONDS.labels(
+                    endpoint, str(response.status_code)
+                ).observe(time.perf_counter() - start)
+                await self.rate_limiter.update_from_headers(response.headers)
+                if response.status_code == 429:
+                    CLICKUP_RATE_LIMITED.labels(endpoint).inc()
+                if (
+                    response.status_code not in RETRY_STATUS_CODES
+                    or attempt >= settings.MAX_RETRIES
+                ):
+                    response.raise_for_status()
+                    return response
+                CLICKUP_RETRIES.labels(
+                    endpoint, str(response.status_code)
+                ).inc()
+                delay = retry_delay(
+                    response.headers,
+                    attempt,
+                    settings.RETRY_BACKOFF_BASE,
+                    settings.RETRY_BACKOFF_MAX,
+                )
+                if response.status_code == 429:
+                    await self.rate_limiter.block_for(delay)
+                logger.warning(
+                    f'ClickUp returned {response.status_code} for {url}; '
+                    f'retrying in {delay:.1f}s'
+                )
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def fetch_clickup_data(
+        self, url: str, query: Optional[Dict] = None
+    ) -> Dict:
+        try:
+            response = await self._request(url, query)
+            return response.json()
         except httpx.RequestError as e:
             raise HTTPException(
                 status_code=500, detail=f'HTTP error: {str(e)}'
             )
 
-    async def fetch_all_tasks(self, url: str, query: Dict) -> List[Dict]:
+    async def iter_task_pages(
+        self, url: str, query: Dict, window: Optional[int] = None
+    ) -> AsyncIterator[List[Dict]]:
+        """
+        Percorre as páginas de tarefas mantendo até `window` páginas em voo.
+
+        As páginas são entregues em ordem. Ao encontrar `last_page` (ou uma
+        página vazia), as requisições especulativas além do fim são canceladas.
+        """
+        window = window or settings.PAGE_WINDOW
+        pending: Dict[int, asyncio.Task] = {}
+        next_page = 0
+        current_page = 0
+        try:
+            while True:
+                while len(pending) < window:
+                    pending[next_page] = asyncio.create_task(
+                        self.fetch_clickup_data(
+                            url, {**query, 'page': next_page}
+                        )
+                    )
+                    next_page += 1
+                data = await pending.pop(current_page)
+                page_tasks = data.get('tasks', [])
+                if page_tasks:
+                    yield page_tasks
+                if not page_tasks or data.get('last_page'):
+                    break
+                current_page += 1
+        finally:
+            for request in pending.values():
+                request.cancel()
+            await asyncio.gather(*pending.values(), return_exceptions=True)
+
+    async def iter_unique_pages(
+        self, url: str, query: Dict, window: Optional[int] = None
+    ) -> AsyncIterator[List[Dict]]:
+        """
+        Como `iter_task_pages`, sem repetir tarefas entre páginas e com cada
+        tarefa já reduzida por `project_task`.
+        """
+        seen_ids = set()
+        async for page_tasks in self.iter_task_pages(url, query, window):
+            unique = []
+            for task in page_tasks:
+                task_id = task.get('id')
+                if task_id is not None:
+                    # Paginação por offset pode repetir tarefas entre páginas
+                    if task_id in seen_ids:
+                        continue
+                    seen_ids.add(task_id)
+                unique.append(project_task(task))
+            if unique:
+                yield unique
+
+    async def fetch_all_tasks(
+        self, url: str, query: Dict, window: Optional[int] = None
+    ) -> List[Dict]:
         tasks = []
-        page = 0
-        while True:
-            query['page'] = page
-            data = await self.fetch_clickup_data(url, query)
-            page_tasks = data.get('tasks', [])
-            if not page_tasks:
-                break
+        async for page_tasks in self.iter_unique_pages(url, query, window):
             tasks.extend(page_tasks)
-            page += 1
         return tasks
 
-    async def fetch_all_time_in_status(self, tasks: List[Dict]) -> None:
-        async with httpx.AsyncClient() as client:
-            tasks_with_time_in_status = await asyncio.gather(
+    async def _fetch_time_in_status_batch(
+        self, task_ids: List[str]
+    ) -> Dict[str, Dict]:
+        result = {}
+        if settings.BULK_TIME_IN_STATUS and len(task_ids) > 1:
+            try:
+                result = await fetch_bulk_time_in_status(
+                    task_ids, self.fetch_clickup_data
+                )
+            except (HTTPException, httpx.HTTPStatusError) as e:
+                logger.warning(
+                    f'Bulk time in status failed ({e}); '
+                    'falling back to per-task requests'
+                )
+                result = {}
+        # Tarefas ausentes da resposta em lote seguem pelo caminho unitário
+        missing = [task_id for task_id in task_ids if task_id not in result]
+        if missing:
+            per_task = await asyncio.gather(
                 *[
-                    fetch_time_in_status(task['id'], client, self.headers)
-                    for task in tasks
-                    if 'id' in task
+                    fetch_time_in_status(task_id, self.fetch_clickup_data)
+                    for task_id in missing
                 ]
             )
-            for task, time_in_status in zip(tasks, tasks_with_time_in_status):
-                task['time_in_status'] = time_in_status
+            result.update(zip(missing, per_task))
+        return result
 
-    async def get_tasks(
-        self, list_id: str
-    ) -> List[Dict[str, Union[str, None]]]:
-        cache_key = f'tasks_{list_id}'
-        cached_tasks = self.cache.get(cache_key)
-        if cached_tasks:
-            logger.info('Using cached data')
-            return cached_tasks
+    async def fetch_all_time_in_status(self, tasks: List[Dict]) -> None:
+        task_ids = [task['id'] for task in tasks if 'id' in task]
+        batches = [
+            task_ids[start : start + BULK_TIME_IN_STATUS_LIMIT]
+            for start in range(0, len(task_ids), BULK_TIME_IN_STATUS_LIMIT)
+        ]
+        time_in_status = {}
+        for batch_result in await asyncio.gather(
+            *[self._fetch_time_in_status_batch(batch) for batch in batches]
+        ):
+            time_in_status.update(batch_result)
+        for task in tasks:
+            if 'id' in task:
+                task['time_in_status'] = project_time_in_status(
+                    time_in_status.get(task['id'], {})
+                )
 
-        url = f'https://api.clickup.com/api/v2/list/{list_id}/task'
-        query = {
+    def _list_url(self, list_id: str) -> str:
+        return f'/list/{list_id}/task'
+
+    def _list_query(self) -> Dict:
+        # Sem `include_markdown_description`: a transformação lê apenas
+        # `text_content`, que sempre vem na resposta
+        return {
             'archived': 'false',
-            'include_markdown_description': 'true',
             'page_size': 100,
         }  # Use a page size if supported
-        tasks = await self.fetch_all_tasks(url, query)
+
+    async def _enrich_page(self, page_tasks: List[Dict]) -> List[Dict]:
+        await self.fetch_all_time_in_status(page_tasks)
+        return [task for task in page_tasks if 'id' in task]
+
+    async def fetch_list_tasks(self, list_id: str) -> List[Dict]:
+        """Baixa e enriquece todas as tarefas ativas de uma lista."""
+        tasks = []
+        pages = 0
+        async for page_tasks in self.iter_unique_pages(
+            self._list_url(list_id), self._list_query()
+        ):
+            pages += 1
+            tasks.extend(page_tasks)
+        CRAWL_PAGES.labels(list_id).observe(pages)
+        CRAWL_TASKS.labels(list_id, 'full').observe(len(tasks))
         await self.fetch_all_time_in_status(tasks)
-        valid_tasks = [task for task in tasks if 'id' in task]
-        self.cache.set(cache_key, valid_tasks)
-        return valid_tasks
+        return [task for task in tasks if 'id' in task]
+
+    async def iter_list_tasks(self, list_id: str) -> AsyncIterator[List[Dict]]:
+        """
+        Entrega as tarefas ativas da lista por página, já enriquecidas.
+
+        Um snapshot ainda válido no cache é servido em blocos do mesmo
+        tamanho; caso contrário cada página do ClickUp é enriquecida com o
+        tempo em status e entregue assim que chega, sem acumular a lista
+        inteira em memória (e, por isso, sem gravar o snapshot).
+        """
+        query = self._list_query()
+        snapshot = await self.cache.get_list(list_id)
+        fresh = (
+            snapshot
+            and time.time() - snapshot['synced_at'] < settings.CACHE_TTL
+        )
+        if fresh:
+            tasks = snapshot['tasks']
+            for start in range(0, len(tasks), query['page_size']):
+                yield tasks[start : start + query['page_size']]
+            return
+        async for page_tasks in self.iter_unique_pages(
+            self._list_url(list_id), query
+        ):
+            page_tasks = await self._enrich_page(page_tasks)
+            if page_tasks:
+                yield page_tasks
+
+    async def sync_list_tasks(
+        self, list_id: str, tasks: List[Dict], watermark: int
+    ) -> SyncResult:
+        """
+        Atualiza um snapshot de tarefas apenas com o que mudou na lista.
+
+        Busca as tarefas com `date_updated` posterior ao `watermark`,
+        incluindo fechadas e arquivadas. Tarefas fechadas ou arquivadas saem
+        do snapshot (a varredura completa também as ignora); as demais são
+        enriquecidas com o tempo em status e mescladas por ID.
+
+        Returns:
+            SyncResult com a lista mesclada, as tarefas alteradas, os IDs
+            removidos e a nova marca d'água.
+        """
+        query = {
+            'include_closed': 'true',
+            'date_updated_gt': watermark,
+            'page_size': 100,
+        }
+        url = self._list_url(list_id)
+        # Janela 1: a resposta costuma caber em uma página
+        active, archived = await asyncio.gather(
+            self.fetch_all_tasks(url, {**query, 'archived': 'false'}, 1),
+            self.fetch_all_tasks(url, {**query, 'archived': 'true'}, 1),
+        )
+        CRAWL_TASKS.labels(list_id, 'incremental').observe(
+            len(active) + len(archived)
+        )
+        removed_ids = {task['id'] for task in archived if 'id' in task}
+        changed = []
+        for task in active:
+            if 'id' not in task or task['id'] in removed_ids:
+                continue
+            if task.get('status', {}).get('type') == 'closed':
+                removed_ids.add(task['id'])
+            else:
+                changed.append(task)
+        await self.fetch_all_time_in_status(changed)
+        logger.info(
+            f'Incremental sync of list {list_id}: {len(changed)} changed, '
+            f'{len(removed_ids)} removed'
+        )
+
+        changed_by_id = {task['id']: task for task in changed}
+        merged = []
+        known_ids = set()
+        for task in tasks:
+            known_ids.add(task['id'])
+            if task['id'] in removed_ids:
+                continue
+            merged.append(changed_by_id.pop(task['id'], task))
+        merged.extend(changed_by_id.values())
+        return SyncResult(
+            merged,
+            changed,
+            removed_ids & known_ids,
+            latest_update(active + archived, watermark),
+        )
+
+    async def get_tasks(
+        self, list_id: str
+    ) -> List[Dict[str, Union[str, None]]]:
+        snapshot = await self.get_snapshot(list_id)
+        return await self.snapshot_tasks(list_id, snapshot)
+
+    async def snapshot_tasks(self, list_id: str, snapshot: Dict) -> List[Dict]:
+        """
+        Tarefas de um snapshot de `get_snapshot`/`refresh_snapshot`.
+
+        Após uma varredura em pipeline o snapshot volta sem `tasks` (elas
+        nunca estiveram todas em memória) e são lidas do cache. Se ele já
+        tiver sido substituído, vale a versão mais nova; se tiver sumido, a
+        lista é baixada de novo.
+        """
+        if 'tasks' in snapshot:
+            return snapshot['tasks']
+        stored = await self.cache.get_list(list_id)
+        if stored is not None:
+            return stored['tasks']
+        return await self.fetch_list_tasks(list_id)
+
+    async def get_snapshot(self, list_id: str) -> Dict:
+        """
+        Retorna o snapshot da lista: o manifesto (`version`, `synced_at`,
+        `full_synced_at`, ...) com as tarefas em `tasks`, exceto logo após
+        uma varredura em pipeline (ver `snapshot_tasks`).
+        """
+        snapshot = await self.cache.get_list(list_id)
+        if snapshot:
+            age = time.time() - snapshot['synced_at']
+            if age < settings.CACHE_TTL:
+                logger.info('Using cached data')
+                return snapshot
+            if age < settings.CACHE_STALE_TTL:
+                # Stale-while-revalidate: responde já e atualiza em segundo plano
+                logger.info('Serving stale data while refreshing')
+                self._refresh(list_id)
+                return snapshot
+        # shield: um cliente que desiste não cancela a atualização compartilhada
+        return await asyncio.shield(self._refresh(list_id))
+
+    async def refresh_snapshot(self, list_id: str, max_age: float) -> Dict:
+        """
+        Garante um snapshot com no máximo `max_age` segundos e o retorna.
+
+        Usado pelo agendador: ao contrário de `get_snapshot`, nunca devolve
+        dados vencidos enquanto atualiza em segundo plano.
+        """
+        return await asyncio.shield(self._refresh(list_id, max_age))
+
+    def _refresh(
+        self, list_id: str, max_age: Optional[float] = None
+    ) -> asyncio.Future:
+        """Retorna a atualização em andamento da lista, criando-a se preciso."""
+        refresh = self._refreshes.get(list_id)
+        if refresh is None:
+            refresh = asyncio.ensure_future(
+                self._refresh_shared(list_id, max_age)
+            )
+            self._refreshes[list_id] = refresh
+            refresh.add_done_callback(partial(self._refresh_done, list_id))
+        return refresh
+
+    def _refresh_done(self, list_id: str, refresh: asyncio.Future) -> None:
+        self._refreshes.pop(list_id, None)
+        if not refresh.cancelled() and refresh.exception() is not None:
+            logger.error(
+                f'Refresh of list {list_id} failed: {refresh.exception()}'
+            )
+
+    async def _refresh_shared(
+        self, list_id: str, max_age: Optional[float] = None
+    ) -> Dict:
+        """
+        Sincroniza a lista sob um lock Redis compartilhado entre workers.
+
+        Quem não obtém o lock aguarda o outro worker terminar e reaproveita
+        o snapshot gravado por ele (se tiver menos de `max_age` segundos,
+        por padrão `CACHE_TTL`), em vez de repetir a varredura.
+        """
+        if max_age is None:
+            max_age = settings.CACHE_TTL
+        async with self.list_lock(list_id):
+            snapshot = await self.cache.get_list(list_id, local=False)
+            if snapshot and time.time() - snapshot['synced_at'] < max_age:
+                logger.info(f'List {list_id} was refreshed by another worker')
+                return snapshot
+            with timed(
+                CRAWL_SECONDS, list_id=list_id, mode=sync_mode(snapshot)
+            ):
+                return await self._sync_tasks(list_id, snapshot)
+
+    @asynccontextmanager
+    async def list_lock(
+        self, list_id: str, scope: str = 'tasks'
+    ) -> AsyncIterator[None]:
+        """
+        Detém o lock Redis `{scope}:{list_id}` durante o bloco.
+
+        `tasks` protege o snapshot da lista (varreduras e webhooks); outros
+        escopos servem a trabalhos que não devem esperar por uma varredura.
+        O lock expira em `REFRESH_LOCK_TTL` segundos, mas é renovado
+        enquanto o bloco roda: uma varredura mais longa que o TTL não o
+        perde para outro worker. Se o processo morrer, ele expira.
+        """
+        lock_name = f'{scope}:{list_id}'
+        while True:
+            token = await self.cache.acquire_lock(
+                lock_name, settings.REFRESH_LOCK_TTL
+            )
+            if token is not None:
+                break
+            await asyncio.sleep(settings.REFRESH_POLL_INTERVAL)
+        renewal = asyncio.ensure_future(self._renew_lock(lock_name, token))
+        try:
+            yield
+        finally:
+            renewal.cancel()
+            await asyncio.gather(renewal, return_exceptions=True)
+            await self.cache.release_lock(lock_name, token)
+
+    async def _renew_lock(self, lock_name: str, token: str):
+        while True:
+            await asyncio.sleep(settings.REFRESH_LOCK_TTL / 3)
+            if not await self.cache.extend_lock(
+                lock_name, token, settings.REFRESH_LOCK_TTL
+            ):
+                logger.warning(f'Lock {lock_name} expired before renewal')
+                return
+
+    async def fetch_task(self, task_id: str) -> Optional[Dict]:
+        """Busca uma tarefa com o tempo em status; `None` se não existir."""
+        try:
+            task = await self.fetch_clickup_data(
+                TASK_URL.format(task_id=task_id)
+            )
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return None
+            raise
+        task = project_task(task)
+        await self.fetch_all_time_in_status([task])
+        return task
+
+    async def patch_task(
+        self, task_id: str, deleted: bool, list_ids: Iterable[str] = ()
+    ) -> List[TaskPatch]:
+        """
+        Atualiza uma única tarefa nos snapshots em cache.
+
+        A tarefa é buscada de novo (a menos que `deleted`) e regravada no
+        snapshot da sua lista atual. Nas demais listas de `list_ids` ela é
+        removida, o que cobre tarefas movidas de lista; tarefas excluídas,
+        arquivadas ou fechadas saem de todos os snapshots, como na
+        sincronização incremental. A marca d'água não avança, para não
+        pular alterações ainda não sincronizadas de outras tarefas.
+
+        Returns:
+            Um `TaskPatch` por lista alterada; `task` é `None` se a tarefa
+            saiu da lista.
+        """
+        task = None if deleted else await self.fetch_task(task_id)
+        current_list = None
+        if task is not None:
+            if not (
+                task.get('archived')
+                or task.get('status', {}).get('type') == 'closed'
+            ):
+                current_list = task['list']['id']
+            list_ids = [task['list']['id'], *list_ids]
+
+        patches = []
+        for list_id in dict.fromkeys(list_ids):
+            # Só a lista atual mantém a tarefa; das outras ela sai
+            kept = task if list_id == current_list else None
+            async with self.list_lock(list_id):
+                snapshot = await self.cache.get_list(list_id, local=False)
+                if not snapshot:
+                    # Sem snapshot, a próxima varredura traz a tarefa
+                    continue
+                ids = snapshot['ids']
+                if kept is None and task_id not in ids:
+                    continue
+                if kept is None:
+                    ids = [known for known in ids if known != task_id]
+                elif task_id not in ids:
+                    ids = [*ids, task_id]
+                manifest = {
+                    key: value
+                    for key, value in snapshot.items()
+                    if key != 'tasks'
+                }
+                manifest.update(ids=ids, version=snapshot['version'] + 1)
+                await self.cache.patch_list(
+                    list_id,
+                    [kept] if kept is not None else [],
+                    [task_id] if kept is None else [],
+                    manifest,
+                    settings.SNAPSHOT_TTL,
+                )
+                patches.append(TaskPatch(list_id, task_id, kept))
+        return patches
+
+    async def _sync_tasks(
+        self, list_id: str, snapshot: Optional[Dict]
+    ) -> Dict:
+        now = time.time()
+        manifest = {
+            'synced_at': now,
+            'version': snapshot['version'] + 1 if snapshot else 1,
+        }
+        if sync_mode(snapshot, now) == 'incremental':
+            result = await self.sync_list_tasks(
+                list_id, snapshot['tasks'], snapshot['watermark']
+            )
+            valid_tasks = result.tasks
+            if not result.changed and not result.removed_ids:
+                manifest['version'] = snapshot['version']
+            manifest.update(
+                ids=[task['id'] for task in valid_tasks],
+                watermark=result.watermark,
+                full_synced_at=snapshot['full_synced_at'],
+            )
+            # Apenas as tarefas alteradas são regravadas no cache
+            await self.cache.patch_list(
+                list_id,
+                result.changed,
+                result.removed_ids,
+                manifest,
+                settings.SNAPSHOT_TTL,
+            )
+        else:
+            manifest['full_synced_at'] = now
+            if settings.CRAWL_PIPELINE:
+                crawled = await self._crawl_list(list_id, manifest)
+                if crawled is not None:
+                    return crawled
+            valid_tasks = await self.fetch_list_tasks(list_id)
+            manifest.update(
+                ids=[task['id'] for task in valid_tasks],
+                watermark=latest_update(valid_tasks),
+            )
+            await self.cache.set_list(
+                list_id, valid_tasks, manifest, settings.SNAPSHOT_TTL
+            )
+        return {**manifest, 'tasks': valid_tasks}
+
+    async def _crawl_list(
+        self, list_id: str, manifest: Dict
+    ) -> Optional[Dict]:
+        """
+        Varredura completa em pipeline (ver `run_pipeline`).
+
+        As páginas seguem da busca ao enriquecimento, à transformação e aos
+        destinos de `crawl_plan` sem que a lista inteira fique em memória;
+        o snapshot é montado no Redis bloco a bloco e publicado por último.
+
+        Returns:
+            O manifesto publicado, sem `tasks`, ou `None` se um destino
+            ficou indisponível (o chamador refaz a varredura em memória).
+        """
+        plan = (
+            self.crawl_plan(list_id, manifest)
+            if self.crawl_plan is not None
+            else CrawlPlan()
+        )
+        snapshot_sink = SnapshotSink(
+            self.cache, list_id, manifest, settings.SNAPSHOT_TTL
+        )
+        pages = 0
+
+        async def counted_pages():
+            nonlocal pages
+            async for page_tasks in self.iter_unique_pages(
+                self._list_url(list_id), self._list_query()
+            ):
+                pages += 1
+                yield page_tasks
+
+        try:
+            written = await run_pipeline(
+                counted_pages(),
+                self._enrich_page,
+                # O snapshot é publicado depois dos demais destinos
+                [*plan.sinks, snapshot_sink],
+                plan.transform,
+                plan.run_in_worker,
+            )
+        except SinkUnavailable as e:
+            logger.warning(
+                f'Pipeline crawl of list {list_id} aborted ({e}); '
+                'crawling in memory'
+            )
+            return None
+        CRAWL_PAGES.labels(list_id).observe(pages)
+        CRAWL_TASKS.labels(list_id, 'full').observe(written)
+        return snapshot_sink.manifest
+
+
+class SnapshotSink:
+    """
+    Destino do pipeline que monta o snapshot da lista no cache.
+
+    As tarefas vão para um hash provisório a cada bloco; em `commit`, o
+    manifesto recebe os IDs (na ordem das páginas) e a marca d'água, e o
+    snapshot substitui o anterior de uma vez.
+    """
+
+    def __init__(self, cache, list_id: str, manifest: Dict, ttl: int):
+        self.cache = cache
+        self.list_id = list_id
+        self.manifest = manifest
+        self.ttl = ttl
+        self.token = uuid.uuid4().hex
+        self.ids: List[str] = []
+        self.watermark = 0
+
+    async def write(self, chunk: Chunk):
+        if not await self.cache.write_list_chunk(
+            self.list_id, self.token, chunk.tasks, self.ttl
+        ):
+            raise SinkUnavailable('cache write failed')
+        self.ids.extend(task['id'] for task in chunk.tasks)
+        self.watermark = latest_update(chunk.tasks, self.watermark)
+
+    async def commit(self):
+        self.manifest.update(ids=self.ids, watermark=self.watermark)
+        if not await self.cache.commit_list(
+            self.list_id, self.token, self.manifest, self.ttl
+        ):
+            raise SinkUnavailable('cache write failed')
+
+    async def abort(self):
+        await self.cache.discard_list(self.list_id, self.token)
+
+
+def sync_mode(snapshot: Optional[Dict], now: Optional[float] = None) -> str:
+    """`incremental` se o snapshot pode ser só atualizado, senão `full`."""
+    if (
+        snapshot
+        and settings.INCREMENTAL_SYNC
+        and (now or time.time()) - snapshot['full_synced_at']
+        < settings.FULL_SYNC_INTERVAL
+    ):
+        return 'incremental'
+    return 'full'
+
+
+def latest_update(tasks: List[Dict], default: int = 0) -> int:
+    """Retorna o maior `date_updated` (epoch ms) entre as tarefas."""
+    return max(
+        (
+            int(task['date_updated'])
+            for task in tasks
+            if task.get('date_updated')
+        ),
+        default=default,
+    )
@@ -0,0 +1,263 @@
+import asyncio
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+# Segundos sem uso após os quais o balde compartilhado é descartado
+BUCKET_TTL = 3600
+
+
+class RateLimiter:
+    """
+    Token bucket que controla o ritmo das requisições à API do ClickUp.
+
+    O balde é reabastecido continuamente a `requests_per_minute / 60` tokens
+    por segundo e é corrigido pelos cabeçalhos `X-RateLimit-*` de cada
+    resposta, de modo que o limite real do token prevalece sobre o local.
+    """
+
+    def __init__(self, requests_per_minute: int = 100):
+        self.capacity = float(requests_per_minute)
+        self.rate = self.capacity / 60
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+    async def acquire(self) -> None:
+        """Aguarda até que um token esteja disponível e o consome."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self.blocked_until - now
+                if wait <= 0:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+                await asyncio.sleep(wait)
+
+    async def block_for(self, seconds: float) -> None:
+        """Suspende novas requisições pelos próximos `seconds` segundos."""
+        self.blocked_until = max(
+            self.blocked_until, time.monotonic() + max(seconds, 0.0)
+        )
+
+    async def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Ajusta o balde a partir dos cabeçalhos de limite da resposta."""
+        limit, remaining, block = parse_limit_headers(headers)
+        if limit:
+            self.capacity = limit
+            self.rate = limit / 60
+        if remaining is None:
+            return
+        self._refill(time.monotonic())
+        self.tokens = min(self.tokens, remaining)
+        if block is not None:
+            await self.block_for(block)
+
+
+# Balde no Redis: `tokens`, `updated_at` e `blocked_until` em segundos do
+# relógio do Redis (TIME), comum a todos os processos; `capacity` vem de
+# `X-RateLimit-Limit`
+_ACQUIRE_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call(
+    'HMGET', KEYS[1], 'tokens', 'updated_at', 'blocked_until', 'capacity')
+local capacity = tonumber(state[4]) or tonumber(ARGV[1])
+local rate = capacity / 60
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(now - updated_at, 0) * rate)
+local wait = (tonumber(state[3]) or 0) - now
+if wait <= 0 then
+    if tokens >= 1 then
+        tokens = tokens - 1
+        wait = 0
+    else
+        wait = (1 - tokens) / rate
+    end
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return tostring(wait)
+"""
+
+# ARGV: capacidade padrão, TTL, limite, restantes, segundos de bloqueio
+# (vazios quando ausentes)
+_ADJUST_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call(
+    'HMGET', KEYS[1], 'tokens', 'updated_at', 'blocked_until', 'capacity')
+local capacity = tonumber(ARGV[3]) or tonumber(state[4]) or tonumber(ARGV[1])
+redis.call('HSET', KEYS[1], 'capacity', capacity)
+local remaining = tonumber(ARGV[4])
+if remaining then
+    local tokens = tonumber(state[1]) or capacity
+    local updated_at = tonumber(state[2]) or now
+    tokens = math.min(
+        capacity, tokens + math.max(now - updated_at, 0) * capacity / 60)
+    redis.call(
+        'HSET', KEYS[1], 'tokens', math.min(tokens, remaining),
+        'updated_at', now)
+end
+local block = tonumber(ARGV[5])
+if block then
+    local blocked_until = math.max(tonumber(state[3]) or 0, now + block)
+    redis.call('HSET', KEYS[1], 'blocked_until', blocked_until)
+end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+
+class RedisRateLimiter:
+    """
+    Token bucket compartilhado por todos os workers, guardado no Redis.
+
+    Mesma interface do `RateLimiter`: cada `acquire` consome um token do
+    balde `ratelimit:{name}` por meio de um script Lua atômico, e os
+    cabeçalhos `X-RateLimit-*` e os bloqueios por 429 valem para todos os
+    processos. Assim, o orçamento do token do ClickUp é dividido entre os
+    workers em vez de multiplicado por eles.
+
+    Se o Redis estiver indisponível, cada processo passa a usar um
+    `RateLimiter` local, como se estivesse sozinho.
+    """
+
+    def __init__(self, redis, name: str, requests_per_minute: int = 100):
+        self.redis = redis
+        self.key = f'ratelimit:{name}'
+        self.default_capacity = float(requests_per_minute)
+        self.local = RateLimiter(requests_per_minute)
+        # Um único coroutine por processo consulta o balde de cada vez
+        self._lock = asyncio.Lock()
+        self._acquire = redis.register_script(_ACQUIRE_SCRIPT)
+        self._adjust = redis.register_script(_ADJUST_SCRIPT)
+
+    async def acquire(self) -> None:
+        """Aguarda até que um token esteja disponível e o consome."""
+        async with self._lock:
+            while True:
+                try:
+                    wait = float(
+                        await self._acquire(
+                            keys=[self.key],
+                            args=[self.default_capacity, BUCKET_TTL],
+                        )
+                    )
+                except RedisError as e:
+                    logger.warning(
+                        f'Shared rate limit unavailable, using local: {e}'
+                    )
+                    await self.local.acquire()
+                    return
+                if wait <= 0:
+                    return
+                await asyncio.sleep(wait)
+
+    async def block_for(self, seconds: float) -> None:
+        """Suspende as requisições de todos os workers por `seconds`."""
+        await self._update(block=max(seconds, 0.0))
+
+    async def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Ajusta o balde compartilhado conforme os cabeçalhos da resposta."""
+        limit, remaining, block = parse_limit_headers(headers)
+        if limit or remaining is not None:
+            await self._update(limit or None, remaining, block)
+
+    async def _update(
+        self,
+        limit: Optional[float] = None,
+        remaining: Optional[float] = None,
+        block: Optional[float] = None,
+    ) -> None:
+        args = [self.default_capacity, BUCKET_TTL]
+        args += [
+            '' if value is None else value
+            for value in (limit, remaining, block)
+        ]
+        try:
+            await self._adjust(keys=[self.key], args=args)
+        except RedisError as e:
+            logger.warning(
+                f'Shared rate limit unavailable, using local: {e}'
+            )
+            if block is not None:
+                await self.local.block_for(block)
+
+
+def parse_limit_headers(
+    headers: Mapping[str, str]
+) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+    """
+    Lê `X-RateLimit-Limit`, `X-RateLimit-Remaining` e, com o orçamento
+    esgotado, quantos segundos faltam para `X-RateLimit-Reset`.
+    """
+    limit = _to_float(headers.get('X-RateLimit-Limit'))
+    remaining = _to_float(headers.get('X-RateLimit-Remaining'))
+    block = None
+    if remaining is not None and remaining < 1:
+        reset = _to_float(headers.get('X-RateLimit-Reset'))
+        if reset is not None:
+            block = reset - time.time()
+    return limit, remaining, block
+
+
+def retry_delay(
+    headers: Mapping[str, str],
+    attempt: int,
+    base: float,
+    maximum: float,
+) -> float:
+    """
+    Calcula a espera antes de uma nova tentativa.
+
+    Respeita `Retry-After` (segundos ou data HTTP) e `X-RateLimit-Reset`
+    quando presentes; caso contrário usa backoff exponencial com jitter.
+    """
+    retry_after = headers.get('Retry-After')
+    if retry_after is not None:
+        seconds = _to_float(retry_after)
+        if seconds is None:
+            try:
+                seconds = (
+                    parsedate_to_datetime(retry_after).timestamp()
+                    - time.time()
+                )
+            except (TypeError, ValueError):
+                seconds = None
+        if seconds is not None:
+            return min(max(seconds, 0.0), maximum) + random.uniform(0, base)
+
+    reset = _to_float(headers.get('X-RateLimit-Reset'))
+    remaining = _to_float(headers.get('X-RateLimit-Remaining'))
+    if reset is not None and remaining is not None and remaining < 1:
+        return min(max(reset - time.time(), 0.0), maximum) + random.uniform(
+            0, base
+        )
+
+    return random.uniform(0, min(maximum, base * 2**attempt))
+
+
+def _to_float(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
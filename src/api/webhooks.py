@@ -0,0 +1,110 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+from src.api.clickup_api import ClickUpAPI, TaskPatch
+
+logger = logging.getLogger(__name__)
+
+TASK_EVENTS = {
+    'taskCreated',
+    'taskUpdated',
+    'taskStatusUpdated',
+    'taskDeleted',
+}
+
+
+def sign(body: bytes, secret: str) -> str:
+    """Assinatura do ClickUp: HMAC-SHA256 do corpo, em hexadecimal."""
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(
+    body: bytes, signature: Optional[str], secret: str
+) -> bool:
+    """Confere o cabeçalho `X-Signature` em tempo constante."""
+    if not signature:
+        return False
+    return hmac.compare_digest(sign(body, secret), signature)
+
+
+class WebhookProcessor:
+    """
+    Aplica eventos de tarefas do ClickUp ao cache e às tabelas.
+
+    Entregas repetidas (mesmo corpo) são descartadas via Redis, inclusive
+    entre workers. Eventos da mesma tarefa que chegam dentro da janela de
+    `debounce` segundos são agrupados em uma única nova busca da tarefa;
+    cada lista alterada é então repassada a `on_patch`.
+
+    Args:
+        api (ClickUpAPI): Cliente usado para buscar a tarefa e gravar o cache.
+        on_patch (Callable): Corrotina chamada com os `TaskPatch` aplicados.
+        list_ids (Iterable[str]): Listas onde procurar tarefas excluídas.
+        debounce (float): Janela de agrupamento, em segundos.
+        dedup_ttl (int): Segundos em que um evento já visto é lembrado.
+    """
+
+    def __init__(
+        self,
+        api: ClickUpAPI,
+        on_patch: Callable[[List[TaskPatch]], Awaitable],
+        list_ids: Iterable[str],
+        debounce: float,
+        dedup_ttl: int,
+    ):
+        self.api = api
+        self.on_patch = on_patch
+        self.list_ids = list(list_ids)
+        self.debounce = debounce
+        self.dedup_ttl = dedup_ttl
+        self._deleted: Dict[str, bool] = {}
+        self._pending: Dict[str, asyncio.Task] = {}
+
+    async def handle(self, body: bytes, payload: Dict) -> str:
+        """
+        Registra um evento já autenticado e retorna o que foi feito com ele:
+        `ignored`, `duplicate` ou `accepted`.
+        """
+        event = payload.get('event')
+        task_id = payload.get('task_id')
+        if event not in TASK_EVENTS or not task_id:
+            return 'ignored'
+        key = hashlib.sha256(body).hexdigest()
+        if not await self.api.cache.mark_seen(
+            f'webhook:{key}', self.dedup_ttl
+        ):
+            return 'duplicate'
+
+        # O último evento da janela decide se a tarefa foi excluída
+        self._deleted[task_id] = event == 'taskDeleted'
+        if task_id not in self._pending:
+            self._pending[task_id] = asyncio.ensure_future(
+                self._apply_later(task_id)
+            )
+        return 'accepted'
+
+    async def _apply_later(self, task_id: str):
+        try:
+            await asyncio.sleep(self.debounce)
+        finally:
+            # Eventos posteriores abrem uma nova janela
+            self._pending.pop(task_id, None)
+        deleted = self._deleted.pop(task_id, False)
+        try:
+            patches = await self.api.patch_task(
+                task_id, deleted, self.list_ids
+            )
+            if patches:
+                await self.on_patch(patches)
+        except Exception:
+            logger.exception(f'Failed to apply webhook for task {task_id}')
+
+    async def close(self):
+        """Cancela os eventos ainda na janela de agrupamento."""
+        tasks = list(self._pending.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
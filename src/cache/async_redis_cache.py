@@ -0,0 +1,442 @@
+import asyncio
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import msgpack
+import redis
+import redis.asyncio as aioredis
+from fastapi import HTTPException
+
+from src.cache import codec
+from src.cache.local_cache import LocalCache
+from src.config import settings
+from src.utils.metrics import CACHE_PAYLOAD_BYTES, CACHE_REQUESTS
+
+
+class AsyncRedisCache:
+    """
+    Cache Redis assíncrono com a mesma interface `get`/`set` do `RedisCache`.
+
+    Usa `redis.asyncio` com um pool de conexões, de modo que o acesso ao
+    cache não bloqueia o event loop. Blobs grandes são (des)serializados
+    com msgpack em uma thread.
+
+    Com `local_cache`, as leituras passam antes por um cache em memória do
+    processo. Cada escrita o invalida nos demais workers via pub/sub do
+    Redis (ver `start_invalidation_listener`).
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        max_connections: int = settings.CACHE_MAX_CONNECTIONS,
+        local_cache: Optional[LocalCache] = None,
+    ):
+        """Cria o pool de conexões; a conexão é aberta no primeiro uso."""
+        pool = aioredis.ConnectionPool(
+            connection_class=aioredis.SSLConnection,
+            host=host,
+            port=port,
+            username=username,
+            password=password,
+            ssl_cert_reqs='none',  # Remova em produção
+            max_connections=max_connections,
+        )
+        self.redis = aioredis.Redis(connection_pool=pool)
+        self.local = local_cache
+        # Identifica as mensagens de invalidação publicadas por este processo
+        self.instance_id = uuid.uuid4().hex
+        self._listener: Optional[asyncio.Task] = None
+
+    async def test_redis_connection(self):
+        """Verifica se a conexão com o Redis está ativa."""
+        try:
+            await self.redis.ping()
+            print('Conexão com Redis estabelecida com sucesso.')
+        except redis.AuthenticationError as e:
+            raise HTTPException(
+                status_code=401, detail=f'Erro de autenticação: {e}'
+            )
+        except redis.ConnectionError as e:
+            raise HTTPException(
+                status_code=500, detail=f'Erro ao conectar: {e}'
+            )
+
+    async def close(self):
+        """Fecha o cliente e desconecta o pool."""
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        await self.redis.aclose()
+
+    async def start_invalidation_listener(self):
+        """Passa a ouvir as invalidações publicadas pelos outros workers."""
+        if self.local is not None and self._listener is None:
+            self._listener = asyncio.ensure_future(self._listen())
+
+    async def _listen(self):
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(settings.CACHE_INVALIDATION_CHANNEL)
+                    # Mensagens perdidas enquanto não havia inscrição
+                    self.local.clear()
+                    async for message in pubsub.listen():
+                        if message['type'] != 'message':
+                            continue
+                        origin, _, key = message['data'].decode().partition(
+                            ' '
+                        )
+                        if origin != self.instance_id:
+                            self.local.invalidate(key)
+            except redis.RedisError as e:
+                print(f'Erro ao ouvir invalidações: {e}')
+                self.local.clear()
+                await asyncio.sleep(1)
+
+    async def _invalidate(self, key: str):
+        """Remove `key` do cache local deste e dos demais processos."""
+        if self.local is None:
+            return
+        self.local.invalidate(key)
+        try:
+            await self.redis.publish(
+                settings.CACHE_INVALIDATION_CHANNEL,
+                f'{self.instance_id} {key}',
+            )
+        except redis.RedisError as e:
+            print(f'Erro ao publicar invalidação: {e}')
+
+    async def get(self, key: str) -> Union[List, None]:
+        """Obtém um valor do cache Redis."""
+        if self.local is not None:
+            value = self.local.get(key)
+            if value is not None:
+                CACHE_REQUESTS.labels('get', 'local_hit').inc()
+                return value
+            generation = self.local.generation
+        try:
+            cached_data = await self.redis.get(key)
+            if cached_data:
+                CACHE_REQUESTS.labels('get', 'hit').inc()
+                CACHE_PAYLOAD_BYTES.labels('get').observe(len(cached_data))
+                value = await _unpack(cached_data)
+                if self.local is not None:
+                    self.local.set(key, value, len(cached_data), generation)
+                return value
+            CACHE_REQUESTS.labels('get', 'miss').inc()
+            return None
+        except redis.RedisError as e:
+            print(f'Erro ao obter dados: {e}')
+            return None
+
+    async def set(self, key: str, value: Any, ttl: int = 600):
+        """Define um valor no Redis com um TTL."""
+        try:
+            payload = await _pack(value)
+            CACHE_PAYLOAD_BYTES.labels('set').observe(len(payload))
+            await self.redis.set(key, payload, ex=ttl)
+        except redis.RedisError as e:
+            print(f'Erro ao armazenar dados: {e}')
+        await self._invalidate(key)
+
+    async def get_list(
+        self, list_id: str, local: bool = True
+    ) -> Optional[Dict]:
+        """
+        Lê o snapshot de uma lista: manifesto e uma entrada por tarefa.
+
+        Retorna o manifesto com a chave `tasks` preenchida na ordem de `ids`,
+        ou `None` se o snapshot não existir ou estiver incompleto. Com
+        `local=False` o cache local é ignorado; use sob o lock da lista,
+        quando a leitura precisa refletir a última escrita.
+        """
+        local_key = _local_list_key(list_id)
+        if self.local is not None and local:
+            snapshot = self.local.get(local_key)
+            if snapshot is not None:
+                CACHE_REQUESTS.labels('get_list', 'local_hit').inc()
+                # Cópia rasa: o chamador pode trocar chaves do manifesto
+                return dict(snapshot)
+        generation = self.local.generation if self.local is not None else 0
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.get(_manifest_key(list_id))
+                pipe.hgetall(_tasks_key(list_id))
+                raw_manifest, raw_tasks = await pipe.execute()
+        except redis.RedisError as e:
+            print(f'Erro ao obter dados: {e}')
+            return None
+        if not raw_manifest:
+            CACHE_REQUESTS.labels('get_list', 'miss').inc()
+            return None
+
+        manifest = codec.decode(raw_manifest)
+        size = sum(len(value) for value in raw_tasks.values())
+        CACHE_PAYLOAD_BYTES.labels('get_list').observe(
+            size + len(raw_manifest)
+        )
+        if size >= settings.CACHE_OFFLOAD_BYTES:
+            entries = await asyncio.to_thread(_decode_entries, raw_tasks)
+        else:
+            entries = _decode_entries(raw_tasks)
+        try:
+            manifest['tasks'] = [entries[task_id] for task_id in manifest['ids']]
+        except KeyError:
+            CACHE_REQUESTS.labels('get_list', 'miss').inc()
+            return None
+        CACHE_REQUESTS.labels('get_list', 'hit').inc()
+        if self.local is not None:
+            self.local.set(
+                local_key,
+                dict(manifest),
+                size + len(raw_manifest),
+                generation,
+            )
+        return manifest
+
+    async def set_list(
+        self, list_id: str, tasks: List[Dict], manifest: Dict, ttl: int
+    ):
+        """Substitui todo o snapshot de uma lista."""
+        await self._write_list(list_id, tasks, (), manifest, ttl, replace=True)
+
+    async def patch_list(
+        self,
+        list_id: str,
+        changed: List[Dict],
+        removed_ids: Iterable[str],
+        manifest: Dict,
+        ttl: int,
+    ):
+        """Grava apenas as tarefas alteradas e remove as excluídas."""
+        await self._write_list(list_id, changed, removed_ids, manifest, ttl)
+
+    async def write_list_chunk(
+        self, list_id: str, token: str, tasks: List[Dict], ttl: int
+    ) -> bool:
+        """
+        Acrescenta tarefas a um snapshot em montagem, identificado por
+        `token`; ele só substitui o atual em `commit_list`.
+
+        Returns:
+            False se o Redis não aceitou a escrita.
+        """
+        entries = _encode_entries(tasks)
+        if not entries:
+            return True
+        staging_key = _staging_key(list_id, token)
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.hset(staging_key, mapping=entries)
+                pipe.expire(staging_key, ttl)
+                await pipe.execute()
+        except redis.RedisError as e:
+            print(f'Erro ao armazenar dados: {e}')
+            return False
+        CACHE_PAYLOAD_BYTES.labels('write_list_chunk').observe(
+            sum(len(value) for value in entries.values())
+        )
+        return True
+
+    async def commit_list(
+        self, list_id: str, token: str, manifest: Dict, ttl: int
+    ) -> bool:
+        """
+        Publica o snapshot montado com `write_list_chunk`.
+
+        As tarefas e o manifesto são trocados na mesma transação: leitores
+        veem o snapshot anterior ou o novo, nunca um parcial.
+
+        Returns:
+            False se o Redis não aceitou a escrita.
+        """
+        tasks_key = _tasks_key(list_id)
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                if manifest['ids']:
+                    pipe.rename(_staging_key(list_id, token), tasks_key)
+                    pipe.expire(tasks_key, ttl)
+                else:
+                    pipe.delete(tasks_key)
+                pipe.set(
+                    _manifest_key(list_id), codec.encode(manifest), ex=ttl
+                )
+                await pipe.execute()
+        except redis.RedisError as e:
+            print(f'Erro ao armazenar dados: {e}')
+            return False
+        await self._invalidate(_local_list_key(list_id))
+        return True
+
+    async def discard_list(self, list_id: str, token: str):
+        """Descarta um snapshot em montagem."""
+        try:
+            await self.redis.delete(_staging_key(list_id, token))
+        except redis.RedisError as e:
+            print(f'Erro ao remover dados: {e}')
+
+    async def _write_list(
+        self,
+        list_id: str,
+        tasks: List[Dict],
+        removed_ids: Iterable[str],
+        manifest: Dict,
+        ttl: int,
+        replace: bool = False,
+    ):
+        tasks_key = _tasks_key(list_id)
+        entries = await asyncio.to_thread(_encode_entries, tasks)
+        size = sum(len(value) for value in entries.values())
+        CACHE_PAYLOAD_BYTES.labels('set_list').observe(size)
+        raw_manifest = codec.encode(manifest)
+        removed_ids = list(removed_ids)
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                if replace:
+                    pipe.delete(tasks_key)
+                if entries:
+                    pipe.hset(tasks_key, mapping=entries)
+                if removed_ids:
+                    pipe.hdel(tasks_key, *removed_ids)
+                pipe.expire(tasks_key, ttl)
+                pipe.set(_manifest_key(list_id), raw_manifest, ex=ttl)
+                await pipe.execute()
+        except redis.RedisError as e:
+            print(f'Erro ao armazenar dados: {e}')
+            return
+        local_key = _local_list_key(list_id)
+        await self._invalidate(local_key)
+        if self.local is not None and replace:
+            # O snapshot completo já está em mãos: quem gravou não precisa
+            # relê-lo do Redis
+            self.local.set(
+                local_key,
+                {**manifest, 'tasks': list(tasks)},
+                size + len(raw_manifest),
+            )
+
+    async def mark_seen(self, key: str, ttl: int) -> bool:
+        """
+        Registra `key` por `ttl` segundos; retorna False se já existia.
+
+        Serve para descartar eventos repetidos entre workers. Se o Redis
+        estiver indisponível, o evento é tratado como novo.
+        """
+        try:
+            return bool(
+                await self.redis.set(f'seen:{key}', 1, nx=True, ex=ttl)
+            )
+        except redis.RedisError as e:
+            print(f'Erro ao registrar evento: {e}')
+            return True
+
+    async def acquire_lock(self, name: str, ttl: int) -> Optional[str]:
+        """
+        Tenta adquirir um lock distribuído com expiração de `ttl` segundos.
+
+        Retorna o token do lock, ou `None` se outro processo o detém. Se o
+        Redis estiver indisponível, o lock é considerado adquirido para que
+        a aplicação continue funcionando sem coordenação.
+        """
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self.redis.set(
+                f'lock:{name}', token, nx=True, ex=ttl
+            )
+        except redis.RedisError as e:
+            print(f'Erro ao adquirir lock: {e}')
+            return token
+        return token if acquired else None
+
+    async def extend_lock(self, name: str, token: str, ttl: int) -> bool:
+        """
+        Renova por `ttl` segundos um lock adquirido com `acquire_lock`.
+
+        Retorna False se o lock expirou ou passou a outro processo. Se o
+        Redis estiver indisponível, o lock é considerado mantido, como em
+        `acquire_lock`.
+        """
+        key = f'lock:{name}'
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                await pipe.watch(key)
+                if await pipe.get(key) != token.encode():
+                    await pipe.unwatch()
+                    return False
+                pipe.multi()
+                pipe.expire(key, ttl)
+                await pipe.execute()
+        except redis.WatchError:
+            return False
+        except redis.RedisError as e:
+            print(f'Erro ao renovar lock: {e}')
+        return True
+
+    async def release_lock(self, name: str, token: str):
+        """Libera um lock adquirido com `acquire_lock`."""
+        key = f'lock:{name}'
+        try:
+            # Remove o lock apenas se ele ainda pertence a quem o adquiriu
+            async with self.redis.pipeline(transaction=True) as pipe:
+                await pipe.watch(key)
+                if await pipe.get(key) == token.encode():
+                    pipe.multi()
+                    pipe.delete(key)
+                    await pipe.execute()
+                else:
+                    await pipe.unwatch()
+        except redis.WatchError:
+            pass
+        except redis.RedisError as e:
+            print(f'Erro ao liberar lock: {e}')
+
+
+def _tasks_key(list_id: str) -> str:
+    return f'tasks:{list_id}'
+
+
+def _manifest_key(list_id: str) -> str:
+    return f'tasks:{list_id}:manifest'
+
+
+def _staging_key(list_id: str, token: str) -> str:
+    return f'tasks:{list_id}:staging:{token}'
+
+
+def _local_list_key(list_id: str) -> str:
+    # Prefixo próprio: não colide com as chaves de `get`/`set`
+    return f'list:{list_id}'
+
+
+def _encode_entries(tasks: List[Dict]) -> Dict[str, bytes]:
+    # Cada entrada carrega a versão da tarefa (date_updated)
+    return {
+        task['id']: codec.encode(
+            {'v': int(task.get('date_updated') or 0), 'task': task}
+        )
+        for task in tasks
+    }
+
+
+def _decode_entries(raw_tasks: Dict[bytes, bytes]) -> Dict[str, Dict]:
+    return {
+        task_id.decode(): codec.decode(value)['task']
+        for task_id, value in raw_tasks.items()
+    }
+
+
+async def _unpack(data: bytes) -> Any:
+    if len(data) >= settings.CACHE_OFFLOAD_BYTES:
+        return await asyncio.to_thread(msgpack.unpackb, data, raw=False)
+    return msgpack.unpackb(data, raw=False)
+
+
+async def _pack(value: Any) -> bytes:
+    # O tamanho só é conhecido após serializar; escritas são raras, então
+    # a serialização sempre sai do event loop
+    return await asyncio.to_thread(msgpack.packb, value, use_bin_type=True)
@@ -0,0 +1,67 @@
+import threading
+from typing import Any
+
+import msgpack
+
+from src.config import settings
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dependência opcional
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover - dependência opcional
+    lz4_frame = None
+
+# O primeiro byte de cada valor identifica o algoritmo usado
+ZSTD = b'z'
+LZ4 = b'l'
+RAW = b'r'
+
+_local = threading.local()
+
+
+def _zstd_compressor():
+    # Compressores zstd não são thread-safe; um por thread
+    if not hasattr(_local, 'compressor'):
+        _local.compressor = zstandard.ZstdCompressor(
+            level=settings.CACHE_COMPRESSION_LEVEL
+        )
+        _local.decompressor = zstandard.ZstdDecompressor()
+    return _local.compressor, _local.decompressor
+
+
+def resolve_compression(name: str) -> bytes:
+    """Escolhe o algoritmo configurado, recuando para o disponível."""
+    if name == 'zstd' and zstandard is not None:
+        return ZSTD
+    if name in ('zstd', 'lz4') and lz4_frame is not None:
+        return LZ4
+    return RAW
+
+
+COMPRESSION = resolve_compression(settings.CACHE_COMPRESSION)
+
+
+def encode(value: Any) -> bytes:
+    """Serializa com msgpack e comprime com o algoritmo configurado."""
+    payload = msgpack.packb(value, use_bin_type=True)
+    if COMPRESSION == ZSTD:
+        compressor, _ = _zstd_compressor()
+        return ZSTD + compressor.compress(payload)
+    if COMPRESSION == LZ4:
+        return LZ4 + lz4_frame.compress(payload)
+    return RAW + payload
+
+
+def decode(data: bytes) -> Any:
+    """Desfaz `encode`, qualquer que tenha sido o algoritmo usado."""
+    marker, payload = data[:1], data[1:]
+    if marker == ZSTD:
+        _, decompressor = _zstd_compressor()
+        payload = decompressor.decompress(payload)
+    elif marker == LZ4:
+        payload = lz4_frame.decompress(payload)
+    return msgpack.unpackb(payload, raw=False)
@@ -0,0 +1,109 @@
+import time
+from collections import OrderedDict
+from typing import Any, NamedTuple, Optional
+
+from src.utils.metrics import CACHE_L1_BYTES, CACHE_L1_EVICTIONS
+
+
+class _Entry(NamedTuple):
+    value: Any
+    size: int
+    expires_at: float
+
+
+class LocalCache:
+    """
+    Cache LRU em memória, por processo, na frente do Redis.
+
+    Limitado pelo número de entradas e pela soma dos tamanhos informados em
+    `set` (o tamanho serializado do valor no Redis). Entradas vencidas saem
+    primeiro; depois, as usadas há mais tempo.
+
+    Os valores são devolvidos por referência, sem cópia: quem lê não deve
+    alterá-los.
+
+    Args:
+        max_bytes (int): Soma máxima dos tamanhos das entradas.
+        max_entries (int): Número máximo de entradas.
+        ttl (float): Segundos de validade de cada entrada.
+    """
+
+    def __init__(self, max_bytes: int, max_entries: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.size = 0
+        # Incrementada a cada invalidação; ver `set`
+        self.generation = 0
+        self._entries: 'OrderedDict[str, _Entry]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key, 'expired')
+            return None
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def set(
+        self, key: str, value: Any, size: int, generation: Optional[int] = None
+    ) -> bool:
+        """
+        Guarda `value` e retorna se ele foi aceito.
+
+        Com `generation` (lida antes de buscar o valor no Redis), o valor é
+        descartado se houve alguma invalidação nesse meio tempo: ele pode
+        ser anterior à escrita que a provocou.
+        """
+        if generation is not None and generation != self.generation:
+            return False
+        if size > self.max_bytes:
+            return False
+        if key in self._entries:
+            self._remove(key, None)
+        self._entries[key] = _Entry(value, size, time.monotonic() + self.ttl)
+        self.size += size
+        self._evict()
+        CACHE_L1_BYTES.set(self.size)
+        return True
+
+    def invalidate(self, key: str) -> None:
+        self.generation += 1
+        if key in self._entries:
+            self._remove(key, 'invalidated')
+            CACHE_L1_BYTES.set(self.size)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+        self.size = 0
+        CACHE_L1_BYTES.set(0)
+
+    def _evict(self) -> None:
+        if not self._over_limit():
+            return
+        now = time.monotonic()
+        for key in [
+            key
+            for key, entry in self._entries.items()
+            if entry.expires_at <= now
+        ]:
+            self._remove(key, 'expired')
+        while self._over_limit():
+            self._remove(next(iter(self._entries)), 'capacity')
+
+    def _over_limit(self) -> bool:
+        return (
+            len(self._entries) > self.max_entries or self.size > self.max_bytes
+        )
+
+    def _remove(self, key: str, reason: Optional[str]) -> None:
+        entry = self._entries.pop(key)
+        self.size -= entry.size
+        if reason is not None:
+            CACHE_L1_EVICTIONS.labels(reason).inc()
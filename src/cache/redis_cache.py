@@ -4,6 +4,8 @@ import msgpack
 from fastapi import HTTPException
 import ssl
 
+from src.utils.metrics import CACHE_PAYLOAD_BYTES, CACHE_REQUESTS
+
 class RedisCache:
     def __init__(self, host: str, port: int, username: str, password: str):
         """Inicializa a conexão Redis."""
@@ -38,7 +40,10 @@ class RedisCache:
         try:
             cached_data = self.redis.get(key)
             if cached_data:
+                CACHE_REQUESTS.labels('get', 'hit').inc()
+                CACHE_PAYLOAD_BYTES.labels('get').observe(len(cached_data))
                 return msgpack.unpackb(cached_data, raw=False)
+            CACHE_REQUESTS.labels('get', 'miss').inc()
             return None
         except redis.RedisError as e:
             print(f"Erro ao obter dados: {e}")
@@ -47,6 +52,8 @@ class RedisCache:
     def set(self, key: str, value: List, ttl: int = 600):
         """Define um valor no Redis com um TTL."""
         try:
-            self.redis.setex(key, ttl, msgpack.packb(value, use_bin_type=True))
+            payload = msgpack.packb(value, use_bin_type=True)
+            CACHE_PAYLOAD_BYTES.labels('set').observe(len(payload))
+            self.redis.setex(key, ttl, payload)
         except redis.RedisError as e:
             print(f"Erro ao armazenar dados: {e}")
@@ -0,0 +1,54 @@
+import json
+from dataclasses import dataclass
+from typing import Dict
+
+from src.config import settings
+
+
+@dataclass(frozen=True)
+class ListConfig:
+    """Uma lista do ClickUp sincronizada pela aplicação."""
+
+    list_id: str
+    tasks_table: str
+    history_table: str
+    refresh_interval: int
+
+
+def load_registry(raw: str) -> Dict[str, ListConfig]:
+    """
+    Lê o registro de listas a partir de um JSON indexado pelo ID da lista.
+
+    Cada valor é o nome curto da lista, de onde vêm as tabelas
+    `lista_dados_{nome}` e `status_history_{nome}`, ou um objeto com as
+    chaves `name`, `tasks_table`, `history_table` e `refresh_interval`
+    (segundos; padrão `CACHE_TTL`).
+
+    Raises:
+        ValueError: Se o JSON for inválido ou faltar o nome das tabelas.
+    """
+    registry = {}
+    for list_id, entry in json.loads(raw or '{}').items():
+        if isinstance(entry, str):
+            entry = {'name': entry}
+        name = entry.get('name')
+        tasks_table = entry.get('tasks_table') or (
+            name and f'lista_dados_{name}'
+        )
+        history_table = entry.get('history_table') or (
+            name and f'status_history_{name}'
+        )
+        if not tasks_table or not history_table:
+            raise ValueError(f'List {list_id} has no table names')
+        registry[str(list_id)] = ListConfig(
+            list_id=str(list_id),
+            tasks_table=tasks_table,
+            history_table=history_table,
+            refresh_interval=int(
+                entry.get('refresh_interval', settings.CACHE_TTL)
+            ),
+        )
+    return registry
+
+
+LIST_REGISTRY = load_registry(settings.LIST_REGISTRY)
@@ -17,6 +17,86 @@ DB_NAME = os.getenv('DB_NAME_PROD')
 DB_USER = os.getenv('DB_USER_PROD')
 DB_PASS = os.getenv('DB_PASS_PROD')
 DB_SCHEMA = os.getenv('DB_SCHEMA_PROD')
+DB_WRITE_MODE = os.getenv('DB_WRITE_MODE', 'upsert')
+
+# Jobs em segundo plano (transformação e gravação no Postgres)
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '4'))
+JOB_TTL = int(os.getenv('JOB_TTL', '3600'))
+TRANSFORM_MODE = os.getenv('TRANSFORM_MODE', 'columnar')
+
+# Projeção das tarefas logo após a busca e colunas extras da saída
+TASK_PROJECTION = os.getenv('TASK_PROJECTION', 'true').lower() == 'true'
+EXTRA_TASK_FIELDS = [
+    field.strip()
+    for field in os.getenv('EXTRA_TASK_FIELDS', '').split(',')
+    if field.strip()
+]
+EXTRA_CUSTOM_FIELDS = [
+    field.strip()
+    for field in os.getenv('EXTRA_CUSTOM_FIELDS', '').split(',')
+    if field.strip()
+]
+
+# Listas sincronizadas (ID -> tabelas e intervalo) e agendador
+LIST_REGISTRY = os.getenv(
+    'LIST_REGISTRY', '{"192959544": "inovacao", "174940580": "negocios"}'
+)
+SCHEDULER_ENABLED = os.getenv('SCHEDULER_ENABLED', 'false').lower() == 'true'
+SCHEDULER_MAX_PARALLEL = int(os.getenv('SCHEDULER_MAX_PARALLEL', '2'))
+SCHEDULER_TICK = float(os.getenv('SCHEDULER_TICK', '5'))
+
+# Webhooks de tarefas do ClickUp
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET')
+WEBHOOK_DEBOUNCE = float(os.getenv('WEBHOOK_DEBOUNCE', '2'))
+WEBHOOK_DEDUP_TTL = int(os.getenv('WEBHOOK_DEDUP_TTL', '3600'))
+
+# Cliente HTTP compartilhado com a API do ClickUp
+CLICKUP_BASE_URL = os.getenv(
+    'CLICKUP_BASE_URL', 'https://api.clickup.com/api/v2'
+)
+HTTP_MAX_CONNECTIONS = int(os.getenv('HTTP_MAX_CONNECTIONS', '20'))
+HTTP_MAX_KEEPALIVE = int(os.getenv('HTTP_MAX_KEEPALIVE', '10'))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv('HTTP_KEEPALIVE_EXPIRY', '60'))
+HTTP2 = os.getenv('HTTP2', 'false').lower() == 'true'
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '10'))
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '60'))
+HTTP_WRITE_TIMEOUT = float(os.getenv('HTTP_WRITE_TIMEOUT', '30'))
+HTTP_POOL_TIMEOUT = float(os.getenv('HTTP_POOL_TIMEOUT', '30'))
+PAGE_WINDOW = int(os.getenv('PAGE_WINDOW', '4'))
+CRAWL_PIPELINE = os.getenv('CRAWL_PIPELINE', 'true').lower() == 'true'
+PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', '4'))
+PIPELINE_DB_BATCH = int(os.getenv('PIPELINE_DB_BATCH', '5000'))
+
+# Limite de requisições e novas tentativas
+RATE_LIMIT_PER_MINUTE = int(os.getenv('RATE_LIMIT_PER_MINUTE', '100'))
+SHARED_RATE_LIMIT = os.getenv('SHARED_RATE_LIMIT', 'true').lower() == 'true'
+MAX_RETRIES = int(os.getenv('MAX_RETRIES', '5'))
+RETRY_BACKOFF_BASE = float(os.getenv('RETRY_BACKOFF_BASE', '0.5'))
+RETRY_BACKOFF_MAX = float(os.getenv('RETRY_BACKOFF_MAX', '60'))
+BULK_TIME_IN_STATUS = (
+    os.getenv('BULK_TIME_IN_STATUS', 'true').lower() == 'true'
+)
+
+# Cache e sincronização incremental das listas
+CACHE_TTL = int(os.getenv('CACHE_TTL', '600'))
+SNAPSHOT_TTL = int(os.getenv('SNAPSHOT_TTL', '86400'))
+INCREMENTAL_SYNC = os.getenv('INCREMENTAL_SYNC', 'true').lower() == 'true'
+FULL_SYNC_INTERVAL = int(os.getenv('FULL_SYNC_INTERVAL', '21600'))
+CACHE_STALE_TTL = int(os.getenv('CACHE_STALE_TTL', '3600'))
+REFRESH_LOCK_TTL = int(os.getenv('REFRESH_LOCK_TTL', '300'))
+REFRESH_POLL_INTERVAL = float(os.getenv('REFRESH_POLL_INTERVAL', '0.5'))
+CACHE_MAX_CONNECTIONS = int(os.getenv('CACHE_MAX_CONNECTIONS', '20'))
+CACHE_OFFLOAD_BYTES = int(os.getenv('CACHE_OFFLOAD_BYTES', '262144'))
+CACHE_COMPRESSION = os.getenv('CACHE_COMPRESSION', 'zstd')
+CACHE_COMPRESSION_LEVEL = int(os.getenv('CACHE_COMPRESSION_LEVEL', '3'))
+CACHE_L1_ENABLED = os.getenv('CACHE_L1_ENABLED', 'false').lower() == 'true'
+CACHE_L1_MAX_BYTES = int(os.getenv('CACHE_L1_MAX_BYTES', '67108864'))
+CACHE_L1_MAX_ENTRIES = int(os.getenv('CACHE_L1_MAX_ENTRIES', '32'))
+CACHE_L1_TTL = float(os.getenv('CACHE_L1_TTL', '60'))
+CACHE_INVALIDATION_CHANNEL = os.getenv(
+    'CACHE_INVALIDATION_CHANNEL', 'cache:invalidate'
+)
+OUTPUT_CACHE_TTL = int(os.getenv('OUTPUT_CACHE_TTL', '3600'))
 
 """
 This module contains the configuration settings for the application.
@@ -47,4 +127,164 @@ DB_PASS: str
 
 DB_SCHEMA: str
     The schema name for the production database.
+
+DB_WRITE_MODE: str
+    'upsert' (default) writes only changed tasks and new status history
+    rows, skipping unchanged snapshots; 'replace' reloads whole tables.
+
+JOB_WORKERS: int
+    Threads that run the pandas transform and Postgres writes off the
+    event loop.
+
+JOB_TTL: int
+    Seconds a finished background job stays available at /jobs/{id}.
+
+TRANSFORM_MODE: str
+    'columnar' (default) builds the task and status history frames with
+    vectorized operations; 'rows' uses the per-task filter_tasks loop.
+
+TASK_PROJECTION: bool
+    Trim each fetched task to the keys the transform, sync and webhooks read
+    (plus the extra fields below) before it is cached.
+
+EXTRA_TASK_FIELDS: List[str]
+    Comma-separated top-level task keys (e.g. 'due_date,url') kept by the
+    projection and added as output columns.
+
+EXTRA_CUSTOM_FIELDS: List[str]
+    Comma-separated custom field names whose values are kept and added as
+    output columns.
+
+LIST_REGISTRY: str
+    JSON object mapping each ClickUp list ID to its short name (tables
+    lista_dados_<name> and status_history_<name>) or to an object with
+    name, tasks_table, history_table and refresh_interval (seconds,
+    defaults to CACHE_TTL).
+
+SCHEDULER_ENABLED: bool
+    Periodically syncs every registered list in the background.
+
+SCHEDULER_MAX_PARALLEL: int
+    Maximum number of lists synced at the same time by the scheduler.
+
+SCHEDULER_TICK: float
+    Seconds between scheduler checks for lists that are due.
+
+WEBHOOK_SECRET: str
+    Secret of the ClickUp webhook, used to verify the X-Signature header.
+    The webhook endpoint is disabled while it is unset.
+
+WEBHOOK_DEBOUNCE: float
+    Seconds during which events for the same task are merged into a
+    single re-fetch.
+
+WEBHOOK_DEDUP_TTL: int
+    Seconds a delivered webhook body is remembered to drop retries.
+
+CLICKUP_BASE_URL: str
+    Base URL of the ClickUp API; point it at a local stand-in server for
+    offline runs.
+
+HTTP_MAX_CONNECTIONS: int
+    Maximum number of connections in the shared ClickUp HTTP pool.
+
+HTTP_MAX_KEEPALIVE: int
+    Maximum number of idle keep-alive connections kept in the pool.
+
+HTTP_KEEPALIVE_EXPIRY: float
+    Seconds an idle keep-alive connection stays open.
+
+HTTP2: bool
+    Enables HTTP/2 on the ClickUp client (requires the `h2` package).
+
+HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_WRITE_TIMEOUT, HTTP_POOL_TIMEOUT: float
+    Per-phase timeouts, in seconds, for requests to the ClickUp API.
+
+PAGE_WINDOW: int
+    Number of task pages requested in parallel while crawling a list.
+
+CRAWL_PIPELINE: bool
+    Run full crawls as a staged pipeline (page fetch, enrichment, transform,
+    sinks) that writes the snapshot, tables and output chunk by chunk
+    instead of holding the whole list in memory.
+
+PIPELINE_QUEUE_SIZE: int
+    Pages buffered between two pipeline stages; bounds the crawl's memory.
+
+PIPELINE_DB_BATCH: int
+    Rows per PostgreSQL upsert in the pipeline.
+
+RATE_LIMIT_PER_MINUTE: int
+    Initial request budget per minute; corrected by X-RateLimit-* headers.
+
+SHARED_RATE_LIMIT: bool
+    Keep the request budget in Redis, shared by every worker process that
+    uses the same API key. Falls back to a per-process budget on Redis
+    errors.
+
+MAX_RETRIES: int
+    Retries for 429/5xx responses and transport errors.
+
+RETRY_BACKOFF_BASE, RETRY_BACKOFF_MAX: float
+    Base and cap, in seconds, of the jittered exponential backoff.
+
+BULK_TIME_IN_STATUS: bool
+    Uses ClickUp's bulk time-in-status endpoint (100 tasks per call).
+    When false, or for tasks missing from a bulk answer, one call per task.
+
+CACHE_TTL: int
+    Seconds a cached list snapshot is served without contacting ClickUp.
+
+SNAPSHOT_TTL: int
+    Seconds the list snapshot (tasks + date_updated watermark) is kept.
+
+INCREMENTAL_SYNC: bool
+    Refreshes expired snapshots with only the tasks updated after the
+    watermark instead of re-downloading the whole list.
+
+FULL_SYNC_INTERVAL: int
+    Seconds after which a full crawl replaces incremental refreshes, so
+    tasks deleted in ClickUp eventually leave the snapshot.
+
+CACHE_STALE_TTL: int
+    Age, in seconds, up to which an expired snapshot is still served while
+    a background refresh runs (stale-while-revalidate).
+
+REFRESH_LOCK_TTL: int
+    Expiry of the Redis lock that lets a single worker crawl a list. The
+    holder renews it every third of this time while the crawl runs.
+
+REFRESH_POLL_INTERVAL: float
+    Seconds between attempts to take the refresh lock held by another worker.
+
+CACHE_MAX_CONNECTIONS: int
+    Size of the asyncio Redis connection pool.
+
+CACHE_OFFLOAD_BYTES: int
+    Cached blobs at least this large are decoded in a worker thread.
+
+CACHE_COMPRESSION: str
+    Compression of per-task cache entries: 'zstd', 'lz4' or 'none'.
+    Falls back to whichever library is installed.
+
+CACHE_COMPRESSION_LEVEL: int
+    zstd compression level.
+
+CACHE_L1_ENABLED: bool
+    Keep hot list snapshots in an in-process LRU in front of Redis; writes
+    invalidate it in every worker over Redis pub/sub.
+
+CACHE_L1_MAX_BYTES, CACHE_L1_MAX_ENTRIES: int
+    Bounds of the in-process cache (bytes counted as the serialized size in
+    Redis).
+
+CACHE_L1_TTL: float
+    Seconds an in-process entry is trusted without an invalidation.
+
+CACHE_INVALIDATION_CHANNEL: str
+    Redis pub/sub channel used for cache invalidation messages.
+
+OUTPUT_CACHE_TTL: int
+    Seconds the processed, compressed get_data_organized body of a snapshot
+    version is kept in the cache.
 """
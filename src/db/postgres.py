@@ -1,10 +1,15 @@
+import hashlib
+import io
 import logging
 import os
+from typing import Iterator, List, Optional, Sequence
 
 import pandas as pd
 from sqlalchemy import create_engine, text
 from sqlalchemy.exc import SQLAlchemyError
 
+from src.utils.metrics import DB_ROWS, DB_WRITE_SECONDS, timed
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -38,17 +43,26 @@ class PostgresDB:
         schema: str = 'public',
     ):
         self.schema = schema
+        # psycopg2 explícito: a carga via COPY usa `copy_expert`
         self.database_url = (
-            f'postgresql://{user}:{password}@{host}:{port}/{dbname}'
+            f'postgresql+psycopg2://{user}:{password}@{host}:{port}/{dbname}'
         )
         self.engine = create_engine(
             self.database_url, connect_args={'connect_timeout': 10}
         )
 
+    def close(self):
+        """Fecha as conexões do pool do engine."""
+        self.engine.dispose()
+
     def save_to_postgres(self, df: pd.DataFrame, table_name: str):
         """
         Salva um DataFrame do pandas em uma tabela do PostgreSQL.
 
+        As linhas são enviadas com `COPY ... FROM STDIN` para uma tabela de
+        staging, que substitui a tabela de destino na mesma transação. Quem
+        lê a tabela nunca a encontra ausente ou parcialmente preenchida.
+
         Args:
             df (pd.DataFrame): O DataFrame a ser salvo.
             table_name (str): O nome da tabela para salvar o DataFrame.
@@ -57,16 +71,25 @@ class PostgresDB:
             SQLAlchemyError: Se ocorrer um erro ao salvar os dados no PostgreSQL.
 
         """
-        if_exists = 'replace' if self.table_exists(table_name) else 'fail'
+        staging_name = f'{table_name}__staging'
+        DB_ROWS.labels(table_name, 'replace').inc(len(df))
         try:
-            df.to_sql(
-                table_name,
-                self.engine,
-                if_exists=if_exists,
-                index=True,
-                index_label='id',
-                schema=self.schema,
-            )
+            with timed(
+                DB_WRITE_SECONDS, table=table_name, operation='replace'
+            ), self.engine.begin() as conn:
+                conn.execute(
+                    text(f'DROP TABLE IF EXISTS {self._qualify(staging_name)}')
+                )
+                # Cria a staging com os mesmos tipos que o to_sql geraria; o
+                # índice de `id` só é criado após a carga
+                df.head(0).rename_axis('id').reset_index().to_sql(
+                    staging_name,
+                    conn,
+                    index=False,
+                    schema=self.schema,
+                )
+                self._copy_rows(conn, df, staging_name)
+                self._swap_table(conn, staging_name, table_name)
             logger.info(
                 f"Dados salvos na tabela '{table_name}' no esquema '{self.schema}' do banco de dados PostgreSQL"
             )
@@ -76,6 +99,386 @@ class PostgresDB:
             )
             raise
 
+    def _quote(self, name: str) -> str:
+        return self.engine.dialect.identifier_preparer.quote(name)
+
+    def _qualify(self, table_name: str) -> str:
+        return f'{self._quote(self.schema)}.{self._quote(table_name)}'
+
+    def _copy_rows(
+        self,
+        conn,
+        df: pd.DataFrame,
+        table_name: str,
+        temporary: bool = False,
+        index_label: str = 'id',
+    ):
+        """Envia as linhas via COPY, com o índice na coluna `index_label`."""
+        columns = ', '.join(
+            self._quote(column) for column in [index_label, *df.columns]
+        )
+        # Tabelas temporárias vivem no esquema da sessão
+        table = (
+            self._quote(table_name) if temporary else self._qualify(table_name)
+        )
+        cursor = conn.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f'COPY {table} ({columns}) '
+                f"FROM STDIN WITH (FORMAT csv, NULL '{NULL_MARKER}')",
+                CsvStream(iter_csv_chunks(df)),
+            )
+        finally:
+            cursor.close()
+
+    def _swap_table(self, conn, staging_name: str, table_name: str):
+        """Troca a tabela de destino pela staging dentro da transação."""
+        conn.execute(text(f'DROP TABLE IF EXISTS {self._qualify(table_name)}'))
+        conn.execute(
+            text(
+                f'ALTER TABLE {self._qualify(staging_name)} '
+                f'RENAME TO {self._quote(table_name)}'
+            )
+        )
+        # Mesmo nome de índice que o to_sql criaria para a tabela
+        conn.execute(
+            text(
+                f'CREATE INDEX '
+                f'{self._quote(f"ix_{self.schema}_{table_name}_id")} '
+                f'ON {self._qualify(table_name)} (id)'
+            )
+        )
+
+    def save_list_snapshot(
+        self,
+        df_tasks: pd.DataFrame,
+        df_status_history: pd.DataFrame,
+        tasks_table: str,
+        history_table: str,
+    ) -> bool:
+        """
+        Persiste incrementalmente as tarefas e o histórico de status de uma lista.
+
+        As tarefas sofrem upsert por `task_id` (e as que saíram da lista são
+        removidas); o histórico é acrescentado sem duplicar
+        `(task_id, status, snapshot)`. Uma impressão digital do conteúdo é
+        guardada por lista: se nada mudou desde a última gravação, nada é
+        escrito.
+
+        Args:
+            df_tasks (pd.DataFrame): As tarefas filtradas.
+            df_status_history (pd.DataFrame): O histórico de status.
+            tasks_table (str): A tabela de tarefas da lista.
+            history_table (str): A tabela de histórico de status da lista.
+
+        Returns:
+            bool: False se o conteúdo não mudou e a gravação foi ignorada.
+
+        Raises:
+            SQLAlchemyError: Se ocorrer um erro ao salvar os dados no PostgreSQL.
+
+        """
+        fingerprint = content_fingerprint(df_tasks, df_status_history)
+        DB_ROWS.labels(tasks_table, 'snapshot').inc(len(df_tasks))
+        DB_ROWS.labels(history_table, 'snapshot').inc(len(df_status_history))
+        try:
+            with timed(
+                DB_WRITE_SECONDS, table=tasks_table, operation='snapshot'
+            ), self.engine.begin() as conn:
+                # Serializa gravações concorrentes da mesma lista
+                conn.execute(
+                    text('SELECT pg_advisory_xact_lock(hashtext(:name))'),
+                    {'name': f'{self.schema}.{tasks_table}'},
+                )
+                self._ensure_fingerprint_table(conn)
+                stored = conn.execute(
+                    text(
+                        f'SELECT fingerprint FROM '
+                        f'{self._qualify(FINGERPRINT_TABLE)} '
+                        f'WHERE table_name = :table_name'
+                    ),
+                    {'table_name': tasks_table},
+                ).scalar()
+                if stored == fingerprint:
+                    logger.info(
+                        f"Conteúdo de '{tasks_table}' inalterado; gravação ignorada"
+                    )
+                    return False
+
+                # Sem linhas não há colunas: a tabela não pode ser criada a
+                # partir de um DataFrame vazio
+                if not df_tasks.empty:
+                    self.upsert(
+                        conn,
+                        df_tasks,
+                        tasks_table,
+                        ['task_id'],
+                        delete_missing=True,
+                        version=TASK_VERSION,
+                    )
+                elif self._table_columns(conn, tasks_table):
+                    # Lista vazia: todas as tarefas saíram
+                    conn.execute(
+                        text(f'DELETE FROM {self._qualify(tasks_table)}')
+                    )
+                if not df_status_history.empty:
+                    self.upsert(
+                        conn,
+                        df_status_history,
+                        history_table,
+                        ['task_id', 'status', 'snapshot'],
+                        update=False,
+                    )
+                conn.execute(
+                    text(
+                        f'INSERT INTO {self._qualify(FINGERPRINT_TABLE)} '
+                        f'(table_name, fingerprint, updated_at) '
+                        f'VALUES (:table_name, :fingerprint, now()) '
+                        f'ON CONFLICT (table_name) DO UPDATE SET '
+                        f'fingerprint = EXCLUDED.fingerprint, '
+                        f'updated_at = EXCLUDED.updated_at'
+                    ),
+                    {'table_name': tasks_table, 'fingerprint': fingerprint},
+                )
+            return True
+        except SQLAlchemyError as e:
+            logger.error(
+                f'Erro ao salvar dados na tabela "{tasks_table}" no PostgreSQL: {e}'
+            )
+            raise
+
+    def save_task_changes(
+        self,
+        df_tasks: pd.DataFrame,
+        df_status_history: pd.DataFrame,
+        tasks_table: str,
+        history_table: str,
+        removed_ids: Sequence[str] = (),
+    ):
+        """
+        Aplica alterações pontuais (vindas de webhooks) às tabelas da lista.
+
+        As tarefas recebidas sofrem upsert por `task_id`, sem remover as
+        demais; o histórico é acrescentado como em `save_list_snapshot`; as
+        tarefas em `removed_ids` são excluídas. A impressão digital da lista
+        é descartada para que a próxima gravação completa não seja ignorada.
+
+        Raises:
+            SQLAlchemyError: Se ocorrer um erro ao salvar os dados no PostgreSQL.
+        """
+        DB_ROWS.labels(tasks_table, 'patch').inc(len(df_tasks))
+        DB_ROWS.labels(history_table, 'patch').inc(len(df_status_history))
+        try:
+            with timed(
+                DB_WRITE_SECONDS, table=tasks_table, operation='patch'
+            ), self.engine.begin() as conn:
+                conn.execute(
+                    text('SELECT pg_advisory_xact_lock(hashtext(:name))'),
+                    {'name': f'{self.schema}.{tasks_table}'},
+                )
+                if not df_tasks.empty:
+                    self.upsert(
+                        conn,
+                        df_tasks,
+                        tasks_table,
+                        ['task_id'],
+                        version=TASK_VERSION,
+                    )
+                if not df_status_history.empty:
+                    self.upsert(
+                        conn,
+                        df_status_history,
+                        history_table,
+                        ['task_id', 'status', 'snapshot'],
+                        update=False,
+                    )
+                if removed_ids and self._table_columns(conn, tasks_table):
+                    conn.execute(
+                        text(
+                            f'DELETE FROM {self._qualify(tasks_table)} '
+                            f'WHERE task_id = ANY(:task_ids)'
+                        ),
+                        {'task_ids': list(removed_ids)},
+                    )
+                self._ensure_fingerprint_table(conn)
+                conn.execute(
+                    text(
+                        f'DELETE FROM {self._qualify(FINGERPRINT_TABLE)} '
+                        f'WHERE table_name = :table_name'
+                    ),
+                    {'table_name': tasks_table},
+                )
+        except SQLAlchemyError as e:
+            logger.error(
+                f'Erro ao salvar dados na tabela "{tasks_table}" no PostgreSQL: {e}'
+            )
+            raise
+
+    def snapshot_writer(
+        self, tasks_table: str, history_table: str
+    ) -> 'SnapshotWriter':
+        """Grava o snapshot de uma lista em blocos (ver `SnapshotWriter`)."""
+        return SnapshotWriter(self, tasks_table, history_table)
+
+    def upsert(
+        self,
+        conn,
+        df: pd.DataFrame,
+        table_name: str,
+        key_columns: Sequence[str],
+        update: bool = True,
+        delete_missing: bool = False,
+        version: Optional[str] = None,
+    ):
+        """
+        Grava o DataFrame na tabela com `INSERT ... ON CONFLICT` pelas chaves.
+
+        As tabelas gravadas assim não têm a coluna `id`: a identidade da
+        linha são as chaves. Com `update`, linhas existentes só são
+        reescritas se algum valor mudou; sem ele, linhas já presentes são
+        ignoradas. Com `delete_missing`, linhas cujas chaves não estão no
+        DataFrame são removidas.
+
+        `version` é uma expressão SQL da versão da linha, com `{table}` no
+        lugar do nome da tabela. Se as chaves se repetem no DataFrame, vence
+        a linha de maior versão (no empate, a que vem por último), e uma
+        linha existente não é substituída por uma versão mais antiga. Deve
+        ser chamado dentro de uma transação.
+        """
+        target = self._qualify(table_name)
+        self._ensure_table(conn, df, table_name, key_columns)
+        staging = self._quote(f'{table_name}__upsert')
+        row = self._quote('__row')
+        conn.execute(
+            text(
+                f'CREATE TEMP TABLE {staging} '
+                f'(LIKE {target} INCLUDING DEFAULTS, {row} BIGINT) '
+                f'ON COMMIT DROP'
+            )
+        )
+        # A posição no DataFrame desempata linhas com as mesmas chaves
+        self._copy_rows(
+            conn,
+            df.reset_index(drop=True),
+            f'{table_name}__upsert',
+            temporary=True,
+            index_label='__row',
+        )
+
+        column_list = ', '.join(self._quote(column) for column in df.columns)
+        keys = ', '.join(self._quote(column) for column in key_columns)
+        order = [keys, f'{row} DESC']
+        if version is not None:
+            order.insert(1, f'{version.format(table=staging)} DESC NULLS LAST')
+        if update:
+            updated = [
+                self._quote(column)
+                for column in df.columns
+                if column not in key_columns
+            ]
+            assignments = ', '.join(
+                f'{column} = EXCLUDED.{column}' for column in updated
+            )
+            current = ', '.join(f'current.{column}' for column in updated)
+            excluded = ', '.join(f'EXCLUDED.{column}' for column in updated)
+            condition = f'({current}) IS DISTINCT FROM ({excluded})'
+            if version is not None:
+                # Sem versão conhecida de algum dos lados, a linha é gravada
+                condition += (
+                    f' AND ({version.format(table="EXCLUDED")} >= '
+                    f'{version.format(table="current")}) IS NOT FALSE'
+                )
+            conflict = (
+                f'DO UPDATE SET {assignments} WHERE {condition}'
+                if updated
+                else 'DO NOTHING'
+            )
+        else:
+            conflict = 'DO NOTHING'
+        written = conn.execute(
+            text(
+                f'INSERT INTO {target} AS current ({column_list}) '
+                f'SELECT DISTINCT ON ({keys}) {column_list} FROM {staging} '
+                f'ORDER BY {", ".join(order)} '
+                f'ON CONFLICT ({keys}) {conflict}'
+            )
+        ).rowcount
+
+        deleted = 0
+        if delete_missing:
+            matches = ' AND '.join(
+                f'{staging}.{self._quote(column)} = {target}.{self._quote(column)}'
+                for column in key_columns
+            )
+            deleted = conn.execute(
+                text(
+                    f'DELETE FROM {target} WHERE NOT EXISTS '
+                    f'(SELECT 1 FROM {staging} WHERE {matches})'
+                )
+            ).rowcount
+        # Libera o nome para outro upsert na mesma transação
+        conn.execute(text(f'DROP TABLE {staging}'))
+        logger.info(
+            f"Upsert em '{table_name}': {written} linhas gravadas, "
+            f'{deleted} removidas, {len(df)} recebidas'
+        )
+
+    def _ensure_table(
+        self,
+        conn,
+        df: pd.DataFrame,
+        table_name: str,
+        key_columns: Sequence[str],
+    ):
+        """Cria a tabela, as colunas novas e o índice único das chaves."""
+        target = self._qualify(table_name)
+        existing = self._table_columns(conn, table_name)
+        if not existing:
+            df.head(0).to_sql(
+                table_name, conn, index=False, schema=self.schema
+            )
+        else:
+            if 'id' in existing:
+                # Tabela criada no modo `replace`: o `id` posicional não
+                # identifica a tarefa entre gravações incrementais
+                conn.execute(text(f'ALTER TABLE {target} DROP COLUMN id'))
+            for column in df.columns:
+                if column not in existing:
+                    conn.execute(
+                        text(
+                            f'ALTER TABLE {target} ADD COLUMN '
+                            f'{self._quote(column)} {sql_type(df[column].dtype)}'
+                        )
+                    )
+        index_name = self._quote(f'ux_{table_name}_{"_".join(key_columns)}')
+        keys = ', '.join(self._quote(column) for column in key_columns)
+        conn.execute(
+            text(
+                f'CREATE UNIQUE INDEX IF NOT EXISTS {index_name} '
+                f'ON {target} ({keys})'
+            )
+        )
+
+    def _table_columns(self, conn, table_name: str) -> List[str]:
+        return list(
+            conn.execute(
+                text(
+                    'SELECT column_name FROM information_schema.columns '
+                    'WHERE table_schema = :schema AND table_name = :table_name'
+                ),
+                {'schema': self.schema, 'table_name': table_name},
+            ).scalars()
+        )
+
+    def _ensure_fingerprint_table(self, conn):
+        conn.execute(
+            text(
+                f'CREATE TABLE IF NOT EXISTS {self._qualify(FINGERPRINT_TABLE)} '
+                f'(table_name TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, '
+                f'updated_at TIMESTAMP WITH TIME ZONE NOT NULL)'
+            )
+        )
+
     def table_exists(self, table_name: str) -> bool:
         """
         Verifica se uma tabela existe no banco de dados PostgreSQL.
@@ -103,3 +506,210 @@ class PostgresDB:
             ).scalar()
         logger.info(f"Tabela '{table_name}' existe: {exists}")
         return exists
+
+
+class SnapshotWriter:
+    """
+    Versão em blocos de `PostgresDB.save_list_snapshot`.
+
+    Cada `write` faz o upsert de um bloco de tarefas e histórico; `commit`
+    remove as tarefas que não vieram em nenhum bloco e confirma. Tudo
+    acontece em uma única transação, sob o mesmo advisory lock: leitores
+    veem as tabelas antigas ou as novas. Entre blocos, só os IDs das
+    tarefas ficam em memória.
+
+    Não há comparação de impressão digital antes da gravação (o conteúdo só
+    é conhecido no fim); linhas inalteradas já não são reescritas pelo
+    upsert. A impressão digital guardada é descartada, como em
+    `save_task_changes`.
+    """
+
+    def __init__(self, db: PostgresDB, tasks_table: str, history_table: str):
+        self.db = db
+        self.tasks_table = tasks_table
+        self.history_table = history_table
+        self.task_ids: List[str] = []
+        self._conn = None
+        self._transaction = None
+
+    def _begin(self):
+        if self._conn is not None:
+            return
+        self._conn = self.db.engine.connect()
+        self._transaction = self._conn.begin()
+        self._conn.execute(
+            text('SELECT pg_advisory_xact_lock(hashtext(:name))'),
+            {'name': f'{self.db.schema}.{self.tasks_table}'},
+        )
+
+    def write(self, df_tasks: pd.DataFrame, df_status_history: pd.DataFrame):
+        """
+        Grava um bloco.
+
+        Raises:
+            SQLAlchemyError: Se ocorrer um erro ao salvar os dados no PostgreSQL.
+        """
+        self._begin()
+        DB_ROWS.labels(self.tasks_table, 'chunk').inc(len(df_tasks))
+        DB_ROWS.labels(self.history_table, 'chunk').inc(len(df_status_history))
+        with timed(
+            DB_WRITE_SECONDS, table=self.tasks_table, operation='chunk'
+        ):
+            if not df_tasks.empty:
+                self.db.upsert(
+                    self._conn,
+                    df_tasks,
+                    self.tasks_table,
+                    ['task_id'],
+                    version=TASK_VERSION,
+                )
+                self.task_ids.extend(df_tasks['task_id'])
+            if not df_status_history.empty:
+                self.db.upsert(
+                    self._conn,
+                    df_status_history,
+                    self.history_table,
+                    ['task_id', 'status', 'snapshot'],
+                    update=False,
+                )
+
+    def commit(self):
+        """
+        Remove as tarefas que saíram da lista e confirma a transação.
+
+        Raises:
+            SQLAlchemyError: Se ocorrer um erro ao salvar os dados no PostgreSQL.
+        """
+        self._begin()
+        conn = self._conn
+        try:
+            with timed(
+                DB_WRITE_SECONDS, table=self.tasks_table, operation='snapshot'
+            ):
+                if self.db._table_columns(conn, self.tasks_table):
+                    table = self.db._qualify(self.tasks_table)
+                    deleted = conn.execute(
+                        text(
+                            f'DELETE FROM {table} '
+                            f'WHERE NOT (task_id = ANY(:task_ids))'
+                        ),
+                        {'task_ids': self.task_ids},
+                    ).rowcount
+                    logger.info(
+                        f"Snapshot em '{self.tasks_table}': "
+                        f'{len(self.task_ids)} tarefas, {deleted} removidas'
+                    )
+                self.db._ensure_fingerprint_table(conn)
+                conn.execute(
+                    text(
+                        f'DELETE FROM {self.db._qualify(FINGERPRINT_TABLE)} '
+                        f'WHERE table_name = :table_name'
+                    ),
+                    {'table_name': self.tasks_table},
+                )
+                self._transaction.commit()
+        finally:
+            self._close()
+
+    def rollback(self):
+        """Descarta tudo o que foi gravado."""
+        if self._conn is None:
+            return
+        try:
+            self._transaction.rollback()
+        finally:
+            self._close()
+
+    def _close(self):
+        self._conn.close()
+        self._conn = self._transaction = None
+
+
+FINGERPRINT_TABLE = 'sync_fingerprints'
+
+# Versão de uma linha das tabelas de tarefas: o `date_updated` da tarefa,
+# com precisão de segundos (ver `PostgresDB.upsert`)
+TASK_VERSION = (
+    "to_timestamp({table}.date_updated_data || ' ' || "
+    "{table}.date_updated_hora, 'DD-MM-YYYY HH24:MI:SS')"
+)
+
+# Marca de nulo no CSV; assim strings vazias continuam sendo ''
+NULL_MARKER = r'\N'
+
+
+def iter_csv_chunks(
+    df: pd.DataFrame, chunk_size: int = 10000
+) -> Iterator[str]:
+    """Serializa o DataFrame em CSV aos poucos, `chunk_size` linhas por vez."""
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start : start + chunk_size].to_csv(
+            index=True, header=False, na_rep=NULL_MARKER
+        )
+
+
+class CsvStream(io.TextIOBase):
+    """Arquivo somente leitura sobre um iterador de blocos de texto."""
+
+    def __init__(self, chunks: Iterator[str]):
+        self._chunks = chunks
+        self._current = ''
+        self._offset = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        if size is None or size < 0:
+            rest = self._current[self._offset :]
+            self._current, self._offset = '', 0
+            return rest + ''.join(self._chunks)
+        parts = []
+        while size > 0:
+            if self._offset >= len(self._current):
+                self._current = next(self._chunks, '')
+                self._offset = 0
+                if not self._current:
+                    break
+            piece = self._current[self._offset : self._offset + size]
+            self._offset += len(piece)
+            size -= len(piece)
+            parts.append(piece)
+        return ''.join(parts)
+
+
+def content_fingerprint(
+    *frames: pd.DataFrame, exclude: Sequence[str] = ('timestamp',)
+) -> str:
+    """
+    Calcula um hash do conteúdo dos DataFrames.
+
+    A coluna `timestamp` do histórico (hora da transformação) fica de fora,
+    pois muda a cada execução mesmo sem mudança nos dados. As colunas são
+    ordenadas pelo nome: o hash não depende da ordem em que foram montadas
+    e é o mesmo em qualquer processo.
+    """
+    digest = hashlib.sha256()
+    for df in frames:
+        data = df.drop(columns=[column for column in exclude if column in df])
+        data = data[sorted(data.columns)]
+        digest.update('\x1f'.join(map(str, data.columns)).encode())
+        digest.update(
+            pd.util.hash_pandas_object(data, index=False).values.tobytes()
+        )
+    return digest.hexdigest()
+
+
+def sql_type(dtype) -> str:
+    """Tipo PostgreSQL para uma coluna nova, conforme o dtype do pandas."""
+    if pd.api.types.is_bool_dtype(dtype):
+        return 'BOOLEAN'
+    if pd.api.types.is_integer_dtype(dtype):
+        return 'BIGINT'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'DOUBLE PRECISION'
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        return 'TIMESTAMP WITH TIME ZONE'
+    if pd.api.types.is_datetime64_dtype(dtype):
+        return 'TIMESTAMP WITHOUT TIME ZONE'
+    return 'TEXT'
@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class JobManager:
+    """
+    Executa as etapas bloqueantes (pandas e SQL) fora do event loop.
+
+    `run_in_worker` leva uma função síncrona para o pool de threads e aguarda
+    o resultado; `submit` dispara um job em segundo plano e devolve um ID
+    cujo estado pode ser consultado com `get` (neste processo) ou
+    `lookup`.
+
+    Com `store` (um cache com `get`/`set` assíncronos, como o
+    `AsyncRedisCache`), cada mudança de estado também é gravada em
+    `job:{id}`, e `lookup` encontra jobs disparados por outros workers.
+
+    Args:
+        max_workers (int): Número de threads do pool.
+        ttl (int): Segundos em que jobs concluídos ficam disponíveis para consulta.
+        store: Cache compartilhado onde os estados dos jobs são publicados.
+    """
+
+    def __init__(self, max_workers: int, ttl: int, store=None):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='jobs'
+        )
+        self.ttl = ttl
+        self.store = store
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    async def run_in_worker(self, func: Callable, *args) -> Any:
+        """Executa `func(*args)` no pool de threads sem bloquear o loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    def submit(self, job: Awaitable, **info) -> str:
+        """Agenda a corrotina `job` em segundo plano e retorna o ID do job."""
+        self._prune()
+        job_id = uuid.uuid4().hex
+        self.jobs[job_id] = {
+            'id': job_id,
+            'status': 'pending',
+            'created_at': time.time(),
+            'finished_at': None,
+            'result': None,
+            'error': None,
+            **info,
+        }
+        self._tasks[job_id] = asyncio.ensure_future(self._run(job_id, job))
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Retorna o estado do job, ou None se ele não existir."""
+        return self.jobs.get(job_id)
+
+    async def lookup(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Como `get`, procurando também os jobs dos outros workers."""
+        record = self.jobs.get(job_id)
+        if record is None and self.store is not None:
+            record = await self.store.get(f'job:{job_id}')
+        return record
+
+    async def _run(self, job_id: str, job: Awaitable):
+        record = self.jobs[job_id]
+        record['status'] = 'running'
+        await self._publish(record)
+        try:
+            record['result'] = await job
+            record['status'] = 'done'
+        except Exception as e:
+            logger.exception(f'Job {job_id} failed')
+            record['status'] = 'failed'
+            record['error'] = str(e)
+        finally:
+            record['finished_at'] = time.time()
+            self._tasks.pop(job_id, None)
+        await self._publish(record)
+
+    async def _publish(self, record: Dict[str, Any]):
+        if self.store is not None:
+            await self.store.set(f'job:{record["id"]}', record, self.ttl)
+
+    def _prune(self):
+        limit = time.time() - self.ttl
+        for job_id, record in list(self.jobs.items()):
+            if record['finished_at'] and record['finished_at'] < limit:
+                del self.jobs[job_id]
+
+    async def shutdown(self):
+        """Cancela jobs pendentes e encerra o pool de threads."""
+        for task in list(self._tasks.values()):
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,239 @@
+import asyncio
+import logging
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+)
+
+import pandas as pd
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.config import settings
+from src.utils.http_cache import VariantCompressor
+from src.utils.ndjson import dumps
+
+logger = logging.getLogger(__name__)
+
+
+class Chunk(NamedTuple):
+    """Uma página enriquecida, com o resultado de `transform` em `data`."""
+
+    index: int
+    tasks: List[Dict]
+    data: Any
+
+
+class TransformedChunk(NamedTuple):
+    """Saída da transformação de uma página, lida pelos sinks abaixo."""
+
+    rows: List[Dict]
+    df_tasks: pd.DataFrame
+    df_status_history: pd.DataFrame
+
+
+class CrawlPlan(NamedTuple):
+    """Transformação e destinos extras de uma varredura completa."""
+
+    transform: Optional[Callable[[List[Dict]], Any]] = None
+    sinks: Sequence = ()
+    run_in_worker: Callable[..., Awaitable] = asyncio.to_thread
+
+
+class SinkUnavailable(Exception):
+    """Um destino não conseguiu gravar; a varredura é interrompida."""
+
+
+async def run_pipeline(
+    pages: AsyncIterator[List[Dict]],
+    enrich: Callable[[List[Dict]], Awaitable[List[Dict]]],
+    sinks: Sequence,
+    transform: Optional[Callable[[List[Dict]], Any]] = None,
+    run_in_worker: Callable[..., Awaitable] = asyncio.to_thread,
+    queue_size: Optional[int] = None,
+) -> int:
+    """
+    Executa a varredura em etapas ligadas por filas limitadas.
+
+    1. Busca: cada página de `pages` tem o enriquecimento (`enrich`)
+       disparado e entra na fila.
+    2. Transformação: aguarda o enriquecimento, na ordem das páginas, e
+       roda `transform` via `run_in_worker`.
+    3. Gravação: entrega cada `Chunk` a todos os `sinks`, em ordem.
+
+    Quando uma fila enche, a etapa anterior espera (backpressure). Assim,
+    no máximo `queue_size` páginas aguardam em cada fila, além das que
+    estão em processamento, qualquer que seja o tamanho da lista.
+
+    Um sink expõe `write(chunk)`, `commit()` e `abort()`, todos
+    assíncronos. `commit` roda ao final, na ordem de `sinks`. Se uma etapa
+    ou um `commit` falhar, os sinks ainda não confirmados recebem `abort` e
+    o erro é propagado.
+
+    Returns:
+        O número de tarefas gravadas.
+    """
+    queue_size = queue_size or settings.PIPELINE_QUEUE_SIZE
+    fetched: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    transformed: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    async def fetch_stage():
+        index = 0
+        async for page_tasks in pages:
+            enrichment = asyncio.ensure_future(enrich(page_tasks))
+            try:
+                await fetched.put((index, enrichment))
+            except asyncio.CancelledError:
+                enrichment.cancel()
+                raise
+            index += 1
+        await fetched.put(None)
+
+    async def transform_stage():
+        while (item := await fetched.get()) is not None:
+            index, enrichment = item
+            page_tasks = await enrichment
+            data = None
+            if transform is not None:
+                data = await run_in_worker(transform, page_tasks)
+            await transformed.put(Chunk(index, page_tasks, data))
+        await transformed.put(None)
+
+    async def sink_stage() -> int:
+        written = 0
+        while (chunk := await transformed.get()) is not None:
+            for sink in sinks:
+                await sink.write(chunk)
+            written += len(chunk.tasks)
+        return written
+
+    stages = [
+        asyncio.ensure_future(fetch_stage()),
+        asyncio.ensure_future(transform_stage()),
+        asyncio.ensure_future(sink_stage()),
+    ]
+    committed = 0
+    try:
+        await asyncio.gather(*stages)
+        for sink in sinks:
+            await sink.commit()
+            committed += 1
+    except BaseException:
+        for stage in stages:
+            stage.cancel()
+        # Enriquecimentos já disparados que ficaram na fila
+        pending = []
+        while not fetched.empty():
+            item = fetched.get_nowait()
+            if item is not None:
+                item[1].cancel()
+                pending.append(item[1])
+        await asyncio.gather(*stages, *pending, return_exceptions=True)
+        for sink in sinks[committed:]:
+            try:
+                await sink.abort()
+            except Exception:
+                logger.exception(f'Failed to abort sink {sink!r}')
+        raise
+    return stages[2].result()
+
+
+class TablesSink:
+    """
+    Grava as tabelas da lista no PostgreSQL por um `SnapshotWriter`.
+
+    Os blocos são agrupados até `batch_rows` tarefas por upsert, para não
+    pagar uma ida ao banco por página.
+    """
+
+    def __init__(self, writer, run_in_worker: Callable, batch_rows: int):
+        self.writer = writer
+        self.run_in_worker = run_in_worker
+        self.batch_rows = batch_rows
+        self._pending: List[TransformedChunk] = []
+        self._pending_rows = 0
+
+    async def write(self, chunk: Chunk):
+        self._pending.append(chunk.data)
+        self._pending_rows += len(chunk.data.df_tasks)
+        if self._pending_rows >= self.batch_rows:
+            await self._flush()
+
+    async def commit(self):
+        await self._flush()
+        await self._call(self.writer.commit)
+
+    async def abort(self):
+        self._pending = []
+        await self.run_in_worker(self.writer.rollback)
+
+    async def _flush(self):
+        if not self._pending:
+            return
+        pending, self._pending, self._pending_rows = self._pending, [], 0
+        await self._call(self._write, pending)
+
+    def _write(self, pending: List[TransformedChunk]):
+        self.writer.write(
+            _concat([data.df_tasks for data in pending]),
+            _concat([data.df_status_history for data in pending]),
+        )
+
+    async def _call(self, func: Callable, *args):
+        try:
+            await self.run_in_worker(func, *args)
+        except SQLAlchemyError as e:
+            raise SinkUnavailable(
+                f'PostgreSQL write to {self.writer.tasks_table} failed: {e}'
+            ) from e
+
+
+class OutputSink:
+    """
+    Monta o corpo de `get_data_organized` bloco a bloco.
+
+    Cada bloco de linhas é serializado e comprimido na hora; só as formas
+    comprimidas ficam em memória. Em `commit`, elas são gravadas no cache
+    sob `key` (`{key}:gzip`, `{key}:br`).
+    """
+
+    def __init__(self, cache, key: str, ttl: int, run_in_worker: Callable):
+        self.cache = cache
+        self.key = key
+        self.ttl = ttl
+        self.run_in_worker = run_in_worker
+        self._compressor = VariantCompressor()
+        self._compressor.write(b'{"filtered_tasks":[')
+        self._empty = True
+
+    async def write(self, chunk: Chunk):
+        if not chunk.data.rows:
+            return
+        # Os objetos da lista, sem os colchetes
+        fragment = dumps(chunk.data.rows)[1:-1]
+        if not self._empty:
+            fragment = b',' + fragment
+        self._empty = False
+        await self.run_in_worker(self._compressor.write, fragment)
+
+    async def commit(self):
+        self._compressor.write(b']}')
+        variants = await self.run_in_worker(self._compressor.finish)
+        for name, content in variants.items():
+            await self.cache.set(f'{self.key}:{name}', content, self.ttl)
+
+    async def abort(self):
+        self._compressor = None
+
+
+def _concat(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    frames = [df for df in frames if not df.empty]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,79 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from src.config.lists import ListConfig
+
+logger = logging.getLogger(__name__)
+
+
+class SyncScheduler:
+    """
+    Sincroniza periodicamente todas as listas do registro.
+
+    A cada `tick` segundos, as listas cujo intervalo venceu são disparadas
+    em paralelo, com no máximo `max_parallel` sincronizações simultâneas.
+    Todas passam pelo mesmo `ClickUpAPI` e, portanto, pelo mesmo orçamento
+    de requisições do `RateLimiter`.
+
+    Args:
+        registry (Dict[str, ListConfig]): As listas a sincronizar.
+        sync (Callable): Corrotina que sincroniza uma lista.
+        max_parallel (int): Número máximo de listas sincronizando ao mesmo tempo.
+        tick (float): Intervalo, em segundos, entre verificações.
+    """
+
+    def __init__(
+        self,
+        registry: Dict[str, ListConfig],
+        sync: Callable[[ListConfig], Awaitable],
+        max_parallel: int,
+        tick: float,
+    ):
+        self.registry = registry
+        self.sync = sync
+        self.max_parallel = max_parallel
+        self.tick = tick
+        # Todas as listas vencem na partida: os caches são aquecidos logo
+        self.next_run = {list_id: 0.0 for list_id in registry}
+        self._running: Dict[str, asyncio.Task] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop_task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Inicia o laço do agendador no event loop corrente."""
+        self._semaphore = asyncio.Semaphore(self.max_parallel)
+        self._loop_task = asyncio.ensure_future(self._loop())
+
+    async def _loop(self):
+        while True:
+            now = time.monotonic()
+            for list_id, config in self.registry.items():
+                if list_id in self._running or self.next_run[list_id] > now:
+                    continue
+                self._running[list_id] = asyncio.ensure_future(
+                    self._run(config)
+                )
+            await asyncio.sleep(self.tick)
+
+    async def _run(self, config: ListConfig):
+        try:
+            async with self._semaphore:
+                await self.sync(config)
+        except Exception:
+            logger.exception(f'Scheduled sync of list {config.list_id} failed')
+        finally:
+            self.next_run[config.list_id] = (
+                time.monotonic() + config.refresh_interval
+            )
+            self._running.pop(config.list_id, None)
+
+    async def stop(self):
+        """Interrompe o laço e cancela as sincronizações em andamento."""
+        tasks = list(self._running.values())
+        if self._loop_task is not None:
+            tasks.append(self._loop_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,48 +1,553 @@
+import gzip
+import hashlib
+import json
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
 import pandas as pd
 import pytz
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
-from src.api.clickup_api import ClickUpAPI
-from src.cache.redis_cache import RedisCache
+from src.api.clickup_api import ClickUpAPI, TaskPatch
+from src.api.rate_limiter import RedisRateLimiter
+from src.api.webhooks import WebhookProcessor, verify_signature
+from src.cache.async_redis_cache import AsyncRedisCache
+from src.cache.local_cache import LocalCache
 from src.config import settings
+from src.config.lists import LIST_REGISTRY, ListConfig
 from src.db.postgres import PostgresDB
-from src.utils.task_utils import filter_tasks  # Atualize a importação
-
-app = FastAPI()
-
-# Inicializa o cache Redis
-redis_cache = RedisCache(host=settings.HOST_CACHE, port=settings.PORT_CACHE, username=settings.USER_CACHE, password=settings.PASS_CACHE)
-clickup_api = ClickUpAPI(settings.API_KEY, settings.TIMEZONE, redis_cache)
-postgres_db = PostgresDB(
-    settings.DB_HOST,
-    settings.DB_PORT,
-    settings.DB_NAME,
-    settings.DB_USER,
-    settings.DB_PASS,
-    settings.DB_SCHEMA,
+from src.jobs.manager import JobManager
+from src.jobs.pipeline import (
+    CrawlPlan,
+    OutputSink,
+    TablesSink,
+    TransformedChunk,
+)
+from src.jobs.scheduler import SyncScheduler
+from src.utils.export import (
+    MEDIA_TYPES,
+    ExportFormat,
+    iter_file,
+    to_arrow_ipc,
+    to_parquet,
+    write_xlsx,
+)
+from src.utils.http_cache import (
+    choose_encoding,
+    compress_variants,
+    encoded_etag,
+    etag_matches,
+    snapshot_etag,
+)
+from src.utils.metrics import metrics_registry
+from src.utils.ndjson import dumps, encode_lines
+from src.utils.task_utils import (  # Atualize a importação
+    TASK_COLUMNS,
+    filter_tasks,
+    filter_tasks_frames,
+    frame_to_records,
+    select_columns,
 )
 
 
-@app.get('/get_data_organized/{list_id}')
-async def get_data_organized(list_id: str):
-    print(f'Fetching tasks for list ID: {list_id}')
-    tasks = await clickup_api.get_tasks(list_id)
+class Resources:
+    """
+    Clientes, pools e tarefas de fundo de um processo.
+
+    Nada disso é criado na importação do módulo: os recursos nascem no
+    lifespan, já dentro de cada worker (depois do fork do gunicorn), e
+    ficam em `app.state.resources`. Nenhum socket, pool de conexões,
+    thread ou objeto de event loop é herdado do processo mestre. O que
+    precisa valer entre workers (locks, orçamento de requisições ao
+    ClickUp, estado dos jobs) fica no Redis.
+    """
+
+    def __init__(self):
+        self.redis_cache = AsyncRedisCache(
+            host=settings.HOST_CACHE,
+            port=settings.PORT_CACHE,
+            username=settings.USER_CACHE,
+            password=settings.PASS_CACHE,
+            local_cache=LocalCache(
+                settings.CACHE_L1_MAX_BYTES,
+                settings.CACHE_L1_MAX_ENTRIES,
+                settings.CACHE_L1_TTL,
+            )
+            if settings.CACHE_L1_ENABLED
+            else None,
+        )
+        self.postgres_db = PostgresDB(
+            settings.DB_HOST,
+            settings.DB_PORT,
+            settings.DB_NAME,
+            settings.DB_USER,
+            settings.DB_PASS,
+            settings.DB_SCHEMA,
+        )
+        self.job_manager = JobManager(
+            settings.JOB_WORKERS, settings.JOB_TTL, self.redis_cache
+        )
+        rate_limiter = None
+        if settings.SHARED_RATE_LIMIT:
+            # O limite do ClickUp é por token: um balde por chave de API
+            token = hashlib.sha256(settings.API_KEY.encode()).hexdigest()
+            rate_limiter = RedisRateLimiter(
+                self.redis_cache.redis,
+                f'clickup:{token[:16]}',
+                settings.RATE_LIMIT_PER_MINUTE,
+            )
+        self.clickup_api = ClickUpAPI(
+            settings.API_KEY,
+            settings.TIMEZONE,
+            self.redis_cache,
+            crawl_plan=crawl_plan,
+            rate_limiter=rate_limiter,
+        )
+        self.scheduler = SyncScheduler(
+            LIST_REGISTRY,
+            refresh_list,
+            settings.SCHEDULER_MAX_PARALLEL,
+            settings.SCHEDULER_TICK,
+        )
+        self.webhook_processor = WebhookProcessor(
+            self.clickup_api,
+            save_patches,
+            LIST_REGISTRY,
+            settings.WEBHOOK_DEBOUNCE,
+            settings.WEBHOOK_DEDUP_TTL,
+        )
+
+    async def start(self):
+        await self.redis_cache.test_redis_connection()
+        await self.redis_cache.start_invalidation_listener()
+        # Um único cliente HTTP com pool de conexões por processo
+        await self.clickup_api.start()
+        if settings.SCHEDULER_ENABLED:
+            self.scheduler.start()
+
+    async def close(self):
+        await self.scheduler.stop()
+        await self.webhook_processor.close()
+        await self.job_manager.shutdown()
+        await self.clickup_api.close()
+        await self.redis_cache.close()
+        self.postgres_db.close()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    resources = Resources()
+    app.state.resources = resources
+    try:
+        await resources.start()
+        yield
+    finally:
+        await resources.close()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+def get_resources() -> Resources:
+    """Recursos do processo corrente, criados no lifespan."""
+    return app.state.resources
+
+
+def crawl_plan(list_id: str, manifest: Dict) -> CrawlPlan:
+    """
+    Destinos das varreduras completas em pipeline: as tabelas da lista (se
+    registrada) e a saída de `get_data_organized` para o novo snapshot.
+    """
+    resources = get_resources()
+    run_in_worker = resources.job_manager.run_in_worker
+    config = LIST_REGISTRY.get(list_id)
+    if config is not None and settings.DB_WRITE_MODE == 'replace':
+        # A substituição das tabelas exige a lista inteira: a saída fica
+        # para `organized_output`, que também grava as tabelas
+        return CrawlPlan(run_in_worker=run_in_worker)
+    sinks = []
+    if config is not None:
+        sinks.append(
+            TablesSink(
+                resources.postgres_db.snapshot_writer(
+                    config.tasks_table, config.history_table
+                ),
+                run_in_worker,
+                settings.PIPELINE_DB_BATCH,
+            )
+        )
+    sinks.append(
+        OutputSink(
+            resources.redis_cache,
+            output_key(list_id, manifest),
+            settings.OUTPUT_CACHE_TTL,
+            run_in_worker,
+        )
+    )
+    return CrawlPlan(transform_tasks, sinks, run_in_worker)
+
+
+def save_tables(
+    df_tasks: pd.DataFrame,
+    df_status_history: pd.DataFrame,
+    tasks_table: str,
+    history_table: str,
+):
+    postgres_db = get_resources().postgres_db
+    if settings.DB_WRITE_MODE == 'replace':
+        postgres_db.save_to_postgres(df_tasks, tasks_table)
+        postgres_db.save_to_postgres(df_status_history, history_table)
+    else:
+        postgres_db.save_list_snapshot(
+            df_tasks, df_status_history, tasks_table, history_table
+        )
+
+
+def transform_tasks(tasks: List[Dict]) -> TransformedChunk:
+    """Linhas filtradas e DataFrames das tarefas, conforme `TRANSFORM_MODE`."""
+    if settings.TRANSFORM_MODE == 'columnar':
+        df_tasks, df_status_history = filter_tasks_frames(
+            tasks, settings.TIMEZONE
+        )
+        return TransformedChunk(
+            frame_to_records(df_tasks), df_tasks, df_status_history
+        )
     filtered_tasks, status_history_data = filter_tasks(
         tasks, settings.TIMEZONE
     )
+    return TransformedChunk(
+        filtered_tasks,
+        pd.DataFrame(filtered_tasks),
+        pd.DataFrame(status_history_data),
+    )
+
+
+def process_tasks(list_id: str, tasks: List[Dict]) -> List[Dict]:
+    """Transforma as tarefas e grava as tabelas da lista (roda em thread)."""
+    filtered_tasks, df_tasks, df_status_history = transform_tasks(tasks)
+
+    config = LIST_REGISTRY.get(list_id)
+    if config is not None:
+        save_tables(
+            df_tasks,
+            df_status_history,
+            config.tasks_table,
+            config.history_table,
+        )
+
+    return filtered_tasks
 
-    df_tasks = pd.DataFrame(filtered_tasks)
-    df_status_history = pd.DataFrame(status_history_data)
 
-    if list_id == '192959544':
-        postgres_db.save_to_postgres(df_tasks, 'lista_dados_inovacao')
-        postgres_db.save_to_postgres(
-            df_status_history, 'status_history_inovacao'
+def parse_columns(columns: Optional[str]) -> Tuple[str, ...]:
+    """Valida o parâmetro `columns` (nomes separados por vírgula)."""
+    if not columns:
+        return ()
+    selected = tuple(
+        dict.fromkeys(
+            column.strip() for column in columns.split(',') if column.strip()
         )
-    elif list_id == '174940580':
-        postgres_db.save_to_postgres(df_tasks, 'lista_dados_negocios')
-        postgres_db.save_to_postgres(
-            df_status_history, 'status_history_negocios'
+    )
+    unknown = [column for column in selected if column not in TASK_COLUMNS]
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f'Unknown columns: {", ".join(unknown)}'
         )
+    return selected
+
+
+def build_organized(
+    list_id: str, tasks: List[Dict], columns: Tuple[str, ...] = ()
+) -> Dict[str, bytes]:
+    """
+    Processa as tarefas e retorna o corpo JSON já comprimido.
+
+    Só a saída padrão grava as tabelas da lista: com `columns`, as tarefas
+    apenas passam pela transformação.
+    """
+    if columns:
+        filtered_tasks = select_columns(transform_tasks(tasks).rows, columns)
+    else:
+        filtered_tasks = process_tasks(list_id, tasks)
+    return compress_variants(dumps({'filtered_tasks': filtered_tasks}))
+
+
+def select_output(body: bytes, columns: Tuple[str, ...]) -> Dict[str, bytes]:
+    """Recorta `columns` da saída padrão já pronta (corpo em gzip)."""
+    filtered_tasks = json.loads(gzip.decompress(body))['filtered_tasks']
+    return compress_variants(
+        dumps({'filtered_tasks': select_columns(filtered_tasks, columns)})
+    )
+
+
+def output_key(
+    list_id: str, snapshot: Dict, columns: Tuple[str, ...] = ()
+) -> str:
+    """Prefixo no cache da saída processada de um snapshot."""
+    tag = snapshot_etag(list_id, snapshot, *columns).strip('"')
+    return f'organized:{list_id}:{tag}'
+
+
+async def organized_output(
+    list_id: str,
+    snapshot: Dict,
+    encoding: Optional[str] = 'gzip',
+    columns: Tuple[str, ...] = (),
+) -> bytes:
+    """
+    Corpo de `get_data_organized` para o snapshot, em `encoding`.
+
+    A saída processada fica no cache sob o ETag do snapshot, em cada
+    compressão disponível: enquanto a lista não muda, nenhuma requisição
+    (nem a sincronização agendada) refaz a transformação ou a gravação
+    das tabelas. Após uma varredura em pipeline, a saída padrão (sem
+    `columns`) já foi gravada por ela.
+
+    A saída ausente é montada sob o lock `output` da lista (separado do
+    lock das varreduras, que pode ficar retido por minutos), e quem
+    esperava por ele encontra a saída no cache: requisições simultâneas,
+    neste ou em outro worker, não repetem a transformação nem a gravação.
+    Variantes com `columns` saem da saída padrão em cache, quando existe,
+    e nunca gravam as tabelas.
+    """
+    resources = get_resources()
+    cache = resources.redis_cache
+    key = f'{output_key(list_id, snapshot, columns)}:{encoding or "gzip"}'
+    body = await cache.get(key)
+    if body is None:
+        async with resources.clickup_api.list_lock(list_id, 'output'):
+            body = await cache.get(key)
+            if body is None:
+                variants = await build_output(list_id, snapshot, columns)
+                body = variants[encoding or 'gzip']
+    if encoding is None:
+        return gzip.decompress(body)
+    return body
+
+
+async def build_output(
+    list_id: str, snapshot: Dict, columns: Tuple[str, ...]
+) -> Dict[str, bytes]:
+    """Monta a saída do snapshot e a grava no cache, em cada compressão."""
+    resources = get_resources()
+    run_in_worker = resources.job_manager.run_in_worker
+    default = None
+    if columns:
+        default = await resources.redis_cache.get(
+            f'{output_key(list_id, snapshot)}:gzip'
+        )
+    if default is not None:
+        variants = await run_in_worker(select_output, default, columns)
+    else:
+        tasks = await resources.clickup_api.snapshot_tasks(list_id, snapshot)
+        variants = await run_in_worker(
+            build_organized, list_id, tasks, columns
+        )
+    key = output_key(list_id, snapshot, columns)
+    for name, content in variants.items():
+        await resources.redis_cache.set(
+            f'{key}:{name}', content, settings.OUTPUT_CACHE_TTL
+        )
+    return variants
+
+
+async def refresh_list(config: ListConfig):
+    resources = get_resources()
+    # Cada worker tem seu agendador; a rodada fica com quem marcar a lista
+    # primeiro, e os demais não esperam pelo lock da sincronização
+    claimed = await resources.redis_cache.acquire_lock(
+        f'schedule:{config.list_id}', max(int(config.refresh_interval / 2), 1)
+    )
+    if claimed is None:
+        return
+    # Metade do intervalo: outro worker pode ter acabado de sincronizar
+    snapshot = await resources.clickup_api.refresh_snapshot(
+        config.list_id, config.refresh_interval / 2
+    )
+    await organized_output(config.list_id, snapshot)
+
+
+async def sync_list_job(list_id: str) -> Dict:
+    snapshot = await get_resources().clickup_api.get_snapshot(list_id)
+    await organized_output(list_id, snapshot)
+    return {'tasks': len(snapshot['ids'])}
+
+
+@app.get('/get_data_organized/{list_id}')
+async def get_data_organized(
+    list_id: str,
+    request: Request,
+    background: bool = False,
+    columns: Optional[str] = None,
+):
+    """
+    Tarefas filtradas da lista, com `ETag` e compressão gzip/brotli.
+
+    Um `If-None-Match` com o ETag atual recebe `304` sem corpo; `columns`
+    limita a saída às colunas informadas, separadas por vírgula.
+    """
+    print(f'Fetching tasks for list ID: {list_id}')
+    selected = parse_columns(columns)
+    resources = get_resources()
+    if background:
+        job_id = resources.job_manager.submit(
+            sync_list_job(list_id), list_id=list_id
+        )
+        return JSONResponse(
+            status_code=202,
+            content={'job_id': job_id, 'status_url': f'/jobs/{job_id}'},
+        )
+
+    snapshot = await resources.clickup_api.get_snapshot(list_id)
+    etag = snapshot_etag(list_id, snapshot, *selected)
+    encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+    headers = {
+        'ETag': encoded_etag(etag, encoding),
+        'Vary': 'Accept-Encoding',
+        'Cache-Control': 'no-cache',
+    }
+    if etag_matches(request.headers.get('If-None-Match'), etag):
+        return Response(status_code=304, headers=headers)
+    if encoding is not None:
+        headers['Content-Encoding'] = encoding
+    body = await organized_output(list_id, snapshot, encoding, selected)
+    return Response(body, media_type='application/json', headers=headers)
+
+
+def encode_page(tasks: List[Dict], columns: Tuple[str, ...] = ()) -> bytes:
+    # Páginas têm no máximo 100 tarefas: o caminho por linha basta
+    filtered_tasks, _ = filter_tasks(tasks, settings.TIMEZONE)
+    if columns:
+        filtered_tasks = select_columns(filtered_tasks, columns)
+    return encode_lines(filtered_tasks)
+
+
+async def stream_tasks(
+    list_id: str, columns: Tuple[str, ...] = ()
+) -> AsyncIterator[bytes]:
+    resources = get_resources()
+    async for page_tasks in resources.clickup_api.iter_list_tasks(list_id):
+        yield await resources.job_manager.run_in_worker(
+            encode_page, page_tasks, columns
+        )
+
+
+@app.get('/get_data_organized/{list_id}/stream')
+async def get_data_organized_stream(
+    list_id: str, columns: Optional[str] = None
+):
+    """Entrega as tarefas filtradas em NDJSON conforme as páginas chegam."""
+    return StreamingResponse(
+        stream_tasks(list_id, parse_columns(columns)),
+        media_type='application/x-ndjson',
+    )
+
+
+EXPORT_TABLES = {'tasks': 0, 'status_history': 1}
+
+
+def build_export(tasks: List[Dict], export_format: ExportFormat, table: str):
+    frames = filter_tasks_frames(tasks, settings.TIMEZONE)
+    if export_format == ExportFormat.xlsx:
+        return write_xlsx(dict(zip(EXPORT_TABLES, frames)))
+    df = frames[EXPORT_TABLES[table]]
+    if export_format == ExportFormat.parquet:
+        return to_parquet(df)
+    return to_arrow_ipc(df)
+
+
+@app.get('/export/{list_id}/{export_format}')
+async def export_list(
+    list_id: str, export_format: ExportFormat, table: str = 'tasks'
+):
+    """
+    Exporta as tarefas filtradas (ou o histórico de status) da lista.
+
+    Parquet e Arrow IPC trazem a tabela escolhida em `table`; o XLSX traz
+    as duas, uma por aba.
+    """
+    if table not in EXPORT_TABLES:
+        raise HTTPException(status_code=400, detail='Invalid table.')
+    resources = get_resources()
+    tasks = await resources.clickup_api.get_tasks(list_id)
+    content = await resources.job_manager.run_in_worker(
+        build_export, tasks, export_format, table
+    )
+    name = list_id
+    if export_format != ExportFormat.xlsx:
+        name = f'{list_id}_{table}'
+    headers = {
+        'Content-Disposition': (
+            f'attachment; filename="{name}.{export_format.value}"'
+        )
+    }
+    media_type = MEDIA_TYPES[export_format]
+    if export_format == ExportFormat.xlsx:
+        return StreamingResponse(
+            iter_file(content), media_type=media_type, headers=headers
+        )
+    return Response(content, media_type=media_type, headers=headers)
+
+
+def save_task_patch(config: ListConfig, patch: TaskPatch):
+    tasks = [patch.task] if patch.task is not None else []
+    df_tasks, df_status_history = filter_tasks_frames(
+        tasks, settings.TIMEZONE
+    )
+    get_resources().postgres_db.save_task_changes(
+        df_tasks,
+        df_status_history,
+        config.tasks_table,
+        config.history_table,
+        [patch.task_id] if patch.task is None else [],
+    )
+
+
+async def save_patches(patches: List[TaskPatch]):
+    run_in_worker = get_resources().job_manager.run_in_worker
+    for patch in patches:
+        config = LIST_REGISTRY.get(patch.list_id)
+        if config is not None:
+            await run_in_worker(save_task_patch, config, patch)
+
+
+@app.post('/webhooks/clickup')
+async def clickup_webhook(request: Request):
+    """
+    Recebe eventos de tarefas do ClickUp e atualiza cache e tabelas.
+
+    Responde logo após validar a assinatura; a tarefa é buscada e gravada
+    em segundo plano, depois da janela de `WEBHOOK_DEBOUNCE`.
+    """
+    if not settings.WEBHOOK_SECRET:
+        raise HTTPException(
+            status_code=503, detail='Webhook secret not configured.'
+        )
+    body = await request.body()
+    if not verify_signature(
+        body, request.headers.get('X-Signature'), settings.WEBHOOK_SECRET
+    ):
+        raise HTTPException(status_code=401, detail='Invalid signature.')
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail='Invalid JSON payload.')
+    status = await get_resources().webhook_processor.handle(body, payload)
+    return {'status': status}
+
+
+@app.get('/metrics')
+async def metrics():
+    """Métricas no formato de exposição do Prometheus."""
+    return Response(
+        generate_latest(metrics_registry()), media_type=CONTENT_TYPE_LATEST
+    )
+
 
-    return {'filtered_tasks': filtered_tasks}
+@app.get('/jobs/{job_id}')
+async def get_job(job_id: str):
+    job = await get_resources().job_manager.lookup(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail='Job not found')
+    return job
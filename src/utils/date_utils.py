@@ -1,7 +1,12 @@
 from datetime import datetime
+from typing import Dict, Sequence
 
+import numpy as np
+import pandas as pd
 import pytz
 
+MINUTES_PER_DAY = 1440
+
 
 def parse_date(timestamp: int, timezone: str) -> dict:
     dt = (
@@ -16,25 +21,36 @@ def parse_date(timestamp: int, timezone: str) -> dict:
     }
 
 
-def convert_time(time_in_minutes: int) -> str:
-    if time_in_minutes < 60:
-        return f'{time_in_minutes} minutos'
-    elif time_in_minutes < 1440:
-        hours = time_in_minutes / 60
-        return f'{hours:.1f} horas'
-    else:
-        days = time_in_minutes / 1440
-        return f'{days:.1f} dias'
-
-
-def convert_time_to_days(time_str: str) -> float:
-    if 'horas' in time_str:
-        hours = float(time_str.split()[0])
-        return hours / 24
-    elif 'dias' in time_str:
-        return float(time_str.split()[0])
-    elif 'minutos' in time_str:
-        minutes = float(time_str.split()[0])
-        return minutes / 1440
-    else:
-        return 0.0
+def format_timestamps(
+    timestamps: Sequence, timezone: str
+) -> Dict[str, np.ndarray]:
+    """
+    Versão vetorizada de `parse_date` para uma sequência de timestamps.
+
+    Converte os epochs em milissegundos de uma só vez para o fuso
+    `timezone` e recorta `data`, `ano` e `hora` da representação ISO
+    (`AAAA-MM-DDTHH:MM:SS`) tratada como matriz de caracteres, evitando um
+    `strftime` por valor.
+    """
+    epochs = np.asarray(timestamps, dtype='int64')
+    local = (
+        pd.to_datetime(epochs, unit='ms', utc=True)
+        .tz_convert(timezone)
+        .tz_localize(None)
+    )
+    chars = (
+        local.values.astype('datetime64[s]')
+        .astype('U19')
+        .view('U1')
+        .reshape(-1, 19)
+    )
+    return {
+        'data': _join_chars(chars[:, [8, 9, 4, 5, 6, 7, 0, 1, 2, 3]]),
+        'ano': _join_chars(chars[:, 0:4]),
+        'hora': _join_chars(chars[:, 11:19]),
+    }
+
+
+def _join_chars(chars: np.ndarray) -> np.ndarray:
+    # Cada linha da matriz de caracteres volta a ser uma única string
+    return np.ascontiguousarray(chars).view(f'U{chars.shape[1]}').ravel()
@@ -0,0 +1,110 @@
+import io
+import tempfile
+from enum import Enum
+from typing import IO, Dict, Iterator
+
+import pandas as pd
+from fastapi import HTTPException
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - dependência opcional
+    pa = None
+
+try:
+    from openpyxl import Workbook
+except ImportError:  # pragma: no cover - dependência opcional
+    Workbook = None
+
+# Planilhas acima deste tamanho são montadas em disco, não em memória
+XLSX_SPOOL_BYTES = 16 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+
+class ExportFormat(str, Enum):
+    parquet = 'parquet'
+    arrow = 'arrow'
+    xlsx = 'xlsx'
+
+
+MEDIA_TYPES = {
+    ExportFormat.parquet: 'application/vnd.apache.parquet',
+    ExportFormat.arrow: 'application/vnd.apache.arrow.file',
+    ExportFormat.xlsx: (
+        'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    ),
+}
+
+
+def _require(module, package: str):
+    if module is None:
+        raise HTTPException(
+            status_code=501, detail=f'Export requires the {package} package.'
+        )
+
+
+def to_arrow_table(df: pd.DataFrame) -> 'pa.Table':
+    _require(pa, 'pyarrow')
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def to_parquet(df: pd.DataFrame) -> bytes:
+    """Serializa o DataFrame em Parquet comprimido com zstd."""
+    buffer = io.BytesIO()
+    pq.write_table(to_arrow_table(df), buffer, compression='zstd')
+    return buffer.getvalue()
+
+
+def to_arrow_ipc(df: pd.DataFrame) -> bytes:
+    """Serializa o DataFrame no formato de arquivo Arrow IPC (Feather v2)."""
+    table = to_arrow_table(df)
+    sink = pa.BufferOutputStream()
+    # Os buffers são comprimidos; leitores Arrow descomprimem sem parsing
+    options = pa.ipc.IpcWriteOptions(compression='zstd')
+    with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def write_xlsx(frames: Dict[str, pd.DataFrame]) -> IO[bytes]:
+    """
+    Grava cada DataFrame em uma aba de uma planilha XLSX.
+
+    Usa o modo somente escrita do openpyxl, que não mantém as células em
+    memória, e devolve o arquivo posicionado no início.
+    """
+    _require(Workbook, 'openpyxl')
+    workbook = Workbook(write_only=True)
+    for title, df in frames.items():
+        sheet = workbook.create_sheet(title=title)
+        sheet.append([str(column) for column in df.columns])
+        for row in _excel_rows(df):
+            sheet.append(row)
+    buffer = tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_BYTES)
+    workbook.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def iter_file(
+    buffer: IO[bytes], chunk_size: int = CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Lê o arquivo em blocos para uma resposta em streaming e o fecha."""
+    with buffer:
+        while True:
+            chunk = buffer.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def _excel_rows(df: pd.DataFrame) -> Iterator[list]:
+    # Excel não aceita datas com fuso nem NaN
+    df = df.copy()
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.DatetimeTZDtype):
+            df[column] = df[column].dt.tz_localize(None)
+    df = df.astype(object).where(df.notna(), None)
+    for row in df.itertuples(index=False, name=None):
+        yield list(row)
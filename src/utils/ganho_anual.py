@@ -2,6 +2,9 @@ from typing import Dict, List, Union
 
 from fastapi import logger
 
+# Nome do campo personalizado no ClickUp (com o espaço final)
+GANHO_ANUAL_FIELD = '💡 R$ GANHO ANUAL '
+
 
 def get_ganho_anual(task):
     """
@@ -12,7 +15,7 @@ def get_ganho_anual(task):
         (
             field
             for field in custom_fields
-            if field.get('name') == '💡 R$ GANHO ANUAL '
+            if field.get('name') == GANHO_ANUAL_FIELD
         ),
         None,
     )
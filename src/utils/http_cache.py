@@ -0,0 +1,142 @@
+import gzip
+import hashlib
+import zlib
+from typing import Dict, Optional
+
+from src.config import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependência opcional
+    brotli = None
+
+# Incremente quando o formato da saída processada mudar: invalida as
+# respostas guardadas e os ETags já entregues
+OUTPUT_FORMAT_VERSION = 1
+
+# Codificações oferecidas, na ordem de preferência
+ENCODINGS = ('br', 'gzip')
+
+GZIP_LEVEL = 6
+# Cada versão é comprimida uma única vez; acima de 6 o ganho é pequeno para
+# o custo em listas grandes
+BROTLI_QUALITY = 6
+
+
+def snapshot_etag(list_id: str, snapshot: Dict, *variant) -> str:
+    """
+    ETag forte da saída processada de um snapshot.
+
+    Deriva da versão do snapshot (que muda a cada escrita) e do horário da
+    última varredura completa (que distingue snapshots recriados do zero),
+    além do fuso horário, das colunas extras configuradas e de `variant`
+    (parâmetros da requisição que alteram a saída).
+    """
+    key = '|'.join(
+        str(part)
+        for part in (
+            OUTPUT_FORMAT_VERSION,
+            list_id,
+            snapshot.get('full_synced_at'),
+            snapshot['version'],
+            settings.TIMEZONE,
+            settings.EXTRA_TASK_FIELDS,
+            settings.EXTRA_CUSTOM_FIELDS,
+            *variant,
+        )
+    )
+    return '"' + hashlib.blake2b(key.encode(), digest_size=16).hexdigest() + '"'
+
+
+def encoded_etag(etag: str, encoding: Optional[str]) -> str:
+    """
+    ETag de uma das codificações do corpo, ex. `"abc-gzip"`.
+
+    Validadores fortes precisam diferir entre gzip, br e o corpo sem
+    compressão; o corpo sem compressão usa o ETag sem sufixo.
+    """
+    if encoding is None:
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Confere `If-None-Match` (lista de ETags, fracos ou não, ou `*`).
+
+    `etag` é o ETag sem codificação: qualquer variante dele (ver
+    `encoded_etag`) confere, pois o conteúdo é o mesmo.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip().removeprefix('W/')
+        for encoding in ENCODINGS:
+            candidate = candidate.replace(f'-{encoding}"', '"')
+        if candidate in ('*', etag):
+            return True
+    return False
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Escolhe `br` ou `gzip` conforme `Accept-Encoding`, preferindo `br`
+    quando o pacote `brotli` está instalado; `None` para sem compressão.
+    """
+    accepted = {}
+    for item in (accept_encoding or '').split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    wildcard = accepted.get('*', 0.0)
+    for encoding in ENCODINGS:
+        if encoding == 'br' and brotli is None:
+            continue
+        if accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+def compress_variants(body: bytes) -> Dict[str, bytes]:
+    """Comprime o corpo em todos os formatos disponíveis."""
+    variants = {'gzip': gzip.compress(body, compresslevel=GZIP_LEVEL)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(body, quality=BROTLI_QUALITY)
+    return variants
+
+
+class VariantCompressor:
+    """
+    Versão incremental de `compress_variants`: o corpo chega em pedaços e
+    só as formas comprimidas ficam em memória.
+    """
+
+    def __init__(self):
+        # wbits=31: formato gzip, o mesmo de `gzip.compress`
+        self._gzip = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        self._brotli = (
+            brotli.Compressor(quality=BROTLI_QUALITY)
+            if brotli is not None
+            else None
+        )
+        self._parts = {'gzip': []}
+        if self._brotli is not None:
+            self._parts['br'] = []
+
+    def write(self, data: bytes) -> None:
+        self._parts['gzip'].append(self._gzip.compress(data))
+        if self._brotli is not None:
+            self._parts['br'].append(self._brotli.process(data))
+
+    def finish(self) -> Dict[str, bytes]:
+        self._parts['gzip'].append(self._gzip.flush())
+        if self._brotli is not None:
+            self._parts['br'].append(self._brotli.finish())
+        return {name: b''.join(parts) for name, parts in self._parts.items()}
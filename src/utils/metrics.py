@@ -0,0 +1,157 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator
+from urllib.parse import urlsplit
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    multiprocess,
+)
+
+# Segmentos fixos das URLs do ClickUp; os demais (IDs) viram `{id}`
+_STATIC_SEGMENTS = {
+    'api',
+    'v2',
+    'list',
+    'task',
+    'time_in_status',
+    'bulk_time_in_status',
+    'task_ids',
+}
+
+_SIZE_BUCKETS = (
+    1024,
+    8 * 1024,
+    64 * 1024,
+    256 * 1024,
+    1024 * 1024,
+    4 * 1024 * 1024,
+    16 * 1024 * 1024,
+    64 * 1024 * 1024,
+)
+_COUNT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 10000)
+
+CLICKUP_REQUEST_SECONDS = Histogram(
+    'clickup_request_duration_seconds',
+    'Latência das requisições à API do ClickUp.',
+    ['endpoint', 'status'],
+)
+CLICKUP_RETRIES = Counter(
+    'clickup_retries_total',
+    'Novas tentativas de requisições ao ClickUp, por motivo.',
+    ['endpoint', 'reason'],
+)
+CLICKUP_RATE_LIMITED = Counter(
+    'clickup_rate_limited_total',
+    'Respostas 429 (limite de requisições) do ClickUp.',
+    ['endpoint'],
+)
+CRAWL_SECONDS = Histogram(
+    'clickup_crawl_duration_seconds',
+    'Duração da sincronização de uma lista.',
+    ['list_id', 'mode'],
+    buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+CRAWL_PAGES = Histogram(
+    'clickup_crawl_pages',
+    'Páginas de tarefas lidas em uma varredura completa.',
+    ['list_id'],
+    buckets=_COUNT_BUCKETS,
+)
+CRAWL_TASKS = Histogram(
+    'clickup_crawl_tasks',
+    'Tarefas recebidas em uma sincronização.',
+    ['list_id', 'mode'],
+    buckets=_COUNT_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    'cache_requests_total',
+    'Leituras do cache, por resultado (local_hit/hit/miss).',
+    ['operation', 'result'],
+)
+CACHE_PAYLOAD_BYTES = Histogram(
+    'cache_payload_bytes',
+    'Tamanho dos valores lidos e gravados no Redis.',
+    ['operation'],
+    buckets=_SIZE_BUCKETS,
+)
+CACHE_L1_BYTES = Gauge(
+    'cache_l1_bytes',
+    'Bytes ocupados pelo cache local do processo.',
+    # Com vários workers, a soma dos processos vivos
+    multiprocess_mode='livesum',
+)
+CACHE_L1_EVICTIONS = Counter(
+    'cache_l1_evictions_total',
+    'Entradas removidas do cache local, por motivo.',
+    ['reason'],
+)
+TRANSFORM_SECONDS = Histogram(
+    'transform_duration_seconds',
+    'Duração das etapas de transformação das tarefas.',
+    ['stage'],
+    buckets=(
+        0.0001,
+        0.0005,
+        0.001,
+        0.005,
+        0.01,
+        0.05,
+        0.1,
+        0.5,
+        1,
+        2.5,
+        5,
+        10,
+    ),
+)
+DB_WRITE_SECONDS = Histogram(
+    'db_write_duration_seconds',
+    'Duração das gravações no PostgreSQL.',
+    ['table', 'operation'],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+DB_ROWS = Counter(
+    'db_rows_total',
+    'Linhas enviadas ao PostgreSQL.',
+    ['table', 'operation'],
+)
+
+
+def metrics_registry() -> CollectorRegistry:
+    """
+    Registro exposto em `/metrics`.
+
+    Com `PROMETHEUS_MULTIPROC_DIR` definido (workers do gunicorn), cada
+    processo grava suas métricas em arquivos nesse diretório e o registro
+    devolvido agrega todos eles; sem ele, o registro padrão do processo.
+    """
+    if not os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def endpoint_label(url: str) -> str:
+    """Reduz a URL ao modelo do endpoint, ex. `/api/v2/list/{id}/task`."""
+    segments = urlsplit(url).path.strip('/').split('/')
+    return '/' + '/'.join(
+        segment if segment in _STATIC_SEGMENTS else '{id}'
+        for segment in segments
+    )
+
+
+@contextmanager
+def timed(histogram: Histogram, **labels) -> Iterator[None]:
+    """Observa no histograma a duração do bloco, mesmo se ele falhar."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.labels(**labels).observe(time.perf_counter() - start)
@@ -0,0 +1,21 @@
+import json
+from typing import Any, Iterable
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+
+def dumps(value: Any) -> bytes:
+    """Serializa um valor em JSON (UTF-8), com orjson quando disponível."""
+    if orjson is not None:
+        return orjson.dumps(
+            value, option=orjson.OPT_SERIALIZE_NUMPY, default=str
+        )
+    return json.dumps(value, ensure_ascii=False, default=str).encode()
+
+
+def encode_lines(rows: Iterable[Any]) -> bytes:
+    """Serializa os registros como NDJSON: um objeto JSON por linha."""
+    return b''.join(dumps(row) + b'\n' for row in rows)
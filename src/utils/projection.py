@@ -0,0 +1,102 @@
+from typing import Dict
+
+from src.config import settings
+from src.utils.ganho_anual import GANHO_ANUAL_FIELD
+
+# Chaves lidas pela transformação (`to_record`), pela sincronização
+# incremental (`archived`, `status.type`) e pelos webhooks (`list.id`)
+TASK_FIELDS = (
+    'id',
+    'name',
+    'status',
+    'priority',
+    'assignees',
+    'date_created',
+    'date_updated',
+    'text_content',
+    'custom_fields',
+    'time_in_status',
+    'list',
+    'archived',
+)
+
+# Campos extras são guardados como vieram, sem o recorte abaixo
+EXTRA_FIELDS = frozenset(settings.EXTRA_TASK_FIELDS)
+KEPT_FIELDS = TASK_FIELDS + tuple(
+    field for field in settings.EXTRA_TASK_FIELDS if field not in TASK_FIELDS
+)
+KEPT_CUSTOM_FIELDS = frozenset(
+    name.strip() for name in (GANHO_ANUAL_FIELD, *settings.EXTRA_CUSTOM_FIELDS)
+)
+
+
+def project_task(task: Dict) -> Dict:
+    """
+    Reduz a tarefa da API às chaves usadas pela aplicação.
+
+    Descrições em Markdown, checklists, observadores e as listas de opções
+    dos campos personalizados ficam de fora; os objetos mantidos são
+    recortados às subchaves lidas. Com `TASK_PROJECTION=false` a tarefa é
+    devolvida inteira.
+    """
+    if not settings.TASK_PROJECTION:
+        return task
+    projected = {field: task[field] for field in KEPT_FIELDS if field in task}
+    for field, trim in _TRIMMERS.items():
+        value = projected.get(field)
+        if value and field not in EXTRA_FIELDS:
+            projected[field] = trim(value)
+    return projected
+
+
+def project_time_in_status(time_in_status: Dict) -> Dict:
+    """Mantém do tempo em status apenas o histórico, em minutos."""
+    if not settings.TASK_PROJECTION or not isinstance(time_in_status, dict):
+        return time_in_status
+    history = []
+    for entry in time_in_status.get('status_history') or []:
+        if not isinstance(entry, dict):
+            history.append(entry)
+            continue
+        kept = {
+            key: entry[key] for key in ('status', 'total_time') if key in entry
+        }
+        total_time = kept.get('total_time')
+        if isinstance(total_time, dict) and 'by_minute' in total_time:
+            kept['total_time'] = {'by_minute': total_time['by_minute']}
+        history.append(kept)
+    return {'status_history': history}
+
+
+def _pick(*keys):
+    def trim(value):
+        if not isinstance(value, dict):
+            return value
+        return {key: value[key] for key in keys if key in value}
+
+    return trim
+
+
+def _trim_assignees(assignees):
+    # Só o primeiro responsável vira "Líder"
+    return [_pick('username', 'email')(assignees[0])]
+
+
+def _trim_custom_fields(custom_fields):
+    return [
+        {'name': field['name'], 'value': field['value']}
+        for field in custom_fields
+        if isinstance(field, dict)
+        and 'value' in field
+        and str(field.get('name', '')).strip() in KEPT_CUSTOM_FIELDS
+    ]
+
+
+_TRIMMERS = {
+    'status': _pick('status', 'type'),
+    'priority': _pick('priority'),
+    'assignees': _trim_assignees,
+    'custom_fields': _trim_custom_fields,
+    'list': _pick('id'),
+    'time_in_status': project_time_in_status,
+}
@@ -0,0 +1,172 @@
+import logging
+import re
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config import settings
+from src.utils.ganho_anual import get_ganho_anual
+from src.utils.metrics import TRANSFORM_SECONDS
+from src.utils.ndjson import dumps
+from src.utils.regex_utils import FIELD_NAMES
+from src.utils.text_utils import extract_field_values, parse_task_text
+
+logger = logging.getLogger(__name__)
+
+EMOJI_PATTERN = re.compile(
+    '['
+    '\U0001F600-\U0001F64F'
+    '\U0001F300-\U0001F5FF'
+    '\U0001F680-\U0001F6FF'
+    '\U0001F1E0-\U0001F1FF'
+    ']+',
+    flags=re.UNICODE,
+)
+
+# Ordem dos campos da descrição em `TaskRecord.fields`; é a mesma ordem das
+# chaves devolvidas por `extract_field_values`
+FIELD_ORDER = tuple(FIELD_NAMES)
+
+# Colunas extras configuradas: chaves da tarefa e campos personalizados, na
+# ordem de `TaskRecord.extra`
+EXTRA_TASK_FIELDS = tuple(settings.EXTRA_TASK_FIELDS)
+EXTRA_CUSTOM_FIELDS = tuple(settings.EXTRA_CUSTOM_FIELDS)
+EXTRA_COLUMNS = EXTRA_TASK_FIELDS + EXTRA_CUSTOM_FIELDS
+
+# Chaves sem as quais a tarefa é descartada
+REQUIRED_KEYS = ('id', 'date_created', 'date_updated', 'status')
+
+EXTRACT_SECONDS = TRANSFORM_SECONDS.labels(stage='extract_field_values')
+
+
+@dataclass
+class StatusEntry:
+    """Passagem de uma tarefa por um status, com a duração em minutos."""
+
+    __slots__ = ('status', 'minutes')
+
+    status: str
+    minutes: int
+
+
+@dataclass
+class TaskRecord:
+    """
+    Representação interna e compacta de uma tarefa do ClickUp, usada pela
+    transformação por linha (`filter_tasks`).
+
+    Datas ficam como epoch em milissegundos e durações como minutos
+    inteiros; a formatação para exibição acontece só na saída.
+    """
+
+    __slots__ = (
+        'task_id',
+        'status',
+        'name',
+        'priority',
+        'leader',
+        'leader_email',
+        'date_created',
+        'date_updated',
+        'ganho_anual',
+        'fields',
+        'extra',
+        'history',
+    )
+
+    task_id: str
+    status: str
+    name: str
+    priority: Optional[str]
+    leader: Optional[str]
+    leader_email: Optional[str]
+    date_created: int
+    date_updated: int
+    ganho_anual: Optional[float]
+    fields: Tuple[str, ...]
+    extra: Tuple[Any, ...]
+    history: List[StatusEntry]
+
+
+@lru_cache(maxsize=1024)
+def clean_status(status: str) -> str:
+    """Remove emojis do nome do status (poucos valores distintos por lista)."""
+    return EMOJI_PATTERN.sub('', status)
+
+
+def to_record(task: Dict) -> TaskRecord:
+    """
+    Converte a tarefa da API em `TaskRecord`.
+
+    Raises:
+        KeyError: Se faltar `id`, `date_created`, `date_updated` ou `status`.
+    """
+    leader = task['assignees'][0] if task.get('assignees') else {}
+    record = TaskRecord(
+        task_id=task['id'],
+        status=clean_status(task['status'].get('status', '')),
+        name=task.get('name', ''),
+        priority=task['priority'].get('priority', None)
+        if task.get('priority')
+        else None,
+        leader=leader.get('username'),
+        leader_email=leader.get('email'),
+        date_created=int(task['date_created']),
+        date_updated=int(task['date_updated']),
+        ganho_anual=get_ganho_anual(task),
+        fields=(),
+        extra=extra_values(task) if EXTRA_COLUMNS else (),
+        history=[],
+    )
+    record.fields = task_fields(task.get('text_content', ''))
+    try:
+        record.history = [
+            StatusEntry(
+                clean_status(entry['status']),
+                int(entry['total_time']['by_minute']),
+            )
+            for entry in task.get('time_in_status', {}).get(
+                'status_history', []
+            )
+            if 'total_time' in entry
+        ]
+    except KeyError as e:
+        # A tarefa é mantida, apenas sem histórico
+        logger.error(f'Missing key {e} in task {task}')
+    return record
+
+
+def task_fields(text_content: Optional[str]) -> Tuple[str, ...]:
+    """Valores dos campos da descrição, na ordem de `FIELD_ORDER`."""
+    task_text = parse_task_text(text_content)
+    start = time.perf_counter()
+    field_values = extract_field_values(task_text)
+    EXTRACT_SECONDS.observe(time.perf_counter() - start)
+    return tuple(field_values[field] for field in FIELD_ORDER)
+
+
+def extra_values(task: Dict) -> Tuple[Any, ...]:
+    """Valores das colunas extras; listas e objetos viram texto JSON."""
+    values = [task.get(field) for field in EXTRA_TASK_FIELDS]
+    if EXTRA_CUSTOM_FIELDS:
+        custom_values = {
+            str(field.get('name', '')).strip(): field.get('value')
+            for field in task.get('custom_fields') or []
+        }
+        values.extend(custom_values.get(name) for name in EXTRA_CUSTOM_FIELDS)
+    return tuple(
+        dumps(value).decode() if isinstance(value, (dict, list)) else value
+        for value in values
+    )
+
+
+def to_records(tasks: List[Dict]) -> List[TaskRecord]:
+    """Converte as tarefas, descartando (com log) as incompletas."""
+    records = []
+    for task in tasks:
+        try:
+            records.append(to_record(task))
+        except KeyError as e:
+            logger.error(f'Missing key {e} in task {task}')
+    return records
@@ -33,3 +33,32 @@ FIELD_PATTERNS = {
 }
 
 FIELD_NAMES_SET = set(FIELD_NAMES)
+
+# Nome de campo escrito de trás para frente, para reconhecer o cabeçalho
+# "CAMPO:" a partir de cada ":" do texto invertido com um `match` ancorado
+# (um grupo nomeado por campo). Os nomes mais longos vêm primeiro, para que
+# "TIPO DE OPERAÇÃO" ganhe de "OPERAÇÃO"
+FIELD_GROUPS = {f'f{index}': name for index, name in enumerate(FIELD_NAMES)}
+
+FIELD_NAME_REVERSED_PATTERN = re.compile(
+    '|'.join(
+        f'(?P<{group}>{re.escape(name[::-1])})'
+        for group, name in sorted(
+            FIELD_GROUPS.items(), key=lambda item: -len(item[1])
+        )
+    ),
+    re.IGNORECASE,
+)
+
+# Campos que terminam outro campo (ex.: "OPERAÇÃO" em "TIPO DE OPERAÇÃO"):
+# um cabeçalho do campo longo também é um cabeçalho do campo curto
+FIELD_SUFFIXES = {
+    name: [
+        other
+        for other in FIELD_NAMES
+        if other != name
+        and len(other) <= len(name)
+        and re.fullmatch(re.escape(other), name[-len(other) :], re.IGNORECASE)
+    ]
+    for name in FIELD_NAMES
+}
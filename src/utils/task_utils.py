@@ -1,110 +1,211 @@
 import logging
-import re
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Sequence, Tuple
 
+import numpy as np
+import pandas as pd
 import pytz
 
-from src.utils.date_utils import convert_time, convert_time_to_days, parse_date
-from src.utils.ganho_anual import get_ganho_anual  # Atualize a importação
-from src.utils.text_utils import extract_field_values, parse_task_text
+from src.utils.date_utils import MINUTES_PER_DAY, format_timestamps, parse_date
+from src.utils.ganho_anual import get_ganho_anual
+from src.utils.metrics import TRANSFORM_SECONDS, timed
+from src.utils.records import (
+    EMOJI_PATTERN,
+    EXTRA_COLUMNS,
+    FIELD_ORDER,
+    REQUIRED_KEYS,
+    TaskRecord,
+    extra_values,
+    task_fields,
+    to_records,
+)
 
 logger = logging.getLogger(__name__)
 
+# Colunas da tabela de tarefas, na ordem de `task_row`
+TASK_COLUMNS = (
+    'task_id',
+    'Status',
+    'Name',
+    'Priority',
+    'Líder',
+    'Email líder',
+    'date_created_data',
+    'date_created_ano',
+    'date_created_hora',
+    'date_updated_data',
+    'date_updated_ano',
+    'date_updated_hora',
+    '💡 R$ GANHO ANUAL',
+    *FIELD_ORDER,
+    *EXTRA_COLUMNS,
+)
 
+
+@timed(TRANSFORM_SECONDS, stage='filter_tasks')
 def filter_tasks(
     tasks: List[Dict], timezone: str
 ) -> (List[Dict], List[Dict]):   # type: ignore
-    filtered_data = []
-    status_history_data = []
-    emoji_pattern = re.compile(
-        '['
-        '\U0001F600-\U0001F64F'
-        '\U0001F300-\U0001F5FF'
-        '\U0001F680-\U0001F6FF'
-        '\U0001F1E0-\U0001F1FF'
-        ']+',
-        flags=re.UNICODE,
-    )
+    records = to_records(tasks)
+    now = datetime.now(pytz.timezone(timezone))
+    filtered_data = [task_row(record, timezone) for record in records]
+    status_history_data = [
+        {
+            'task_id': record.task_id,
+            'status': entry.status,
+            'time_in_status': entry.minutes / MINUTES_PER_DAY,
+            'timestamp': now,
+            # Versão da tarefa em que o histórico foi observado
+            'snapshot': str(record.date_updated),
+        }
+        for record in records
+        for entry in record.history
+    ]
+    return filtered_data, status_history_data
+
+
+def task_row(record: TaskRecord, timezone: str) -> Dict:
+    """Formata um `TaskRecord` como linha da tabela de tarefas."""
+    date_created = parse_date(record.date_created, timezone)
+    date_updated = parse_date(record.date_updated, timezone)
+    row = {
+        'task_id': record.task_id,
+        'Status': record.status,
+        'Name': record.name,
+        'Priority': record.priority,
+        'Líder': record.leader,
+        'Email líder': record.leader_email,
+        'date_created_data': date_created['data'],
+        'date_created_ano': date_created['ano'],
+        'date_created_hora': date_created['hora'],
+        'date_updated_data': date_updated['data'],
+        'date_updated_ano': date_updated['ano'],
+        'date_updated_hora': date_updated['hora'],
+        '💡 R$ GANHO ANUAL': record.ganho_anual,
+    }
+    row.update(zip(FIELD_ORDER, record.fields))
+    row.update(zip(EXTRA_COLUMNS, record.extra))
+    return row
 
+
+def select_columns(rows: List[Dict], columns: Sequence[str]) -> List[Dict]:
+    """Mantém apenas `columns` (nomes de `TASK_COLUMNS`), nessa ordem."""
+    return [{column: row[column] for column in columns} for row in rows]
+
+
+@timed(TRANSFORM_SECONDS, stage='filter_tasks_frames')
+def filter_tasks_frames(
+    tasks: List[Dict], timezone: str
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Versão colunar de `filter_tasks`: devolve os DataFrames de tarefas e de
+    histórico de status com as mesmas colunas e valores.
+
+    As colunas saem direto das tarefas da API, sem passar por `TaskRecord`.
+    As datas são convertidas em bloco (`format_timestamps`), a remoção de
+    emojis roda uma vez por status distinto, a extração dos campos uma vez
+    por descrição distinta, e os tempos em status viram dias em uma única
+    operação sobre o array.
+    """
+    valid = []
     for task in tasks:
+        missing = [key for key in REQUIRED_KEYS if key not in task]
+        if missing:
+            logger.error(f"Missing key '{missing[0]}' in task {task}")
+        else:
+            valid.append(task)
+    if not valid:
+        return pd.DataFrame(), pd.DataFrame()
+
+    created = format_timestamps([t['date_created'] for t in valid], timezone)
+    updated = format_timestamps([t['date_updated'] for t in valid], timezone)
+    leaders = [
+        task['assignees'][0] if task.get('assignees') else {} for task in valid
+    ]
+    columns = {
+        'task_id': [task['id'] for task in valid],
+        'Status': strip_emoji(
+            [task['status'].get('status', '') for task in valid]
+        ),
+        'Name': [task.get('name', '') for task in valid],
+        'Priority': [
+            task['priority'].get('priority', None)
+            if task.get('priority')
+            else None
+            for task in valid
+        ],
+        'Líder': [leader.get('username') for leader in leaders],
+        'Email líder': [leader.get('email') for leader in leaders],
+        'date_created_data': created['data'],
+        'date_created_ano': created['ano'],
+        'date_created_hora': created['hora'],
+        'date_updated_data': updated['data'],
+        'date_updated_ano': updated['ano'],
+        'date_updated_hora': updated['hora'],
+        '💡 R$ GANHO ANUAL': [get_ganho_anual(task) for task in valid],
+    }
+    codes, texts = factorize([task.get('text_content', '') for task in valid])
+    fields = np.array([task_fields(text) for text in texts], dtype=object)
+    fields = fields.reshape(len(texts), len(FIELD_ORDER))[codes]
+    for index, field in enumerate(FIELD_ORDER):
+        columns[field] = fields[:, index]
+    if EXTRA_COLUMNS:
+        extras = zip(*(extra_values(task) for task in valid))
+        columns.update(zip(EXTRA_COLUMNS, extras))
+    df_tasks = pd.DataFrame(columns)
+
+    task_ids, statuses, minutes, snapshots = [], [], [], []
+    for task in valid:
         try:
-            date_created = parse_date(task['date_created'], timezone)
-            date_updated = parse_date(task['date_updated'], timezone)
-            ganho_anual = get_ganho_anual(task)
-
-            filtered_task = {
-                'task_id': task['id'],
-                'Status': emoji_pattern.sub(
-                    r'', task['status'].get('status', '')
-                ),
-                'Name': task.get('name', ''),
-                'Priority': task.get('priority', {}).get('priority', None)
-                if task.get('priority')
-                else None,
-                'Líder': task.get('assignees', [{}])[0].get('username')
-                if task.get('assignees')
-                else None,
-                'Email líder': task.get('assignees', [{}])[0].get('email')
-                if task.get('assignees')
-                else None,
-                'date_created_data': date_created['data'],
-                'date_created_ano': date_created['ano'],
-                'date_created_hora': date_created['hora'],
-                'date_updated_data': date_updated['data'],
-                'date_updated_ano': date_updated['ano'],
-                'date_updated_hora': date_updated['hora'],
-                '💡 R$ GANHO ANUAL': ganho_anual,
-            }
-
-            task_text = parse_task_text(task.get('text_content', ''))
-            field_values = extract_field_values(task_text)
-            filtered_task.update(field_values)
-
-            filtered_data.append(filtered_task)
-
-            status_history = convert_status_history(
-                task.get('time_in_status', {})
-            )
-            for entry in status_history.get('status_history', []):
-                status_history_data.append(
-                    {
-                        'task_id': task['id'],
-                        'status': emoji_pattern.sub(r'', entry['status']),
-                        'time_in_status': convert_time_to_days(
-                            entry['time_in_status']
-                        ),
-                        'timestamp': datetime.now(pytz.timezone(timezone)),
-                    }
+            entries = [
+                (entry['status'], int(entry['total_time']['by_minute']))
+                for entry in task.get('time_in_status', {}).get(
+                    'status_history', []
                 )
+                if 'total_time' in entry
+            ]
         except KeyError as e:
+            # A tarefa é mantida, apenas sem histórico
             logger.error(f'Missing key {e} in task {task}')
             continue
+        for status, by_minute in entries:
+            task_ids.append(task['id'])
+            statuses.append(status)
+            minutes.append(by_minute)
+            snapshots.append(task['date_updated'])
+    if not task_ids:
+        return df_tasks, pd.DataFrame()
 
-    return filtered_data, status_history_data
+    df_status_history = pd.DataFrame(
+        {
+            'task_id': task_ids,
+            'status': strip_emoji(statuses),
+            'time_in_status': np.asarray(minutes, dtype='int64')
+            / MINUTES_PER_DAY,
+            'timestamp': pd.Timestamp.now(tz=timezone),
+            'snapshot': np.asarray(snapshots, dtype='int64').astype(str),
+        }
+    )
+    return df_tasks, df_status_history
 
 
-def convert_status_history(status_history: Dict) -> Dict:
-    result = {}
-    if (
-        'current_status' in status_history
-        and 'total_time' in status_history['current_status']
-    ):
-        result['current_status'] = {
-            'status': status_history['current_status']['status'],
-            'time_in_status': convert_time(
-                status_history['current_status']['total_time']['by_minute']
-            ),
-        }
-    if 'status_history' in status_history:
-        result['status_history'] = [
-            {
-                'status': status['status'],
-                'time_in_status': convert_time(
-                    status['total_time']['by_minute']
-                ),
-            }
-            for status in status_history['status_history']
-            if 'total_time' in status
-        ]
-    return result
+def factorize(values: List) -> Tuple[np.ndarray, List]:
+    """Código de cada valor e os valores distintos (`None` incluso)."""
+    codes, uniques = pd.factorize(
+        pd.Series(values, dtype=object), use_na_sentinel=False
+    )
+    return codes, list(uniques)
+
+
+def strip_emoji(values: List[str]) -> np.ndarray:
+    """Remove emojis aplicando o regex apenas aos valores distintos."""
+    codes, uniques = factorize(values)
+    cleaned = np.array(
+        [EMOJI_PATTERN.sub('', value) for value in uniques], dtype=object
+    )
+    return cleaned[codes]
+
+
+def frame_to_records(df: pd.DataFrame) -> List[Dict]:
+    """Converte o DataFrame em registros, com `None` no lugar de NaN."""
+    return df.astype(object).where(df.notna(), None).to_dict('records')
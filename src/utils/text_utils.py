@@ -1,15 +1,80 @@
-from typing import Dict
+from typing import Dict, List, Tuple
 
-from src.utils.regex_utils import FIELD_NAMES_SET, FIELD_PATTERNS
+from src.utils.regex_utils import (
+    FIELD_GROUPS,
+    FIELD_NAME_REVERSED_PATTERN,
+    FIELD_NAMES,
+    FIELD_PATTERNS,
+    FIELD_SUFFIXES,
+)
 
 
 def parse_task_text(task_text: str) -> str:
     return task_text.replace('\n', ' ').replace('.:', '') if task_text else ''
 
 
+def find_field_headers(task_text: str) -> List[Tuple[int, int, str]]:
+    """
+    Localiza os cabeçalhos "CAMPO:" do texto em uma única passada.
+
+    Parte de cada ":" (busca literal, bem mais rápida que tentar os 21
+    nomes em cada posição) e verifica se o texto anterior, ignorando
+    espaços, termina em um nome de campo: no texto invertido, isso é um
+    único `match` a partir da posição do fim do nome. Retorna tuplas
+    `(início, fim, campo)`, em que `fim` é a posição logo após o ":".
+    """
+    headers = []
+    reversed_text = task_text[::-1]
+    colon = task_text.find(':')
+    while colon != -1:
+        name_end = colon
+        while name_end > 0 and task_text[name_end - 1].isspace():
+            name_end -= 1
+        match = FIELD_NAME_REVERSED_PATTERN.match(
+            reversed_text, len(task_text) - name_end
+        )
+        if match:
+            name_start = name_end - (match.end() - match.start())
+            headers.append(
+                (name_start, colon + 1, FIELD_GROUPS[match.lastgroup])
+            )
+        colon = task_text.find(':', colon + 1)
+    return headers
+
+
 def extract_field_values(task_text: str) -> Dict[str, str]:
-    field_values = {field: '' for field in FIELD_NAMES_SET}
-    for field_name in FIELD_NAMES_SET:
+    """
+    Extrai os valores dos campos com uma única varredura do texto.
+
+    Recorta o valor de cada campo entre o seu cabeçalho e o próximo. Vale a
+    primeira ocorrência de cada campo, com o mesmo resultado de
+    `extract_field_values_regex`.
+    """
+    if '\n' in task_text:
+        # `.` não atravessa quebras de linha nos padrões originais; o texto
+        # normalizado por `parse_task_text` nunca cai aqui
+        return extract_field_values_regex(task_text)
+
+    field_values = {field: '' for field in FIELD_NAMES}
+    headers = find_field_headers(task_text)
+    found = set()
+    for index, (_, value_start, name) in enumerate(headers):
+        value_end = (
+            headers[index + 1][0]
+            if index + 1 < len(headers)
+            else len(task_text)
+        )
+        for field in (name, *FIELD_SUFFIXES[name]):
+            if field not in found:
+                found.add(field)
+                field_values[field] = task_text[value_start:value_end].strip()
+    return field_values
+
+
+def extract_field_values_regex(task_text: str) -> Dict[str, str]:
+    """Implementação de referência: um regex por campo sobre todo o texto."""
+    field_values = {field: '' for field in FIELD_NAMES}
+    for field_name in FIELD_NAMES:
         pattern = FIELD_PATTERNS[field_name]
         match = pattern.search(task_text)
         if match:
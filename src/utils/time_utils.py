@@ -1,12 +1,22 @@
-from typing import Dict
+from typing import Awaitable, Callable, Dict, List, Optional
 
-import httpx
+# Caminhos relativos à URL base da API (`CLICKUP_BASE_URL`)
+TIME_IN_STATUS_URL = '/task/{task_id}/time_in_status'
+BULK_TIME_IN_STATUS_URL = '/task/bulk_time_in_status/task_ids'
+# O endpoint em lote aceita de 2 a 100 IDs por chamada
+BULK_TIME_IN_STATUS_LIMIT = 100
 
+Fetch = Callable[[str, Optional[Dict]], Awaitable[Dict]]
 
-async def fetch_time_in_status(
-    task_id: str, client: httpx.AsyncClient, headers: Dict[str, str]
-) -> Dict:
-    url = f'https://api.clickup.com/api/v2/task/{task_id}/time_in_status'
-    response = await client.get(url, headers=headers)
-    response.raise_for_status()
-    return response.json()
+
+async def fetch_time_in_status(task_id: str, fetch: Fetch) -> Dict:
+    # `fetch` é o ClickUpAPI.fetch_clickup_data, que aplica o rate limit
+    url = TIME_IN_STATUS_URL.format(task_id=task_id)
+    return await fetch(url, None)
+
+
+async def fetch_bulk_time_in_status(
+    task_ids: List[str], fetch: Fetch
+) -> Dict[str, Dict]:
+    """Obtém o tempo em status de várias tarefas, indexado pelo ID."""
+    return await fetch(BULK_TIME_IN_STATUS_URL, {'task_ids': task_ids})
@@ -0,0 +1,217 @@
+import asyncio
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+
+from src.api.clickup_api import ClickUpAPI
+from src.cache.async_redis_cache import AsyncRedisCache
+from src.config import settings
+
+LIST_URL = 'https://api.clickup.com/api/v2/list/1/task'
+
+
+def make_api(handler):
+    return ClickUpAPI(
+        'test-key', 'UTC', None, transport=httpx.MockTransport(handler)
+    )
+
+
+@pytest.mark.asyncio
+async def test_fetch_all_tasks_stops_on_last_page_and_deduplicates():
+    requested_pages = []
+
+    def handler(request):
+        page = int(request.url.params['page'])
+        requested_pages.append(page)
+        tasks = [
+            {'id': str(i)}
+            for i in range(page * 100, min(250, (page + 1) * 100))
+        ]
+        if page == 1:
+            tasks.append({'id': '0'})
+        return httpx.Response(
+            200, json={'tasks': tasks, 'last_page': page == 2}
+        )
+
+    api = make_api(handler)
+    tasks = await api.fetch_all_tasks(LIST_URL, {'page_size': 100})
+
+    assert [task['id'] for task in tasks] == [str(i) for i in range(250)]
+    assert len(requested_pages) <= 2 + settings.PAGE_WINDOW
+    await api.close()
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_request_is_retried(monkeypatch):
+    monkeypatch.setattr(settings, 'RETRY_BACKOFF_BASE', 0.0)
+    responses = [
+        httpx.Response(429, headers={'Retry-After': '0'}),
+        httpx.Response(200, json={'tasks': [], 'last_page': True}),
+    ]
+
+    def handler(request):
+        return responses.pop(0)
+
+    api = make_api(handler)
+    labels = {'endpoint': '/api/v2/list/{id}/task'}
+    rate_limited = (
+        REGISTRY.get_sample_value('clickup_rate_limited_total', labels) or 0
+    )
+    data = await api.fetch_clickup_data(LIST_URL, {'page': 0})
+
+    assert data == {'tasks': [], 'last_page': True}
+    assert responses == []
+    assert (
+        REGISTRY.get_sample_value('clickup_rate_limited_total', labels)
+        == rate_limited + 1
+    )
+    await api.close()
+
+
+@pytest.mark.asyncio
+async def test_time_in_status_is_fetched_in_bulk_with_per_task_fallback():
+    requested_urls = []
+
+    def handler(request):
+        requested_urls.append(request.url.path)
+        if request.url.path.endswith('/task_ids'):
+            task_ids = request.url.params.get_list('task_ids')
+            return httpx.Response(
+                200,
+                json={
+                    task_id: {'status_history': []}
+                    for task_id in task_ids
+                    if task_id != '7'
+                },
+            )
+        return httpx.Response(200, json={'status_history': ['single']})
+
+    api = make_api(handler)
+    tasks = [{'id': str(i)} for i in range(150)]
+    await api.fetch_all_time_in_status(tasks)
+
+    assert requested_urls.count('/api/v2/task/7/time_in_status') == 1
+    assert len(requested_urls) == 3
+    assert tasks[0]['time_in_status'] == {'status_history': []}
+    assert tasks[7]['time_in_status'] == {'status_history': ['single']}
+    await api.close()
+
+
+def make_cache():
+    fakeredis = pytest.importorskip('fakeredis')
+    cache = AsyncRedisCache('localhost', 6379, None, None)
+    cache.redis = fakeredis.FakeAsyncRedis()
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_expired_snapshot_is_refreshed_incrementally(monkeypatch):
+    monkeypatch.setattr(settings, 'CACHE_TTL', 0)
+    monkeypatch.setattr(settings, 'CACHE_STALE_TTL', 0)
+    list_queries = []
+
+    def handler(request):
+        if request.url.path.endswith('/time_in_status'):
+            return httpx.Response(200, json={'status_history': []})
+        params = dict(request.url.params)
+        list_queries.append(params)
+        if 'date_updated_gt' not in params:
+            tasks = [
+                {'id': 'a', 'date_updated': '100'},
+                {'id': 'b', 'date_updated': '200'},
+            ]
+        elif params['archived'] == 'true':
+            tasks = [{'id': 'a', 'date_updated': '300'}]
+        else:
+            tasks = [{'id': 'c', 'date_updated': '400'}]
+        return httpx.Response(200, json={'tasks': tasks, 'last_page': True})
+
+    api = make_api(handler)
+    api.cache = make_cache()
+    await api.get_tasks('1')
+    tasks = await api.get_tasks('1')
+
+    assert [task['id'] for task in tasks] == ['b', 'c']
+    incremental = [q for q in list_queries if 'date_updated_gt' in q]
+    assert [q['date_updated_gt'] for q in incremental] == ['200', '200']
+    snapshot = await api.cache.get_list('1')
+    assert snapshot['ids'] == ['b', 'c']
+    assert snapshot['watermark'] == 400
+    assert snapshot['version'] == 2
+    await api.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_crawl():
+    list_requests = []
+
+    def handler(request):
+        if '/task/bulk_time_in_status/' in request.url.path:
+            return httpx.Response(200, json={})
+        if request.url.path.endswith('/time_in_status'):
+            return httpx.Response(200, json={'status_history': []})
+        list_requests.append(request.url.params['page'])
+        return httpx.Response(
+            200,
+            json={
+                'tasks': [{'id': 'a', 'date_updated': '1'}],
+                'last_page': True,
+            },
+        )
+
+    api = make_api(handler)
+    api.cache = make_cache()
+    results = await asyncio.gather(*[api.get_tasks('1') for _ in range(5)])
+
+    assert all(tasks == results[0] for tasks in results)
+    assert list_requests.count('0') == 1
+    await api.close()
+
+
+@pytest.mark.asyncio
+async def test_refresh_lock_outlives_its_ttl_during_a_long_crawl(monkeypatch):
+    monkeypatch.setattr(settings, 'REFRESH_LOCK_TTL', 1)
+    api = make_api(lambda request: httpx.Response(500))
+    api.cache = make_cache()
+    held = []
+
+    async def slow_sync(list_id, snapshot):
+        await asyncio.sleep(1.5)
+        held.append(await api.cache.redis.exists('lock:tasks:1'))
+        return {'ids': []}
+
+    api._sync_tasks = slow_sync
+    await api._refresh_shared('1')
+
+    assert held == [1]
+    assert not await api.cache.redis.exists('lock:tasks:1')
+    await api.close()
+
+
+@pytest.mark.asyncio
+async def test_list_tasks_are_streamed_page_by_page():
+    def handler(request):
+        if '/task/bulk_time_in_status/' in request.url.path:
+            task_ids = request.url.params.get_list('task_ids')
+            return httpx.Response(
+                200,
+                json={task_id: {'status_history': []} for task_id in task_ids},
+            )
+        page = int(request.url.params['page'])
+        tasks = [{'id': f'{page}-{i}'} for i in range(100 if page < 2 else 10)]
+        return httpx.Response(
+            200, json={'tasks': tasks, 'last_page': page == 2}
+        )
+
+    api = make_api(handler)
+    api.cache = make_cache()
+    pages = [page async for page in api.iter_list_tasks('1')]
+
+    assert [len(page) for page in pages] == [100, 100, 10]
+    assert all(
+        task['time_in_status'] == {'status_history': []}
+        for page in pages
+        for task in page
+    )
+    await api.close()
@@ -0,0 +1,39 @@
+import io
+
+import pandas as pd
+import pytest
+
+from src.utils.export import iter_file, to_arrow_ipc, to_parquet, write_xlsx
+from src.utils.task_utils import filter_tasks_frames
+from tests.test_task_utils import make_tasks
+
+
+@pytest.fixture(scope='module')
+def frames():
+    return filter_tasks_frames(make_tasks(200), 'America/Sao_Paulo')
+
+
+def test_parquet_and_arrow_round_trip(frames):
+    pa = pytest.importorskip('pyarrow')
+    df_tasks, df_history = frames
+
+    parquet = pd.read_parquet(io.BytesIO(to_parquet(df_tasks)))
+    arrow = pa.ipc.open_file(to_arrow_ipc(df_history)).read_pandas()
+
+    pd.testing.assert_frame_equal(parquet, df_tasks, check_dtype=False)
+    pd.testing.assert_frame_equal(arrow, df_history, check_dtype=False)
+
+
+def test_xlsx_has_one_sheet_per_table(frames):
+    openpyxl = pytest.importorskip('openpyxl')
+    df_tasks, df_history = frames
+
+    content = b''.join(
+        iter_file(write_xlsx({'tasks': df_tasks, 'status_history': df_history}))
+    )
+    workbook = openpyxl.load_workbook(io.BytesIO(content), read_only=True)
+
+    assert workbook.sheetnames == ['tasks', 'status_history']
+    rows = list(workbook['tasks'].values)
+    assert list(rows[0]) == list(df_tasks.columns)
+    assert len(rows) == len(df_tasks) + 1
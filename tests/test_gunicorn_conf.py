@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+
+# Roda em um processo novo: o prometheus_client decide na importação se
+# grava as métricas no diretório compartilhado
+LOAD_CONFIG = """
+import os
+import runpy
+
+runpy.run_path('gunicorn.conf.py')
+# preload_app: o mestre importa a aplicação antes de criar os workers
+from prometheus_client import generate_latest
+from src.utils.metrics import CLICKUP_RATE_LIMITED, metrics_registry
+
+for _ in range(2):
+    pid = os.fork()
+    if pid == 0:
+        CLICKUP_RATE_LIMITED.labels('/api/v2/list/{id}/task').inc()
+        os._exit(0)
+    os.waitpid(pid, 0)
+
+print(generate_latest(metrics_registry()).decode())
+"""
+
+
+def test_metrics_of_all_workers_reach_the_endpoint(tmp_path):
+    # Sem PROMETHEUS_MULTIPROC_DIR: vale o padrão da configuração
+    metrics_dir = tmp_path / 'prometheus-metrics'
+    metrics_dir.mkdir()
+    (metrics_dir / 'stale.db').write_bytes(b'')
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if key != 'PROMETHEUS_MULTIPROC_DIR'
+    }
+    env.update(TMPDIR=str(tmp_path), PYTHONPATH='.')
+
+    output = subprocess.run(
+        [sys.executable, '-c', LOAD_CONFIG],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+    assert (
+        'clickup_rate_limited_total{endpoint="/api/v2/list/{id}/task"} 2.0'
+        in output
+    )
+    assert not (metrics_dir / 'stale.db').exists()
@@ -0,0 +1,49 @@
+import gzip
+
+from src.utils.http_cache import (
+    brotli,
+    choose_encoding,
+    compress_variants,
+    encoded_etag,
+    etag_matches,
+    snapshot_etag,
+)
+
+
+def test_etag_follows_snapshot_version():
+    snapshot = {'version': 3, 'full_synced_at': 10.0}
+    etag = snapshot_etag('1', snapshot)
+
+    assert etag == snapshot_etag('1', dict(snapshot, synced_at=99))
+    assert etag != snapshot_etag('1', dict(snapshot, version=4))
+    assert etag != snapshot_etag('1', dict(snapshot, full_synced_at=11.0))
+    assert etag_matches(f'"x", W/{etag}', etag)
+    assert etag_matches('*', etag)
+    assert not etag_matches('"x"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_each_encoding_has_its_own_etag():
+    etag = snapshot_etag('1', {'version': 3})
+    gzip_etag = encoded_etag(etag, 'gzip')
+
+    assert encoded_etag(etag, None) == etag
+    assert len({etag, gzip_etag, encoded_etag(etag, 'br')}) == 3
+    assert gzip_etag.startswith('"') and gzip_etag.endswith('-gzip"')
+    assert etag_matches(gzip_etag, etag)
+    assert etag_matches(f'W/{encoded_etag(etag, "br")}', etag)
+    assert not etag_matches(encoded_etag('"outro"', 'gzip'), etag)
+
+
+def test_encoding_negotiation_and_variants():
+    preferred = 'br' if brotli is not None else 'gzip'
+
+    assert choose_encoding('gzip, deflate, br') == preferred
+    assert choose_encoding('br;q=0, gzip;q=0.5') == 'gzip'
+    assert choose_encoding('identity') is None
+    assert choose_encoding(None) is None
+    body = b'{"filtered_tasks": []}' * 100
+    variants = compress_variants(body)
+    assert gzip.decompress(variants['gzip']) == body
+    if brotli is not None:
+        assert brotli.decompress(variants['br']) == body
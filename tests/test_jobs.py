@@ -0,0 +1,109 @@
+import asyncio
+import time
+
+import pytest
+
+from src.jobs.manager import JobManager
+
+
+class MemoryStore:
+    """Faz o papel do Redis compartilhado entre os workers."""
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ttl):
+        self.values[key] = dict(value)
+
+
+@pytest.mark.asyncio
+async def test_job_goes_from_pending_to_done():
+    manager = JobManager(1, 60)
+    release = asyncio.Event()
+
+    async def job():
+        await release.wait()
+        return {'tasks': 3}
+
+    job_id = manager.submit(job(), list_id='1')
+    assert manager.get(job_id)['status'] == 'pending'
+    await asyncio.sleep(0)
+    assert manager.get(job_id)['status'] == 'running'
+
+    release.set()
+    await asyncio.sleep(0.01)
+    record = manager.get(job_id)
+    assert record['status'] == 'done'
+    assert record['result'] == {'tasks': 3}
+    assert record['list_id'] == '1' and record['finished_at']
+    await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_failed_job_keeps_the_error():
+    manager = JobManager(1, 60)
+
+    async def job():
+        raise RuntimeError('ClickUp fora do ar')
+
+    job_id = manager.submit(job())
+    await asyncio.sleep(0.01)
+
+    record = manager.get(job_id)
+    assert record['status'] == 'failed'
+    assert record['error'] == 'ClickUp fora do ar'
+    await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_finished_jobs_are_pruned_after_the_ttl():
+    manager = JobManager(1, 60)
+
+    async def job():
+        return None
+
+    old = manager.submit(job())
+    await asyncio.sleep(0.01)
+    manager.jobs[old]['finished_at'] = time.time() - 61
+    running = manager.submit(asyncio.Event().wait())
+
+    assert manager.get(old) is None
+    assert manager.get(running)['status'] == 'pending'
+    await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_lookup_finds_jobs_of_other_workers():
+    store = MemoryStore()
+    first, second = JobManager(1, 60, store), JobManager(1, 60, store)
+
+    async def job():
+        return {'tasks': 1}
+
+    job_id = first.submit(job())
+    await asyncio.sleep(0.01)
+
+    assert second.get(job_id) is None
+    assert (await second.lookup(job_id))['status'] == 'done'
+    assert await second.lookup('desconhecido') is None
+    await first.shutdown()
+    await second.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_run_in_worker_leaves_the_loop_free():
+    manager = JobManager(1, 60)
+    ticks = []
+
+    async def ticker():
+        for _ in range(3):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(manager.run_in_worker(time.sleep, 0.1), ticker())
+
+    assert len(ticks) == 3 and ticks[-1] - ticks[0] < 0.09
+    await manager.shutdown()
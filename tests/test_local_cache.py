@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from src.cache.async_redis_cache import AsyncRedisCache
+from src.cache.local_cache import LocalCache
+
+
+def test_evicts_expired_then_least_recently_used(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr('time.monotonic', lambda: now[0])
+    cache = LocalCache(max_bytes=100, max_entries=3, ttl=10)
+
+    cache.set('a', 'A', 40)
+    now[0] = 5
+    cache.set('b', 'B', 40)
+    cache.set('c', 'C', 10)
+    assert cache.get('a') == 'A'
+    cache.set('d', 'D', 10)  # 4 entradas: sai a menos usada (b)
+    assert cache.get('b') is None
+    now[0] = 12  # `a` venceu
+    cache.set('e', 'E', 50)
+
+    assert [cache.get(key) for key in 'acde'] == [None, 'C', 'D', 'E']
+    assert cache.size == 70
+    assert not cache.set('f', 'F', 101)
+
+
+def test_read_older_than_an_invalidation_is_not_cached():
+    cache = LocalCache(max_bytes=100, max_entries=3, ttl=10)
+    generation = cache.generation
+    cache.invalidate('a')
+
+    assert not cache.set('a', 'antigo', 1, generation)
+    assert cache.get('a') is None
+
+
+@pytest.mark.asyncio
+async def test_writes_invalidate_other_workers():
+    fakeredis = pytest.importorskip('fakeredis')
+    server = fakeredis.FakeServer()
+    workers = []
+    for _ in range(2):
+        worker = AsyncRedisCache(
+            'localhost', 6379, None, None, local_cache=LocalCache(10**6, 8, 60)
+        )
+        worker.redis = fakeredis.FakeAsyncRedis(server=server)
+        await worker.start_invalidation_listener()
+        workers.append(worker)
+    writer, reader = workers
+    await asyncio.sleep(0.05)
+    manifest = {'synced_at': 0, 'version': 1, 'ids': ['1']}
+
+    await writer.set_list('L', [{'id': '1', 'name': 'a'}], manifest, 60)
+    await asyncio.sleep(0.05)
+    first = await reader.get_list('L')
+    await reader.redis.delete('tasks:L:manifest')  # só o cache local responde
+    cached = await reader.get_list('L')
+    await writer.set_list(
+        'L', [{'id': '1', 'name': 'b'}], {**manifest, 'version': 2}, 60
+    )
+    await asyncio.sleep(0.05)
+    fresh = await reader.get_list('L')
+
+    assert first['tasks'] == cached['tasks'] == [{'id': '1', 'name': 'a'}]
+    assert fresh['tasks'] == [{'id': '1', 'name': 'b'}]
+    assert (await writer.get_list('L'))['version'] == 2
+    for worker in workers:
+        await worker.close()
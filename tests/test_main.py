@@ -0,0 +1,200 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import src.main as main
+from src.utils.http_cache import brotli
+from benchmarks.mock_clickup import make_task, make_time_in_status
+from src.api.clickup_api import ClickUpAPI
+from src.cache.async_redis_cache import AsyncRedisCache
+from src.config import settings
+from src.jobs.manager import JobManager
+
+fakeredis = pytest.importorskip('fakeredis')
+
+
+class StubAPI:
+    # O lock da lista é o real, sobre o Redis compartilhado pelos workers
+    list_lock = ClickUpAPI.list_lock
+    _renew_lock = ClickUpAPI._renew_lock
+
+    def __init__(self, tasks, cache):
+        self.tasks = tasks
+        self.cache = cache
+
+    async def get_snapshot(self, list_id):
+        if list_id == 'erro':
+            raise RuntimeError('ClickUp fora do ar')
+        return {
+            'ids': [task['id'] for task in self.tasks],
+            'version': 1,
+            'synced_at': 0,
+            'full_synced_at': 0,
+        }
+
+    async def snapshot_tasks(self, list_id, snapshot):
+        return self.tasks
+
+
+class StubResources:
+    """Os recursos de um worker, com Redis em memória e ClickUp simulado."""
+
+    def __init__(self, server, tasks):
+        self.redis_cache = AsyncRedisCache('localhost', 6379, None, None)
+        self.redis_cache.redis = fakeredis.FakeAsyncRedis(server=server)
+        self.job_manager = JobManager(2, 60, self.redis_cache)
+        self.clickup_api = StubAPI(tasks, self.redis_cache)
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        await self.job_manager.shutdown()
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    """Cria um cliente por worker; todos dividem o mesmo Redis."""
+    server = fakeredis.FakeServer()
+    tasks = []
+    for index in range(20):
+        task = make_task(0, index, '1')
+        task['time_in_status'] = make_time_in_status(0, index)
+        tasks.append(task)
+    monkeypatch.setattr(
+        main, 'Resources', lambda: StubResources(server, tasks)
+    )
+    return lambda: TestClient(main.app)
+
+
+def wait_for_job(client, job_id):
+    for _ in range(100):
+        job = client.get(f'/jobs/{job_id}').json()
+        if job['status'] in ('done', 'failed'):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f'job {job_id} did not finish')
+
+
+def test_background_sync_is_tracked_as_a_job(worker):
+    with worker() as client:
+        response = client.get('/get_data_organized/1?background=true')
+        assert response.status_code == 202
+        job_id = response.json()['job_id']
+        assert response.json()['status_url'] == f'/jobs/{job_id}'
+
+        job = wait_for_job(client, job_id)
+        assert job['status'] == 'done'
+        assert job['result'] == {'tasks': 20}
+        assert job['list_id'] == '1'
+
+        failed = client.get('/get_data_organized/erro?background=true')
+        job = wait_for_job(client, failed.json()['job_id'])
+        assert job['status'] == 'failed'
+        assert job['error'] == 'ClickUp fora do ar'
+
+    # Outro worker responde pelo estado publicado no Redis
+    with worker() as other:
+        assert other.get(f'/jobs/{job_id}').json()['status'] == 'done'
+        assert other.get('/jobs/desconhecido').status_code == 404
+
+
+def test_organized_output_is_negotiated_and_revalidated(worker):
+    with worker() as client:
+        plain = client.get(
+            '/get_data_organized/1', headers={'Accept-Encoding': 'identity'}
+        )
+        assert plain.status_code == 200
+        assert 'Content-Encoding' not in plain.headers
+        assert len(plain.json()['filtered_tasks']) == 20
+        etag = plain.headers['ETag']
+
+        compressed = client.get(
+            '/get_data_organized/1',
+            headers={'Accept-Encoding': 'gzip'},
+        )
+        assert compressed.headers['Content-Encoding'] == 'gzip'
+        assert compressed.headers['Vary'] == 'Accept-Encoding'
+        assert compressed.headers['ETag'] == etag[:-1] + '-gzip"'
+        # O httpx descomprime o corpo conforme `Content-Encoding`
+        assert compressed.json() == plain.json()
+        if brotli is not None:
+            br = client.get(
+                '/get_data_organized/1', headers={'Accept-Encoding': 'br'}
+            )
+            assert br.headers['ETag'] == etag[:-1] + '-br"'
+
+        for validator in (etag, compressed.headers['ETag']):
+            revalidated = client.get(
+                '/get_data_organized/1',
+                headers={
+                    'If-None-Match': validator,
+                    'Accept-Encoding': 'gzip',
+                },
+            )
+            assert revalidated.status_code == 304
+            assert revalidated.content == b''
+            assert revalidated.headers['ETag'] == compressed.headers['ETag']
+
+        selected = client.get(
+            '/get_data_organized/1?columns=task_id',
+            headers={'If-None-Match': etag, 'Accept-Encoding': 'identity'},
+        )
+        assert selected.status_code == 200
+        assert set(selected.json()['filtered_tasks'][0]) == {'task_id'}
+
+
+@pytest.fixture
+def processed(monkeypatch):
+    """Conta as chamadas a `process_tasks`, que grava as tabelas."""
+    calls = []
+    process_tasks = main.process_tasks
+
+    def counting(list_id, tasks):
+        calls.append(list_id)
+        time.sleep(0.1)
+        return process_tasks(list_id, tasks)
+
+    monkeypatch.setattr(main, 'process_tasks', counting)
+    return calls
+
+
+def test_column_variants_never_write_the_tables(worker, processed):
+    with worker() as client:
+        # Sem a saída padrão em cache, as colunas saem só da transformação
+        first = client.get('/get_data_organized/1?columns=Name')
+        assert processed == []
+
+        full = client.get('/get_data_organized/1').json()['filtered_tasks']
+        assert processed == ['1']
+
+        # Com ela, as colunas são recortadas da saída padrão
+        selected = client.get('/get_data_organized/1?columns=task_id,Name')
+        assert processed == ['1']
+
+    assert first.json()['filtered_tasks'] == [
+        {'Name': task['Name']} for task in full
+    ]
+    assert selected.json()['filtered_tasks'] == [
+        {'task_id': task['task_id'], 'Name': task['Name']} for task in full
+    ]
+
+
+def test_concurrent_misses_build_the_output_once(
+    worker, processed, monkeypatch
+):
+    monkeypatch.setattr(settings, 'REFRESH_POLL_INTERVAL', 0.01)
+
+    async def concurrent_misses():
+        snapshot = await main.get_resources().clickup_api.get_snapshot('1')
+        return await asyncio.gather(
+            *(main.organized_output('1', snapshot) for _ in range(3))
+        )
+
+    with worker() as client:
+        bodies = client.portal.call(concurrent_misses)
+
+    assert processed == ['1']
+    assert len(set(bodies)) == 1
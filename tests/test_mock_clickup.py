@@ -0,0 +1,51 @@
+import httpx
+import pytest
+
+from benchmarks.mock_clickup import (
+    BASE_TIMESTAMP,
+    MOCK_BASE_URL,
+    UPDATE_STEP,
+    MockConfig,
+    create_app,
+)
+from src.api.clickup_api import ClickUpAPI
+
+
+def make_mock_api(config):
+    return ClickUpAPI(
+        'test-key',
+        'UTC',
+        None,
+        base_url=MOCK_BASE_URL,
+        transport=httpx.ASGITransport(app=create_app(config)),
+    )
+
+
+@pytest.mark.asyncio
+async def test_api_crawls_the_mock_server():
+    api = make_mock_api(MockConfig(tasks=250))
+
+    tasks = await api.fetch_list_tasks('1')
+    changed = await api.fetch_all_tasks(
+        api._list_url('1'),
+        {'date_updated_gt': BASE_TIMESTAMP + 239 * UPDATE_STEP},
+    )
+
+    assert len({task['id'] for task in tasks}) == 250
+    assert all(task['time_in_status']['status_history'] for task in tasks)
+    assert len(changed) == 10
+    assert await api.fetch_task('bm00000ff') is None
+    await api.close()
+
+
+@pytest.mark.asyncio
+async def test_mock_server_enforces_rate_limit():
+    transport = httpx.ASGITransport(app=create_app(MockConfig(rate_limit=2)))
+    async with httpx.AsyncClient(
+        transport=transport, base_url=MOCK_BASE_URL
+    ) as client:
+        responses = [await client.get('/task/bm0000001') for _ in range(3)]
+
+    assert [r.status_code for r in responses] == [200, 200, 429]
+    assert responses[1].headers['X-RateLimit-Remaining'] == '0'
+    assert int(responses[2].headers['Retry-After']) >= 1
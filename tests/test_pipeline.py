@@ -0,0 +1,101 @@
+import asyncio
+
+import httpx
+import pytest
+
+from benchmarks.mock_clickup import (
+    BASE_TIMESTAMP,
+    MOCK_BASE_URL,
+    UPDATE_STEP,
+    MockConfig,
+    create_app,
+)
+from src.api.clickup_api import ClickUpAPI
+from src.cache.async_redis_cache import AsyncRedisCache
+from src.jobs.pipeline import SinkUnavailable, run_pipeline
+
+
+class RecordingSink:
+    def __init__(self, delay=0.0, fail_at=None):
+        self.delay = delay
+        self.fail_at = fail_at
+        self.indexes = []
+        self.state = 'open'
+
+    async def write(self, chunk):
+        if chunk.index == self.fail_at:
+            raise SinkUnavailable('falhou')
+        await asyncio.sleep(self.delay)
+        self.indexes.append(chunk.index)
+
+    async def commit(self):
+        self.state = 'committed'
+
+    async def abort(self):
+        self.state = 'aborted'
+
+
+@pytest.mark.asyncio
+async def test_slow_sink_holds_back_the_crawl():
+    produced = []
+    sink = RecordingSink(delay=0.001)
+    in_flight = []
+
+    async def pages():
+        for index in range(40):
+            produced.append(index)
+            in_flight.append(len(produced) - len(sink.indexes))
+            yield [{'id': str(index)}]
+
+    async def enrich(page_tasks):
+        await asyncio.sleep(0.0005 * (int(page_tasks[0]['id']) % 3))
+        return page_tasks
+
+    written = await run_pipeline(pages(), enrich, [sink], queue_size=2)
+
+    assert written == 40
+    assert sink.indexes == list(range(40))
+    assert sink.state == 'committed'
+    # Duas filas de 2 páginas, mais uma página em cada etapa
+    assert max(in_flight) <= 2 * 2 + 3
+
+
+@pytest.mark.asyncio
+async def test_failed_sink_aborts_the_others():
+    async def pages():
+        for index in range(10):
+            yield [{'id': str(index)}]
+
+    async def enrich(page_tasks):
+        return page_tasks
+
+    healthy, failing = RecordingSink(), RecordingSink(fail_at=3)
+    with pytest.raises(SinkUnavailable):
+        await run_pipeline(pages(), enrich, [healthy, failing], queue_size=2)
+
+    assert healthy.state == failing.state == 'aborted'
+
+
+@pytest.mark.asyncio
+async def test_full_crawl_builds_the_snapshot_chunk_by_chunk():
+    fakeredis = pytest.importorskip('fakeredis')
+    cache = AsyncRedisCache('localhost', 6379, None, None)
+    cache.redis = fakeredis.FakeAsyncRedis()
+    api = ClickUpAPI(
+        'test-key',
+        'UTC',
+        cache,
+        base_url=MOCK_BASE_URL,
+        transport=httpx.ASGITransport(app=create_app(MockConfig(tasks=450))),
+    )
+
+    snapshot = await api.get_snapshot('1')
+    tasks = await api.get_tasks('1')
+
+    assert 'tasks' not in snapshot
+    assert snapshot['ids'] == [task['id'] for task in tasks]
+    assert len(tasks) == 450
+    assert all(task['time_in_status']['status_history'] for task in tasks)
+    assert snapshot['watermark'] == BASE_TIMESTAMP + 449 * UPDATE_STEP
+    assert await cache.redis.keys('tasks:1:staging:*') == []
+    await api.close()
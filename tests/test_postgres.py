@@ -0,0 +1,264 @@
+import csv
+import io
+import os
+import subprocess
+import sys
+from contextlib import contextmanager
+
+import pandas as pd
+
+from src.db.postgres import (
+    NULL_MARKER,
+    CsvStream,
+    PostgresDB,
+    content_fingerprint,
+    iter_csv_chunks,
+    sql_type,
+)
+
+
+class Result:
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.rowcount = len(self.rows)
+
+    def scalars(self):
+        return iter(self.rows)
+
+    def scalar(self):
+        return self.rows[0] if self.rows else None
+
+
+class FakeConnection:
+    """Registra o SQL executado; `tables` diz as colunas existentes."""
+
+    def __init__(self, tables=None, fingerprint=None):
+        self.tables = tables or {}
+        self.fingerprint = fingerprint
+        self.statements = []
+        self.copied = []
+        # `conn.connection.cursor()`, como na conexão DBAPI do SQLAlchemy
+        self.connection = self
+
+    def execute(self, statement, params=None):
+        sql = ' '.join(str(statement).split())
+        self.statements.append(sql)
+        if 'information_schema.columns' in sql:
+            return Result(self.tables.get(params['table_name'], []))
+        if sql.startswith('SELECT fingerprint'):
+            return Result([self.fingerprint] if self.fingerprint else [])
+        return Result()
+
+    def cursor(self):
+        return FakeCursor(self)
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def copy_expert(self, sql, file):
+        self.conn.copied.append((sql, file.read()))
+
+    def close(self):
+        pass
+
+
+def make_db(conn=None):
+    db = PostgresDB('localhost', 5432, 'db', 'user', 'pass', 'dw')
+    if conn is not None:
+
+        @contextmanager
+        def begin():
+            yield conn
+
+        db.engine.begin = begin
+    return db
+
+
+def test_csv_keeps_nulls_apart_from_empty_strings():
+    df = pd.DataFrame(
+        {'name': ['a', '', None], 'value': [1.5, None, 3.0]},
+        index=[10, 11, 12],
+    )
+
+    rows = list(csv.reader(io.StringIO(''.join(iter_csv_chunks(df)))))
+
+    assert rows == [
+        ['10', 'a', '1.5'],
+        ['11', '', NULL_MARKER],
+        ['12', NULL_MARKER, '3.0'],
+    ]
+
+
+def test_csv_stream_reads_across_chunk_boundaries():
+    df = pd.DataFrame({'name': [f'tarefa {i}' for i in range(25)]})
+    expected = df.to_csv(header=False, na_rep=NULL_MARKER)
+
+    stream = CsvStream(iter_csv_chunks(df, chunk_size=4))
+    parts = []
+    while part := stream.read(7):
+        parts.append(part)
+
+    assert ''.join(parts) == expected
+    assert CsvStream(iter_csv_chunks(df, chunk_size=4)).read() == expected
+    assert CsvStream(iter(())).read(10) == ''
+
+
+def test_copy_and_swap_statements():
+    db = make_db()
+    conn = FakeConnection()
+    df = pd.DataFrame({'task_id': ['a', 'b']})
+
+    db._copy_rows(conn, df, 'tarefas__staging')
+    db._swap_table(conn, 'tarefas__staging', 'tarefas')
+
+    [(sql, data)] = conn.copied
+    assert sql == (
+        'COPY dw.tarefas__staging (id, task_id) '
+        f"FROM STDIN WITH (FORMAT csv, NULL '{NULL_MARKER}')"
+    )
+    assert data == '0,a\n1,b\n'
+    assert conn.statements == [
+        'DROP TABLE IF EXISTS dw.tarefas',
+        'ALTER TABLE dw.tarefas__staging RENAME TO tarefas',
+        'CREATE INDEX ix_dw_tarefas_id ON dw.tarefas (id)',
+    ]
+
+
+def upsert_statements(conn):
+    return [
+        sql
+        for sql in conn.statements
+        if sql.startswith(('INSERT INTO dw.', 'DELETE', 'ALTER'))
+    ]
+
+
+def test_upsert_statements():
+    conn = FakeConnection({'tarefas': ['task_id', 'name']})
+    df = pd.DataFrame({'task_id': ['a'], 'name': ['x'], 'points': [2]})
+
+    make_db().upsert(
+        conn,
+        df,
+        'tarefas',
+        ['task_id'],
+        delete_missing=True,
+        version='{table}.points',
+    )
+
+    assert upsert_statements(conn) == [
+        'ALTER TABLE dw.tarefas ADD COLUMN points BIGINT',
+        'INSERT INTO dw.tarefas AS current (task_id, name, points) '
+        'SELECT DISTINCT ON (task_id) task_id, name, points '
+        'FROM tarefas__upsert '
+        'ORDER BY task_id, tarefas__upsert.points DESC NULLS LAST, '
+        '__row DESC ON CONFLICT (task_id) DO UPDATE SET '
+        'name = EXCLUDED.name, points = EXCLUDED.points '
+        'WHERE (current.name, current.points) IS DISTINCT FROM '
+        '(EXCLUDED.name, EXCLUDED.points) '
+        'AND (EXCLUDED.points >= current.points) IS NOT FALSE',
+        'DELETE FROM dw.tarefas WHERE NOT EXISTS (SELECT 1 FROM '
+        'tarefas__upsert WHERE tarefas__upsert.task_id = dw.tarefas.task_id)',
+    ]
+    assert conn.statements[-1] == 'DROP TABLE tarefas__upsert'
+
+
+def test_upsert_copies_the_row_position_instead_of_id():
+    conn = FakeConnection({'historico': ['id', 'task_id', 'status']})
+    df = pd.DataFrame(
+        {'task_id': ['a', 'a'], 'status': ['feito', 'feito']}, index=[7, 3]
+    )
+
+    make_db().upsert(
+        conn, df, 'historico', ['task_id', 'status'], update=False
+    )
+
+    # O `id` posicional da tabela criada no modo `replace` é descartado
+    assert upsert_statements(conn) == [
+        'ALTER TABLE dw.historico DROP COLUMN id',
+        'INSERT INTO dw.historico AS current (task_id, status) '
+        'SELECT DISTINCT ON (task_id, status) task_id, status '
+        'FROM historico__upsert ORDER BY task_id, status, __row DESC '
+        'ON CONFLICT (task_id, status) DO NOTHING',
+    ]
+    [(sql, data)] = conn.copied
+    assert sql.startswith('COPY historico__upsert (__row, task_id, status)')
+    assert data == '0,a,feito\n1,a,feito\n'
+
+
+def test_unchanged_snapshot_skips_the_write():
+    df_tasks = pd.DataFrame({'task_id': ['a'], 'name': ['x']})
+    conn = FakeConnection(
+        {'tarefas': ['task_id', 'name']},
+        fingerprint=content_fingerprint(df_tasks, pd.DataFrame()),
+    )
+    db = make_db(conn)
+
+    assert not db.save_list_snapshot(
+        df_tasks, pd.DataFrame(), 'tarefas', 'historico'
+    )
+    assert not conn.copied
+
+
+def test_empty_history_is_not_written():
+    # Sem histórico, o DataFrame não tem colunas para criar a tabela
+    conn = FakeConnection({'tarefas': ['task_id', 'name']})
+    db = make_db(conn)
+    df_tasks = pd.DataFrame({'task_id': ['a'], 'name': ['x']})
+
+    assert db.save_list_snapshot(
+        df_tasks, pd.DataFrame(), 'tarefas', 'historico'
+    )
+    assert not any('historico' in sql for sql in conn.statements)
+
+    conn.statements.clear()
+    db.save_list_snapshot(
+        pd.DataFrame(), pd.DataFrame(), 'tarefas', 'historico'
+    )
+    assert 'DELETE FROM dw.tarefas' in conn.statements
+
+
+def test_fingerprint_ignores_column_order_and_timestamp():
+    df = pd.DataFrame({'a': [1, 2], 'b': ['x', 'y'], 'timestamp': [1, 2]})
+    reordered = df[['timestamp', 'b', 'a']].assign(timestamp=[3, 4])
+
+    assert content_fingerprint(df) == content_fingerprint(reordered)
+    assert content_fingerprint(df) != content_fingerprint(df.assign(a=[1, 3]))
+
+
+def test_fingerprint_is_the_same_in_every_process():
+    code = (
+        'from benchmarks.mock_clickup import make_task, make_time_in_status\n'
+        'from src.db.postgres import content_fingerprint\n'
+        'from src.utils.task_utils import filter_tasks_frames\n'
+        'tasks = [make_task(0, i, "1") for i in range(50)]\n'
+        'for i, task in enumerate(tasks):\n'
+        '    task["time_in_status"] = make_time_in_status(0, i)\n'
+        'print(content_fingerprint(*filter_tasks_frames(tasks, "UTC")))\n'
+    )
+    digests = {
+        subprocess.run(
+            [sys.executable, '-c', code],
+            env=dict(os.environ, PYTHONHASHSEED=seed, PYTHONPATH='.'),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        for seed in ('1', '2')
+    }
+
+    assert len(digests) == 1
+
+
+def test_sql_type():
+    assert sql_type(pd.Series([True]).dtype) == 'BOOLEAN'
+    assert sql_type(pd.Series([1]).dtype) == 'BIGINT'
+    assert sql_type(pd.Series([1.5]).dtype) == 'DOUBLE PRECISION'
+    assert sql_type(pd.Series(['x']).dtype) == 'TEXT'
+    assert sql_type(pd.DatetimeTZDtype(tz='UTC')) == (
+        'TIMESTAMP WITH TIME ZONE'
+    )
+    assert sql_type(pd.Series(pd.to_datetime(['2024-01-01'])).dtype) == (
+        'TIMESTAMP WITHOUT TIME ZONE'
+    )
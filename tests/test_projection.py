@@ -0,0 +1,62 @@
+from benchmarks.mock_clickup import make_task, make_time_in_status
+from src.utils import records
+from src.utils.projection import project_task, project_time_in_status
+from src.utils.task_utils import filter_tasks
+
+
+def raw_task(index):
+    task = make_task(0, index, '1')
+    task['checklists'] = [{'items': [{'name': 'passo'}] * 20}]
+    task['watchers'] = [{'id': 1, 'username': 'ana', 'color': '#fff'}] * 5
+    task['custom_fields'].append(
+        {
+            'name': 'OUTRO',
+            'type_config': {'options': [{'name': str(i)} for i in range(50)]},
+            'value': 1,
+        }
+    )
+    task['time_in_status'] = make_time_in_status(0, index)
+    return task
+
+
+def test_projection_keeps_the_transform_output():
+    tasks = [raw_task(index) for index in range(50)]
+    projected = [
+        dict(
+            project_task(task),
+            time_in_status=project_time_in_status(task['time_in_status']),
+        )
+        for task in tasks
+    ]
+
+    assert filter_tasks(projected, 'UTC')[0] == filter_tasks(tasks, 'UTC')[0]
+    assert filter_tasks(projected, 'UTC')[1][0]['status'] == (
+        filter_tasks(tasks, 'UTC')[1][0]['status']
+    )
+    task = projected[0]
+    assert 'checklists' not in task and 'markdown_description' not in task
+    assert {field['name'] for field in task['custom_fields']} <= {
+        '💡 R$ GANHO ANUAL '
+    }
+    assert set(task['status']) == {'status', 'type'}
+    assert set(task['time_in_status']['status_history'][0]) == {
+        'status',
+        'total_time',
+    }
+
+
+def test_extra_columns_come_from_task_keys_and_custom_fields(monkeypatch):
+    monkeypatch.setattr(records, 'EXTRA_TASK_FIELDS', ('url', 'tags'))
+    monkeypatch.setattr(records, 'EXTRA_CUSTOM_FIELDS', ('OUTRO', 'NENHUM'))
+    task = {
+        'url': 'https://app.clickup.com/t/1',
+        'tags': [{'name': 'a'}],
+        'custom_fields': [{'name': ' OUTRO ', 'value': 3}],
+    }
+
+    assert records.extra_values(task) == (
+        'https://app.clickup.com/t/1',
+        '[{"name":"a"}]',
+        3,
+        None,
+    )
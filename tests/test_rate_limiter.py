@@ -0,0 +1,48 @@
+import asyncio
+import time
+
+import pytest
+
+from src.api.rate_limiter import RedisRateLimiter
+
+
+@pytest.mark.asyncio
+async def test_workers_share_one_budget_through_redis():
+    fakeredis = pytest.importorskip('fakeredis')
+    pytest.importorskip('lupa')
+    server = fakeredis.FakeServer()
+    # Dois workers: clientes distintos, mesmo servidor e mesma chave de API
+    workers = [
+        RedisRateLimiter(
+            fakeredis.FakeAsyncRedis(server=server), 'clickup:abc', 60
+        )
+        for _ in range(2)
+    ]
+    await workers[0].update_from_headers(
+        {'X-RateLimit-Limit': '60', 'X-RateLimit-Remaining': '3'}
+    )
+
+    start = time.monotonic()
+    await asyncio.gather(*(worker.acquire() for worker in workers * 2))
+
+    # Três tokens no balde; o quarto espera o reabastecimento (1 por s)
+    assert time.monotonic() - start >= 0.5
+
+
+@pytest.mark.asyncio
+async def test_block_reaches_the_other_workers():
+    fakeredis = pytest.importorskip('fakeredis')
+    pytest.importorskip('lupa')
+    server = fakeredis.FakeServer()
+    first, second = (
+        RedisRateLimiter(
+            fakeredis.FakeAsyncRedis(server=server), 'clickup:abc', 6000
+        )
+        for _ in range(2)
+    )
+
+    await first.block_for(0.3)
+    start = time.monotonic()
+    await second.acquire()
+
+    assert time.monotonic() - start >= 0.2
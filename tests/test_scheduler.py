@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+from src.config.lists import load_registry
+from src.jobs.scheduler import SyncScheduler
+
+
+def test_registry_accepts_names_and_explicit_tables():
+    registry = load_registry(
+        '{"1": "inovacao", "2": {"tasks_table": "t", "history_table": "h",'
+        ' "refresh_interval": 60}}'
+    )
+
+    assert registry['1'].tasks_table == 'lista_dados_inovacao'
+    assert registry['1'].history_table == 'status_history_inovacao'
+    assert (registry['2'].tasks_table, registry['2'].history_table) == (
+        't',
+        'h',
+    )
+    assert registry['2'].refresh_interval == 60
+    with pytest.raises(ValueError):
+        load_registry('{"3": {}}')
+
+
+@pytest.mark.asyncio
+async def test_scheduler_syncs_every_list_with_bounded_parallelism():
+    registry = load_registry(
+        '{' + ', '.join(f'"{i}": "l{i}"' for i in range(5)) + '}'
+    )
+    running, peak, synced = set(), [0], []
+
+    async def sync(config):
+        running.add(config.list_id)
+        peak[0] = max(peak[0], len(running))
+        await asyncio.sleep(0.02)
+        running.discard(config.list_id)
+        synced.append(config.list_id)
+
+    scheduler = SyncScheduler(registry, sync, max_parallel=2, tick=0.01)
+    scheduler.start()
+    await asyncio.sleep(0.2)
+    await scheduler.stop()
+
+    assert sorted(synced) == sorted(registry)
+    assert peak[0] == 2
@@ -0,0 +1,84 @@
+import random
+
+import pandas as pd
+
+from src.utils.task_utils import (
+    filter_tasks,
+    filter_tasks_frames,
+    frame_to_records,
+)
+
+STATUSES = ['🚀 em andamento', 'backlog', '✅ concluído', 'bloqueado 🇧🇷']
+
+
+def make_task(rng, index):
+    created = 1_500_000_000_000 + rng.randint(0, 300_000_000_000)
+    task = {
+        'id': f'task{index}',
+        'name': f'Projeto {index}',
+        'status': {'status': rng.choice(STATUSES)},
+        'date_created': str(created),
+        'date_updated': str(created + rng.randint(0, 10_000_000_000)),
+        'text_content': 'OPERAÇÃO: Oi\nESCOPO: reduzir tempo\nOBS: nenhuma',
+        'custom_fields': [
+            {'name': '💡 R$ GANHO ANUAL ', 'value': str(rng.randint(0, 9999))}
+        ]
+        if rng.random() < 0.5
+        else [],
+        'time_in_status': {
+            'status_history': [
+                {
+                    'status': rng.choice(STATUSES),
+                    'total_time': {'by_minute': rng.randint(0, 100_000)},
+                }
+                for _ in range(rng.randint(0, 4))
+            ]
+        },
+    }
+    if rng.random() < 0.5:
+        task['priority'] = {'priority': rng.choice(['high', 'low'])}
+    if rng.random() < 0.5:
+        task['assignees'] = [{'username': 'ana', 'email': 'ana@exemplo.com'}]
+    return task
+
+
+def make_tasks(size, seed=5):
+    rng = random.Random(seed)
+    tasks = [make_task(rng, index) for index in range(size)]
+    tasks.append({'id': 'sem-status', 'date_created': '0', 'date_updated': '0'})
+    return tasks
+
+
+def test_columnar_transform_matches_row_transform():
+    tasks = make_tasks(500)
+    filtered, history = filter_tasks(tasks, 'America/Sao_Paulo')
+    df_tasks, df_history = filter_tasks_frames(tasks, 'America/Sao_Paulo')
+
+    pd.testing.assert_frame_equal(df_tasks, pd.DataFrame(filtered))
+    pd.testing.assert_frame_equal(
+        df_history.drop(columns='timestamp'),
+        pd.DataFrame(history).drop(columns='timestamp'),
+    )
+    assert frame_to_records(df_tasks) == filtered
+
+
+def test_status_durations_keep_minute_precision():
+    task = make_task(random.Random(1), 0)
+    task['time_in_status'] = {
+        'status_history': [
+            {'status': 'backlog', 'total_time': {'by_minute': 63}}
+        ]
+    }
+
+    _, history = filter_tasks([task], 'UTC')
+    _, df_history = filter_tasks_frames([task], 'UTC')
+
+    assert history[0]['time_in_status'] == 63 / 1440
+    assert df_history['time_in_status'].tolist() == [63 / 1440]
+
+
+def test_columnar_transform_of_empty_list():
+    df_tasks, df_history = filter_tasks_frames([], 'UTC')
+
+    assert df_tasks.empty and df_history.empty
+
@@ -0,0 +1,83 @@
+import random
+
+from src.utils.regex_utils import FIELD_NAMES
+from src.utils.text_utils import (
+    extract_field_values,
+    extract_field_values_regex,
+    parse_task_text,
+)
+
+FILLER = [
+    'Projeto de automação',
+    'ver anexo',
+    'R$ 10.000,00',
+    'https://exemplo.com/a:b',
+    'operação',
+    'tipo',
+    'site novo',
+    '💡',
+    '🚀 urgente',
+    '',
+    ':',
+    '  ',
+    '\t',
+]
+
+
+def random_header(rng):
+    name = rng.choice(FIELD_NAMES)
+    name = rng.choice([name, name.lower(), name.title()])
+    return name + rng.choice(['', ' ', '  ', '\t']) + rng.choice([':', ':', '.:', ''])
+
+
+def random_description(rng):
+    parts = []
+    for _ in range(rng.randint(0, 30)):
+        parts.append(
+            random_header(rng) if rng.random() < 0.5 else rng.choice(FILLER)
+        )
+        parts.append(rng.choice([' ', '\n', '', '  ']))
+    return ''.join(parts)
+
+
+WORDS = (
+    'o projeto visa reduzir o tempo médio de atendimento da operação com '
+    'automação de processos e integração de sistemas legados'
+).split()
+
+
+def form_description(rng):
+    """Descrição no formato de formulário: cada campo uma vez, texto longo."""
+    fields = rng.sample(FIELD_NAMES, rng.randint(5, len(FIELD_NAMES)))
+    return '\n'.join(
+        f'{field}: '
+        + ' '.join(rng.choice(WORDS) for _ in range(rng.randint(3, 300)))
+        for field in fields
+    )
+
+
+def corpus(size, seed=20240601):
+    rng = random.Random(seed)
+    texts = [random_description(rng) for _ in range(size)]
+    texts.extend(
+        [
+            '',
+            'TIPO DE OPERAÇÃO: Receptivo OPERAÇÃO: Oi',
+            'OPERAÇÃO: Oi TIPO DE OPERAÇÃO: Ativo',
+            '💡 TIPO DE PROJETO: Melhoria TIPO: Interno',
+            'cliente:Oi site : Curitiba',
+            'ESCOPO: a\nb OBS: c',
+        ]
+    )
+    return texts
+
+
+def test_single_pass_matches_regex_extraction():
+    rng = random.Random(11)
+    texts = corpus(3000) + [form_description(rng) for _ in range(50)]
+    for text in texts:
+        for task_text in (text, parse_task_text(text)):
+            assert extract_field_values(task_text) == (
+                extract_field_values_regex(task_text)
+            ), task_text
+
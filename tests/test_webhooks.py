@@ -0,0 +1,133 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from src.api.webhooks import WebhookProcessor, sign, verify_signature
+from src.config import settings
+from tests.test_clickup_api import make_api, make_cache
+
+
+def test_signature_is_verified():
+    body = b'{"event": "taskUpdated"}'
+
+    assert verify_signature(body, sign(body, 'secret'), 'secret')
+    assert not verify_signature(body, sign(body, 'other'), 'secret')
+    assert not verify_signature(body, None, 'secret')
+
+
+def task(task_id, name, status_type='open'):
+    return {
+        'id': task_id,
+        'name': name,
+        'date_updated': '10',
+        'status': {'status': 'aberta', 'type': status_type},
+        'list': {'id': '1'},
+    }
+
+
+@pytest.mark.asyncio
+async def test_events_are_deduplicated_debounced_and_patched(monkeypatch):
+    monkeypatch.setattr(settings, 'REFRESH_POLL_INTERVAL', 0.01)
+    remote = {'a': task('a', 'nova'), 'b': task('b', 'x', 'closed')}
+    task_requests = []
+
+    def handler(request):
+        path = request.url.path
+        if path.endswith('/time_in_status'):
+            return httpx.Response(200, json={'status_history': []})
+        task_id = path.rsplit('/', 1)[-1]
+        task_requests.append(task_id)
+        if task_id not in remote:
+            return httpx.Response(404, json={'err': 'Task not found'})
+        return httpx.Response(200, json=remote[task_id])
+
+    api = make_api(handler)
+    api.cache = make_cache()
+    await api.cache.set_list(
+        '1',
+        [task('a', 'velha'), task('b', 'x'), task('c', 'y')],
+        {
+            'synced_at': 0,
+            'version': 1,
+            'ids': ['a', 'b', 'c'],
+            'watermark': 10,
+            'full_synced_at': 0,
+        },
+        60,
+    )
+    patches = []
+
+    async def on_patch(applied):
+        patches.extend(applied)
+
+    processor = WebhookProcessor(api, on_patch, ['1'], 0.05, 60)
+    events = [
+        {'event': 'taskUpdated', 'task_id': 'a', 'history_items': [{'id': 1}]},
+        {
+            'event': 'taskStatusUpdated',
+            'task_id': 'a',
+            'history_items': [{'id': 2}],
+        },
+        {'event': 'taskUpdated', 'task_id': 'b', 'history_items': [{'id': 3}]},
+        {'event': 'taskDeleted', 'task_id': 'c', 'history_items': [{'id': 4}]},
+        {'event': 'listUpdated', 'list_id': '1'},
+    ]
+    statuses = []
+    for event in events + events[:1]:
+        body = json.dumps(event).encode()
+        statuses.append(await processor.handle(body, event))
+    await asyncio.sleep(0.2)
+
+    assert statuses == ['accepted'] * 4 + ['ignored', 'duplicate']
+    assert sorted(task_requests) == ['a', 'b']
+    snapshot = await api.cache.get_list('1')
+    assert snapshot['ids'] == ['a']
+    assert snapshot['tasks'][0]['name'] == 'nova'
+    assert snapshot['tasks'][0]['time_in_status'] == {'status_history': []}
+    assert snapshot['watermark'] == 10
+    assert {(p.task_id, p.task is None) for p in patches} == {
+        ('a', False),
+        ('b', True),
+        ('c', True),
+    }
+    await processor.close()
+    await api.close()
+
+
+@pytest.mark.asyncio
+async def test_moved_task_leaves_its_previous_list(monkeypatch):
+    monkeypatch.setattr(settings, 'REFRESH_POLL_INTERVAL', 0.01)
+    moved = dict(task('a', 'movida'), list={'id': '2'})
+
+    def handler(request):
+        if request.url.path.endswith('/time_in_status'):
+            return httpx.Response(200, json={'status_history': []})
+        return httpx.Response(200, json=moved)
+
+    api = make_api(handler)
+    api.cache = make_cache()
+    for list_id, tasks in (('1', [task('a', 'x')]), ('2', [])):
+        await api.cache.set_list(
+            list_id,
+            tasks,
+            {
+                'synced_at': 0,
+                'version': 1,
+                'ids': [known['id'] for known in tasks],
+                'watermark': 10,
+                'full_synced_at': 0,
+            },
+            60,
+        )
+
+    patches = await api.patch_task('a', False, ['1', '2'])
+
+    assert {(p.list_id, p.task is None) for p in patches} == {
+        ('1', True),
+        ('2', False),
+    }
+    assert (await api.cache.get_list('1'))['ids'] == []
+    assert (await api.cache.get_list('2'))['ids'] == ['a']
+    await api.close()